@@ -0,0 +1,125 @@
+"""
+Compare load time and file size of .pbpose files against the JSON layout studio extensions use.
+
+    python benchmarks/benchmark_pose_file.py
+    python benchmarks/benchmark_pose_file.py --channels 1000 10000 --output results.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+benchmarks_path = os.path.dirname(os.path.realpath(__file__))
+base_path = benchmarks_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_pose_data
+from pose_blender import pose_blender_pose_file as pose_file
+
+DEFAULT_CHANNEL_COUNTS = (1000, 10000, 100000)
+CHANNELS_PER_CONTROLLER = 9  # translate/rotate/scale
+
+
+def create_value_table(channel_count):
+    attr_names = ["{}{}".format(t, a) for t in ("translate", "rotate", "scale") for a in "XYZ"]
+    value_table = {}
+    for i in range(channel_count):
+        controller_name = "rig:ctrl_{:05d}".format(i // CHANNELS_PER_CONTROLLER)
+        attr_name = attr_names[i % CHANNELS_PER_CONTROLLER]
+        value_table["{}.{}".format(controller_name, attr_name)] = i * 0.001
+    return value_table
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run_benchmark(channel_count, temp_dir, repeat):
+    value_table = create_value_table(channel_count)
+
+    json_path = os.path.join(temp_dir, "pose_{}.json".format(channel_count))
+    with open(json_path, "w") as fp:
+        json.dump({"pose_name": "bench", "values": value_table}, fp)
+
+    pose_paths = {}
+    for label, use_float64 in (("pbpose_f64", True), ("pbpose_f32", False)):
+        pose_path = os.path.join(temp_dir, "pose_{}_{}{}".format(channel_count, label, pose_file.FILE_EXTENSION))
+        pose_file.write_pose_file(pose_path, value_table, pose_name="bench", use_float64=use_float64)
+        pose_paths[label] = pose_path
+
+    def load_json():
+        with open(json_path, "r") as fp:
+            return json.load(fp)["values"]
+
+    def load_mapped(pose_path):
+        handle = pose_blender_pose_data.MappedPoseDataHandle(pose_path, pose_file.parse_pose_buffer)
+        data = handle.resolve()
+        handle.release()
+        return data
+
+    def load_mapped_values_only(pose_path):
+        # what a blend engine needs once the attribute table is known
+        handle = pose_blender_pose_data.MappedPoseDataHandle(
+            pose_path,
+            lambda buffer: pose_file.PoseFileReader(buffer).get_values(),
+        )
+        data = handle.resolve()
+        handle.release()
+        return data
+
+    result = {
+        "channels": channel_count,
+        "json": {
+            "size_bytes": os.path.getsize(json_path),
+            "load_seconds": best_time(load_json, repeat),
+        },
+    }
+    for label, pose_path in pose_paths.items():
+        result[label] = {
+            "size_bytes": os.path.getsize(pose_path),
+            "load_seconds": best_time(lambda: pose_file.read_pose_file(pose_path), repeat),
+            "mapped_load_seconds": best_time(lambda: load_mapped(pose_path), repeat),
+            "mapped_values_only_seconds": best_time(lambda: load_mapped_values_only(pose_path), repeat),
+            "pose_name_only_seconds": best_time(lambda: pose_file.read_pose_name(pose_path), repeat),
+        }
+    return result
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, nargs="+", default=DEFAULT_CHANNEL_COUNTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results to this json file")
+    parsed_args = parser.parse_args(args)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        results = [run_benchmark(channel_count, temp_dir, parsed_args.repeat) for channel_count in parsed_args.channels]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    for result in results:
+        print("{} channels".format(result["channels"]))
+        for label in ("json", "pbpose_f64", "pbpose_f32"):
+            format_result = result[label]
+            print("    {:<12} {:>12,} bytes  load {:8.2f} ms{}".format(
+                label,
+                format_result["size_bytes"],
+                format_result["load_seconds"] * 1000,
+                "  values only {:8.2f} ms".format(format_result["mapped_values_only_seconds"] * 1000)
+                if "mapped_values_only_seconds" in format_result else "",
+            ))
+
+    if parsed_args.output:
+        with open(parsed_args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
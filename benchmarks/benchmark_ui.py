@@ -0,0 +1,183 @@
+"""
+Time the UI and blend hot paths against pose_blender_dcc_simulated, using Qt's offscreen platform.
+
+    python benchmarks/benchmark_ui.py
+    python benchmarks/benchmark_ui.py --poses 100 1000 --channels 100 --output results.json
+
+Every run is written as one JSON document, keep them around to compare releases.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+benchmarks_path = os.path.dirname(os.path.realpath(__file__))
+base_path = benchmarks_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_dcc_simulated
+from pose_blender import pose_blender_system as pbs
+from pose_blender import pose_blender_ui
+from pose_blender.ui_utils import QtCore
+
+DEFAULT_POSE_COUNTS = (100, 1000, 10000)
+DEFAULT_CHANNEL_COUNTS = (100, 1000, 5000)
+BLEND_STEPS = 60  # one second of dragging at the default blend rate
+
+# what an artist typing into the filter ends up querying
+FILTER_QUERIES = ("p", "po", "pose", "pose_1", "pose_12", "", "hand", "path:group_1", "")
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def process_events():
+    QtCore.QCoreApplication.processEvents()
+
+
+def create_dcc(pose_count=100, channel_count=100, latency=0.0, evaluate_poses=True):
+    channels_per_controller = len(pose_blender_dcc_simulated.DEFAULT_CHANNEL_NAMES)
+    return pose_blender_dcc_simulated.PoseBlenderSimulated(
+        controller_count=max(1, -(-channel_count // channels_per_controller)),
+        pose_count=pose_count,
+        get_latency=latency,
+        set_latency=latency,
+        evaluate_poses=evaluate_poses,
+    )
+
+
+def benchmark_widget(pose_count, virtualized_grid, repeat):
+    pbs.set_dcc(create_dcc(pose_count=pose_count))
+
+    widget = pose_blender_ui.PoseBlenderWidget(virtualized_grid=virtualized_grid)
+
+    def refresh_poses():
+        widget.refresh_poses()
+        widget.thumbnail_loader.cancel_all()
+
+    def filter_poses():
+        for query in FILTER_QUERIES:
+            widget.filter_poses(query)
+
+    def update_pose_size():
+        for size in (64, 128, 256, widget.ui.size_slider.value()):
+            widget.update_pose_size(size)
+        widget.thumbnail_scroll_timer.stop()
+
+    result = {
+        "poses": pose_count,
+        "grid": "virtualized" if virtualized_grid else "widgets",
+        "refresh_poses": best_time(refresh_poses, repeat),
+        "refresh_poses_incremental": best_time(lambda: widget.refresh_poses(incremental=True), repeat),
+        "filter_poses": best_time(filter_poses, repeat) / len(FILTER_QUERIES),
+        "update_pose_size": best_time(update_pose_size, repeat) / 4,
+        "refresh_grid_display": best_time(widget.refresh_grid_display, repeat),
+    }
+
+    widget.thumbnail_loader.cancel_all()
+    widget.thumbnail_loader.wait_for_done()
+    widget.deleteLater()
+    process_events()
+    return result
+
+
+def benchmark_blend(channel_count, repeat, latency=0.0, evaluate_poses=True):
+    dcc = create_dcc(pose_count=1, channel_count=channel_count, latency=latency, evaluate_poses=evaluate_poses)
+    rig_name = dcc.rig_names[0]
+    pose_asset = dcc.get_poses()[0]
+
+    def start_blend():
+        dcc.reset_scene()
+        dcc.remove_caches()
+        dcc.blend_target_cache.clear()  # time the first blend of a pose
+        dcc.cache_blend_pose(pose_asset, rig_name)
+
+    def blend_steps():
+        for step in range(BLEND_STEPS + 1):
+            dcc.blend_cached_pose(float(step) / BLEND_STEPS)
+
+    start_time = best_time(start_blend, repeat)
+    start_blend()
+    steps_time = best_time(blend_steps, repeat)
+    return {
+        "channels": len(dcc.attribute_values),
+        "latency": latency,
+        "evaluate_poses": evaluate_poses,
+        "start_blend": start_time,
+        "blend_step": steps_time / (BLEND_STEPS + 1),
+        "blend_session": start_time + steps_time,
+    }
+
+
+def get_environment():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "qt": QtCore.qVersion(),
+        "platform": platform.platform(),
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poses", type=int, nargs="+", default=DEFAULT_POSE_COUNTS)
+    parser.add_argument("--channels", type=int, nargs="+", default=DEFAULT_CHANNEL_COUNTS)
+    parser.add_argument("--grid", choices=("widgets", "virtualized", "both"), default="both")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per attribute get/set")
+    parser.add_argument("--scene-readback", action="store_true",
+                        help="blend targets are applied and read back instead of evaluate_pose_asset()")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results to this json file")
+    parsed_args = parser.parse_args(args)
+
+    grid_modes = {"widgets": (False,), "virtualized": (True,), "both": (False, True)}[parsed_args.grid]
+
+    results = {
+        "environment": get_environment(),
+        "widget": [],
+        "blend": [],
+    }
+
+    for pose_count in parsed_args.poses:
+        for virtualized_grid in grid_modes:
+            widget_result = benchmark_widget(pose_count, virtualized_grid, parsed_args.repeat)
+            results["widget"].append(widget_result)
+            print("{:>6} poses {:<12} refresh {:9.2f} ms  filter {:8.2f} ms  size {:8.2f} ms  display {:8.2f} ms".format(
+                pose_count,
+                widget_result["grid"],
+                widget_result["refresh_poses"] * 1000,
+                widget_result["filter_poses"] * 1000,
+                widget_result["update_pose_size"] * 1000,
+                widget_result["refresh_grid_display"] * 1000,
+            ))
+
+    for channel_count in parsed_args.channels:
+        blend_result = benchmark_blend(
+            channel_count,
+            parsed_args.repeat,
+            latency=parsed_args.latency,
+            evaluate_poses=not parsed_args.scene_readback,
+        )
+        results["blend"].append(blend_result)
+        print("{:>6} channels  start blend {:8.2f} ms  blend step {:8.3f} ms".format(
+            blend_result["channels"],
+            blend_result["start_blend"] * 1000,
+            blend_result["blend_step"] * 1000,
+        ))
+
+    if parsed_args.output:
+        with open(parsed_args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
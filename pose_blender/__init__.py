@@ -10,17 +10,39 @@ def reload_modules():
     else:
         from imp import reload
     
+    from . import pose_blender_pose_data
     from . import pose_blender_constants
     from . import pose_blender_logger
+    from . import pose_blender_timing
+    from . import pose_blender_blend_cache
     from . import pose_blender_dcc_core
     from . import pose_blender_dcc_maya
+    from . import pose_blender_dcc_simulated
+    from . import pose_blender_library
+    from . import pose_blender_library_index
+    from . import pose_blender_library_watcher
+    from . import pose_blender_pose_file
+    from . import pose_blender_pose_stream
+    from . import pose_blender_search
     from . import pose_blender_system
+    from . import pose_blender_thumbnail_cache
     from . import pose_blender_ui
+    reload(pose_blender_pose_data)
     reload(pose_blender_constants)
     reload(pose_blender_logger)
+    reload(pose_blender_timing)
+    reload(pose_blender_blend_cache)
     reload(pose_blender_dcc_core)
     reload(pose_blender_dcc_maya)
+    reload(pose_blender_dcc_simulated)
+    reload(pose_blender_library)
+    reload(pose_blender_library_index)
+    reload(pose_blender_library_watcher)
+    reload(pose_blender_pose_file)
+    reload(pose_blender_pose_stream)
+    reload(pose_blender_search)
     reload(pose_blender_system)
+    reload(pose_blender_thumbnail_cache)
     reload(pose_blender_ui)
     pose_blender_system.import_extensions(refresh=True)
     reload(pose_blender_system)
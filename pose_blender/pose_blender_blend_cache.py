@@ -0,0 +1,446 @@
+import array
+import collections
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # older DCC python installs don't ship numpy, fall back to array.array
+
+
+def to_float_array(values):
+    """
+    Convert an iterable of numbers into a contiguous float64 array
+    """
+    if np is not None:
+        return np.fromiter(values, dtype=np.float64)
+    return array.array("d", values)
+
+
+def copy_float_array(values):
+    if np is not None:
+        return values.copy()
+    return array.array("d", values)
+
+
+def get_changed_indices(array_a, array_b, epsilon):
+    """
+    Indices where the two arrays differ by more than epsilon
+    """
+    if np is not None:
+        return np.nonzero(np.abs(array_b - array_a) > epsilon)[0].tolist()
+    return [i for i, (a, b) in enumerate(zip(array_a, array_b)) if abs(b - a) > epsilon]
+
+
+def take_float_array(values, indices):
+    if np is not None:
+        return values[indices]
+    return array.array("d", (values[i] for i in indices))
+
+
+def lerp_float_arrays(array_a, array_b, weight):
+    """
+    Vectorized linear interpolation between two float arrays of equal length
+
+    Returns:
+        list: plain python floats, ready to be passed on to a DCC
+    """
+    if np is not None:
+        return (array_a + (array_b - array_a) * weight).tolist()
+    return [a + (b - a) * weight for a, b in zip(array_a, array_b)]
+
+
+class AttributePlan(object):
+    """
+    The blendable attributes of a rig's controllers, resolved once and kept in a fixed order.
+
+    Built by PoseBlenderCoreInterface.get_attribute_plan() and reused by every blend session
+    until the controllers or the ignore list change. The index order is stable for the life
+    of the plan, so array based caches can share handle_indices instead of building their own.
+    """
+
+    def __init__(self, key, attrs):
+        """
+        Args:
+            key (tuple): (controllers, ignored attr names) the plan was built for
+            attrs (list): (attr handle, attr name without namespace) per attribute
+        """
+        self.key = key
+        self.handles = [handle for handle, _ in attrs]
+        self.names = [name for _, name in attrs]
+        self.handle_indices = {handle: index for index, handle in enumerate(self.handles)}
+        self.name_indices = {name: index for index, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.handles)
+
+    def get_handle(self, name):
+        """
+        Returns:
+            the attr handle for a namespace-less "controller.attr" name, None if it isn't in the plan
+        """
+        index = self.name_indices.get(name)
+        return None if index is None else self.handles[index]
+
+
+class BlendCache(object):
+    """
+    Compiled representation of a blend between two poses.
+
+    Holds an ordered table of attribute handles and two contiguous float64 arrays with the
+    pre and post blend values, aligned by index to the handle table.
+
+    When the target is set, the channels whose value actually changes are compiled into a
+    separate "delta set", which is the only thing evaluate() works on.
+    """
+
+    def __init__(self, epsilon=1e-6):
+        self.epsilon = epsilon
+
+        self.handles = []
+        self.handle_indices = {}
+        self.pre_values = to_float_array([])
+        self.post_values = to_float_array([])
+
+        # delta set
+        self.changed_handles = []
+        self.changed_pre_values = to_float_array([])
+        self.changed_post_values = to_float_array([])
+
+    def __len__(self):
+        return len(self.handles)
+
+    def set_pre_values(self, value_table, attribute_plan=None):
+        """
+        Build the attribute handle table from a {handle: value} dict.
+        Post values are reset to the pre values until a target is cached.
+
+        Args:
+            value_table (dict): {handle: value}
+            attribute_plan (AttributePlan): use the handle table of the plan, value_table has to hold all its handles
+        """
+        if attribute_plan is not None:
+            self.handles = attribute_plan.handles
+            self.handle_indices = attribute_plan.handle_indices
+        else:
+            self.handles = list(value_table.keys())
+            self.handle_indices = {handle: index for index, handle in enumerate(self.handles)}
+        self.pre_values = to_float_array(value_table[handle] for handle in self.handles)
+        self.post_values = copy_float_array(self.pre_values)
+        self.compile_changed_channels()
+
+    def set_post_values(self, value_table):
+        """
+        Align a {handle: value} dict to the handle table.
+        Attributes that were not in the pre blend values are ignored,
+        attributes that are missing from the table keep their pre blend value.
+        """
+        post_values = copy_float_array(self.pre_values)
+        for handle, value in value_table.items():
+            index = self.handle_indices.get(handle)
+            if index is not None:
+                post_values[index] = value
+        self.post_values = post_values
+        self.compile_changed_channels()
+
+    def compile_changed_channels(self):
+        changed_indices = get_changed_indices(self.pre_values, self.post_values, self.epsilon)
+        self.changed_handles = [self.handles[i] for i in changed_indices]
+        self.changed_pre_values = take_float_array(self.pre_values, changed_indices)
+        self.changed_post_values = take_float_array(self.post_values, changed_indices)
+
+    @property
+    def changed_count(self):
+        return len(self.changed_handles)
+
+    def evaluate(self, weight):
+        """
+        Returns:
+            list: blended values, aligned to self.changed_handles
+        """
+        return lerp_float_arrays(self.changed_pre_values, self.changed_post_values, weight)
+
+    def evaluate_frames(self, weights):
+        """
+        Evaluate many weights in one pass, for baking a blend over a frame range
+
+        Args:
+            weights (list): a weight per frame, see get_easing_weights()
+
+        Returns:
+            list: a list of values per changed channel (aligned to self.changed_handles), with a value per weight
+        """
+        if np is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            deltas = self.changed_post_values - self.changed_pre_values
+            return (self.changed_pre_values[:, None] + deltas[:, None] * weights[None, :]).tolist()
+        weights = list(weights)
+        return [
+            [a + (b - a) * weight for weight in weights]
+            for a, b in zip(self.changed_pre_values, self.changed_post_values)
+        ]
+
+    def clear(self):
+        self.__init__(epsilon=self.epsilon)
+
+
+EASING_LINEAR = "linear"
+EASING_EASE_IN = "ease_in"
+EASING_EASE_OUT = "ease_out"
+EASING_EASE_IN_OUT = "ease_in_out"
+
+# plain arithmetic, so these work on floats and numpy arrays alike
+EASING_FUNCTIONS = {
+    EASING_LINEAR: lambda t: t,
+    EASING_EASE_IN: lambda t: t * t,
+    EASING_EASE_OUT: lambda t: t * (2.0 - t),
+    EASING_EASE_IN_OUT: lambda t: t * t * (3.0 - 2.0 * t),
+}
+
+
+def get_easing_weights(sample_count, easing=EASING_LINEAR):
+    """
+    Blend weights going from 0 to 1 over sample_count evenly spaced samples
+
+    Args:
+        sample_count (int):
+        easing (str or callable): one of EASING_FUNCTIONS, or a custom function mapping 0-1 time to a weight
+
+    Returns:
+        list: sample_count weights
+    """
+    if sample_count <= 0:
+        return []
+    if sample_count == 1:
+        times = [1.0]
+    else:
+        times = [index / float(sample_count - 1) for index in range(sample_count)]
+
+    if callable(easing):
+        return [float(easing(t)) for t in times]
+
+    easing_function = EASING_FUNCTIONS.get(easing)
+    if easing_function is None:
+        raise ValueError("Unknown easing '{}', expected one of {}".format(easing, sorted(EASING_FUNCTIONS)))
+
+    if np is not None:
+        return easing_function(np.asarray(times, dtype=np.float64)).tolist()
+    return [easing_function(t) for t in times]
+
+
+MIX_MODE_NORMALIZED = "normalized"
+MIX_MODE_ADDITIVE = "additive"
+MIX_MODES = (MIX_MODE_NORMALIZED, MIX_MODE_ADDITIVE)
+
+
+def get_mix_weights(weights, mode=MIX_MODE_NORMALIZED):
+    """
+    normalized: weights are scaled down when they add up to more than 1, the pre blend pose fills the rest
+    additive: weights are used as is, every pose adds its full offset from the pre blend pose
+    """
+    weights = [float(weight) for weight in weights]
+    if mode == MIX_MODE_NORMALIZED:
+        weights = [max(weight, 0.0) for weight in weights]
+        total_weight = sum(weights)
+        if total_weight > 1.0:
+            weights = [weight / total_weight for weight in weights]
+    return weights
+
+
+class MultiBlendCache(object):
+    """
+    Compiled representation of a weighted mix of several target poses.
+
+    Every target is aligned to one attribute handle table, the same way BlendCache aligns its post values.
+    Only channels that at least one target changes are kept, as a matrix of offsets from the pre blend
+    values with a row per target, so evaluate() is a single weighted sum over that matrix.
+    """
+
+    def __init__(self, epsilon=1e-6):
+        self.epsilon = epsilon
+
+        self.handles = []
+        self.handle_indices = {}
+        self.pre_values = to_float_array([])
+
+        self.target_keys = []
+        self.target_values = []  # float arrays aligned to self.handles, one per target
+
+        # delta set
+        self.changed_handles = []
+        self.changed_pre_values = to_float_array([])
+        self.changed_deltas = []  # numpy matrix (target, channel), or a float array per target
+
+    def __len__(self):
+        return len(self.handles)
+
+    @property
+    def target_count(self):
+        return len(self.target_keys)
+
+    @property
+    def changed_count(self):
+        return len(self.changed_handles)
+
+    def set_pre_values(self, value_table):
+        """
+        Build the attribute handle table from a {handle: value} dict, this drops all targets
+        """
+        self.handles = list(value_table.keys())
+        self.handle_indices = {handle: index for index, handle in enumerate(self.handles)}
+        self.pre_values = to_float_array(value_table[handle] for handle in self.handles)
+        self.target_keys = []
+        self.target_values = []
+        self.compile_changed_channels()
+
+    def add_target(self, key, value_table):
+        """
+        Align a {handle: value} dict to the handle table and add it to the mix, replacing a target with the same key
+        """
+        target_values = copy_float_array(self.pre_values)
+        for handle, value in value_table.items():
+            index = self.handle_indices.get(handle)
+            if index is not None:
+                target_values[index] = value
+
+        if key in self.target_keys:
+            self.target_values[self.target_keys.index(key)] = target_values
+        else:
+            self.target_keys.append(key)
+            self.target_values.append(target_values)
+        self.compile_changed_channels()
+
+    def remove_target(self, key):
+        if key not in self.target_keys:
+            return
+        target_index = self.target_keys.index(key)
+        self.target_keys.pop(target_index)
+        self.target_values.pop(target_index)
+        self.compile_changed_channels()
+
+    def compile_changed_channels(self):
+        if not self.target_values:
+            self.changed_handles = []
+            self.changed_pre_values = to_float_array([])
+            self.changed_deltas = []
+            return
+
+        if np is not None:
+            deltas = np.vstack(self.target_values) - self.pre_values
+            changed_indices = np.nonzero((np.abs(deltas) > self.epsilon).any(axis=0))[0]
+            self.changed_deltas = deltas[:, changed_indices]
+            changed_indices = changed_indices.tolist()
+        else:
+            changed_indices = set()
+            for target_values in self.target_values:
+                changed_indices.update(get_changed_indices(self.pre_values, target_values, self.epsilon))
+            changed_indices = sorted(changed_indices)
+            self.changed_deltas = [
+                array.array("d", (target_values[i] - self.pre_values[i] for i in changed_indices))
+                for target_values in self.target_values
+            ]
+
+        self.changed_handles = [self.handles[i] for i in changed_indices]
+        self.changed_pre_values = take_float_array(self.pre_values, changed_indices)
+
+    def evaluate(self, weights, mode=MIX_MODE_NORMALIZED):
+        """
+        Args:
+            weights (list): a weight per target, aligned to self.target_keys
+            mode (str): one of MIX_MODES
+
+        Returns:
+            list: blended values, aligned to self.changed_handles
+        """
+        weights = get_mix_weights(weights, mode)
+
+        if np is not None:
+            if not self.target_keys:
+                return []
+            return (self.changed_pre_values + np.dot(weights, self.changed_deltas)).tolist()
+
+        blend_values = list(self.changed_pre_values)
+        for weight, deltas in zip(weights, self.changed_deltas):
+            if not weight:
+                continue
+            blend_values = [value + delta * weight for value, delta in zip(blend_values, deltas)]
+        return blend_values
+
+    def clear(self):
+        self.__init__(epsilon=self.epsilon)
+
+
+def get_pose_asset_token(pose_asset):
+    """
+    Something that changes when the pose asset's file changes on disk, None for poses without a file
+    """
+    local_path = pose_asset.local_path
+    if not local_path:
+        return None
+    try:
+        stat_result = os.stat(local_path)
+    except OSError:
+        return None
+    return stat_result.st_mtime, stat_result.st_size
+
+
+class BlendTargetCache(object):
+    """
+    LRU of evaluated blend targets, so blending the same pose again can skip the scene round trip.
+
+    Entries are {handle: target_value} tables for the channels of a pose, keyed by
+    (pose key, rig, attribute handles). A different controller selection or ignore list gives
+    different handles and so a different key. Entries are dropped when the pose file changes.
+    """
+    default_max_entries = 16
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or self.default_max_entries
+        self._entries = collections.OrderedDict()  # {key: (pose token, value table)}
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(pose_asset, rig_name, handles):
+        return pose_asset.get_key(), rig_name, tuple(handles)
+
+    def get(self, key, pose_asset):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        pose_token, value_table = entry
+        if pose_token != get_pose_asset_token(pose_asset):
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.pop(key)
+        self._entries[key] = entry
+        self.stats["hits"] += 1
+        return value_table
+
+    def set(self, key, pose_asset, value_table):
+        self._entries.pop(key, None)
+        self._entries[key] = (get_pose_asset_token(pose_asset), value_table)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_pose(self, pose_asset):
+        pose_key = pose_asset.get_key()
+        for key in [key for key in self._entries if key[0] == pose_key]:
+            del self._entries[key]
+
+    def invalidate_rig(self, rig_name):
+        for key in [key for key in self._entries if key[1] == rig_name]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
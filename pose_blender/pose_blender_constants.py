@@ -1,18 +1,53 @@
+from . import pose_blender_pose_data
+
+
 class ModuleConstants:
     extension_file_prefix = "pose_blender_ext"
 
 
 class PoseAsset(object):
+    # slotted so big libraries don't pay for a __dict__ per pose, subclasses without __slots__ still get one
+    __slots__ = (
+        "local_path",
+        "pose_name",
+        "pose_data",
+        "thumbnail_image",
+        "thumbnail_path",
+        "is_favorite",
+        "tags",
+        "needs_sync",
+    )
+
     def __init__(self):
         self.local_path = ""
         self.pose_name = ""
-        self.pose_data = None
+        self.pose_data = None  # raw data, or a pose_blender_pose_data.PoseDataHandle to load it lazily
         self.thumbnail_image = None  # type: QtGui.QImage
+        self.thumbnail_path = ""
         self.is_favorite = False
+        self.tags = []  # searchable with "tag:" in the pose filter
 
         # p4
         self.needs_sync = True
 
+    def get_key(self):
+        """
+        Stable identifier for this pose across refreshes
+        """
+        return self.local_path or self.pose_name
+
+    def get_pose_data(self):
+        """
+        Pose data, loading it now if it was set up as a lazy handle
+        """
+        if isinstance(self.pose_data, pose_blender_pose_data.PoseDataHandle):
+            return self.pose_data.resolve()
+        return self.pose_data
+
+    def release_pose_data(self):
+        if isinstance(self.pose_data, pose_blender_pose_data.PoseDataHandle):
+            self.pose_data.release()
+
     def update(self):
         pass
 
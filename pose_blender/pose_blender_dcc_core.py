@@ -1,3 +1,6 @@
+import contextlib
+
+from . import pose_blender_blend_cache
 from . import pose_blender_constants as k
 from . import pose_blender_logger
 
@@ -17,8 +20,42 @@ class PoseBlenderCoreInterface(object):
         self.blend_pre_values = {}
         self.blend_post_values = {}
 
+        # compiled version of the pre/post values, used when evaluating blends
+        self.blend_cache = pose_blender_blend_cache.BlendCache()
+
+        # values closer than this between pre and post blend are left alone while blending
+        self.blend_delta_epsilon = 1e-6
+
+        # blend session transaction, see begin_blend_session()
+        self.blend_session_active = False
+        self.blend_session_rig = None
+        self.blend_session_weight = 0.0
+        self.blend_session_start_weight = 0.0
+        self.blend_session_updated = False
+        self._undo_suspended = 0
+
+        # pose library change detection, see get_pose_library_paths()
+        self.library_poll_interval_ms = 2000
+        self.library_poll_budget_ms = 5
+
+        # evaluated targets of recent blends, so flipping between poses skips the apply/readback
+        self.blend_target_cache = pose_blender_blend_cache.BlendTargetCache()
+
+        # multi pose mix, several poses blended on top of the same pre blend values
+        self.pose_mix_rig = None
+        self.pose_mix_cache = pose_blender_blend_cache.MultiBlendCache()
+        self.pose_mix_weights = {}  # {pose_asset.get_key(): weight}
+        self.pose_mix_mode = pose_blender_blend_cache.MIX_MODE_NORMALIZED
+
+        # what the last commit_pose_mix() recorded, undo steps go back to it
+        self.pose_mix_committed_weights = {}
+        self.pose_mix_committed_mode = self.pose_mix_mode
+
         self.blend_ignore_attr_names = []
 
+        # {rig_name: AttributePlan}, see get_attribute_plan()
+        self.attribute_plans = {}
+
         self.right_click_menu_items = []
 
     def log_missing_implementation(self, func):
@@ -31,25 +68,461 @@ class PoseBlenderCoreInterface(object):
         self.blend_pose = pose_asset
 
     def cache_pre_blend(self, active_rig):
-        self.blend_pre_values = self.get_control_values(active_rig)
+        attribute_plan = self.get_attribute_plan(active_rig)
+        if attribute_plan.handles:
+            pre_values = self.get_control_values_bulk(attribute_plan.handles)
+            self.blend_pre_values = dict(zip(attribute_plan.handles, pre_values))
+        else:
+            # DCCs that implement get_control_values() instead of list_control_attrs()
+            attribute_plan = None
+            self.blend_pre_values = self.get_control_values(active_rig)
+
+        self.blend_cache.epsilon = self.blend_delta_epsilon
+        self.blend_cache.set_pre_values(self.blend_pre_values, attribute_plan)
 
     def cache_blend_target(self, active_rig):
         self.blend_post_values = self.get_control_values(active_rig)
+        self.blend_cache.set_post_values(self.blend_post_values)
 
     def get_control_values(self, active_rig):
-        return {}
+        handles = self.get_attribute_plan(active_rig).handles
+        return dict(zip(handles, self.get_control_values_bulk(handles)))
+
+    def get_attribute_plan(self, active_rig):
+        """
+        The blendable attributes of the current controllers of active_rig, from list_control_attrs().
+
+        Cached per rig and only rebuilt when the controllers or blend_ignore_attr_names change,
+        call invalidate_attribute_plans() when the rig itself changed (renamed, rebuilt, re-referenced).
+
+        Returns:
+            pose_blender_blend_cache.AttributePlan
+        """
+        controllers = self.get_controllers(active_rig)
+        ignore_attr_names = frozenset(self.blend_ignore_attr_names)
+        plan_key = (tuple(controllers), ignore_attr_names)
+
+        attribute_plan = self.attribute_plans.get(active_rig)
+        if attribute_plan is None or attribute_plan.key != plan_key:
+            attrs = self.list_control_attrs(active_rig, controllers, ignore_attr_names)
+            attribute_plan = pose_blender_blend_cache.AttributePlan(plan_key, attrs)
+            self.attribute_plans[active_rig] = attribute_plan
+        return attribute_plan
+
+    def invalidate_attribute_plans(self, active_rig=None):
+        """
+        Args:
+            active_rig: only drop the plan of this rig, all of them if None
+        """
+        if active_rig is None:
+            self.attribute_plans.clear()
+        else:
+            self.attribute_plans.pop(active_rig, None)
+
+    def cache_blend_pose(self, pose_asset, active_rig):
+        """
+        Get everything ready for blend_cached_pose(), leaving the scene at weight 0.
+
+        The target comes from blend_target_cache when this pose was blended on the same
+        controllers before, then from evaluate_pose_asset(), and if that isn't implemented
+        the pose is applied and read back from the scene.
+
+        Returns:
+            bool: True if the target came from the cache
+        """
+        self.set_blend_pose(pose_asset)
+        self.cache_pre_blend(active_rig)
+
+        cache_key = self.blend_target_cache.get_key(pose_asset, active_rig, self.blend_cache.handles)
+        target_values = self.blend_target_cache.get(cache_key, pose_asset)
+        if target_values is not None:
+            self.blend_post_values = dict(self.blend_pre_values)
+            self.blend_post_values.update(target_values)
+            self.blend_cache.set_post_values(target_values)
+            return True
+
+        target_values = self.evaluate_pose_asset(pose_asset, active_rig)
+        if target_values is not None:
+            self.blend_post_values = dict(self.blend_pre_values)
+            self.blend_post_values.update(target_values)
+            self.blend_cache.set_post_values(target_values)
+        else:
+            with self.undo_suspended():
+                self.apply_pose_asset(pose_asset, active_rig)
+            self.cache_blend_target(active_rig)
+            self.blend_cached_pose(weight=0, undoable=False)
+
+            target_values = self.get_read_back_target(pose_asset, active_rig)
+            if target_values is None:
+                return False  # can't tell which channels the pose sets, so nothing to reuse
+
+        self.blend_target_cache.set(cache_key, pose_asset, target_values)
+        return False
+
+    def get_read_back_target(self, pose_asset, active_rig):
+        """
+        The channels of a pose that was applied and read back, for blend_target_cache.
+
+        Only the channels the pose sets are kept, the others have to follow the scene on later blends.
+        That includes channels the pose sets to the value they already had, those differ from the
+        pre values of later blends. Which channels those are comes from get_pose_attr_names().
+
+        Returns:
+            dict: {handle: target_value}, None if the channels of the pose aren't known
+        """
+        attr_names = self.get_pose_attr_names(pose_asset)
+        attribute_plan = self.get_attribute_plan(active_rig)
+        if attr_names is None or not attribute_plan.handles:
+            return None
+
+        name_indices = attribute_plan.name_indices
+        handles = [attribute_plan.handles[name_indices[name]] for name in attr_names if name in name_indices]
+        target_values = {handle: self.blend_post_values[handle] for handle in handles}
+
+        # names that don't cover what the read back changed aren't the names of this pose's channels
+        if any(handle not in target_values for handle in self.blend_cache.changed_handles):
+            return None
+        return target_values
+
+    def blend_cached_pose(self, weight, undoable=True):
+        blend_values = self.blend_cache.evaluate(weight)
+        self.set_control_values_bulk(self.blend_cache.changed_handles, blend_values, undoable=undoable)
+
+    ######################################################################################
+    # blend session transactions
+    #
+    # begin_blend_session(pose, rig)  - cache pre values and the target, scene stays as it is
+    # update_blend_session(weight)    - any number of times while dragging, not recorded for undo
+    # commit_blend_session()          - the final weight is written as one undoable step
+    # cancel_blend_session()          - back to where the session started in one write, nothing recorded
+
+    def begin_blend_session(self, pose_asset, active_rig):
+        """
+        Returns:
+            bool: True if the blend target came from the cache, or the previous session on this pose was resumed
+        """
+        if self.blend_session_active:
+            self.commit_blend_session()
+
+        # same pose again, keep blending from the same pre blend values
+        is_resume = self.blend_pose is pose_asset and self.blend_session_rig == active_rig and len(self.blend_cache)
+        if is_resume:
+            from_cache = True
+        else:
+            from_cache = self.cache_blend_pose(pose_asset, active_rig)
+            self.blend_session_weight = 0.0
+
+        self.blend_session_active = True
+        self.blend_session_rig = active_rig
+        self.blend_session_start_weight = self.blend_session_weight
+        self.blend_session_updated = False
+        return from_cache
+
+    def update_blend_session(self, weight):
+        if not self.blend_session_active:
+            return
+        self.blend_session_weight = weight
+        self.blend_session_updated = True
+        self.blend_cached_pose(weight, undoable=False)
+
+    def commit_blend_session(self):
+        if not self.blend_session_active:
+            return
+        self.blend_session_active = False
+        if not self.blend_session_updated:
+            return  # nothing was written, nothing to record
+
+        # intermediate writes weren't recorded, so step back to where the session started
+        # unrecorded and write the final values as one undo step that undoes back to there
+        self.rewind_blend_session()
+        self.blend_cached_pose(self.blend_session_weight, undoable=True)
+
+    def cancel_blend_session(self):
+        if not self.blend_session_active:
+            return
+        self.blend_session_active = False
+        self.blend_session_weight = self.blend_session_start_weight
+        self.rewind_blend_session()
+
+    def rewind_blend_session(self):
+        """
+        Back to where the session started without recording undo,
+        which is the pre blend values unless a previous session was resumed
+        """
+        if self.blend_session_start_weight:
+            self.blend_cached_pose(self.blend_session_start_weight, undoable=False)
+        else:
+            self.restore_pre_blend_values()
+
+    def restore_pre_blend_values(self):
+        """
+        Put the blended channels back to blend_pre_values in one bulk write, without recording undo
+        """
+        # only the changed channels are ever written while blending, so those are the ones to restore
+        blend_cache = self.blend_cache
+        pre_values = blend_cache.changed_pre_values.tolist()
+        self.set_control_values_bulk(blend_cache.changed_handles, pre_values, undoable=False)
+
+    @contextlib.contextmanager
+    def undo_suspended(self):
+        """
+        Writes going through set_control_values() inside this block are not recorded for undo
+        """
+        self._undo_suspended += 1
+        try:
+            yield
+        finally:
+            self._undo_suspended -= 1
+
+    ######################################################################################
+    # baking
+
+    def bake_blend_pose(self, pose_asset, active_rig, start_frame, end_frame, easing=None, frame_step=1):
+        """
+        Key a transition from the current pose into pose_asset over a frame range.
+
+        Every frame of every changed channel is evaluated in one pass from the blend cache,
+        then handed to set_keyframes_bulk() so DCCs can write whole curves at once.
+        Channels the pose doesn't change are not keyed.
+
+        Args:
+            pose_asset (k.PoseAsset):
+            active_rig:
+            start_frame (float): keyed with the current pose
+            end_frame (float): keyed with pose_asset
+            easing (str or callable): see pose_blender_blend_cache.get_easing_weights(), linear by default
+            frame_step (float):
+
+        Returns:
+            int: number of keys written
+        """
+        if self.blend_session_active:
+            self.commit_blend_session()
+
+        frame_count = int(round((end_frame - start_frame) / float(frame_step))) + 1
+        frames = [start_frame + frame_step * index for index in range(max(frame_count, 0))]
+        weights = pose_blender_blend_cache.get_easing_weights(
+            len(frames),
+            easing or pose_blender_blend_cache.EASING_LINEAR,
+        )
+
+        self.cache_blend_pose(pose_asset, active_rig)
+        blend_cache = self.blend_cache
 
-    def blend_cached_pose(self, weight):
+        # the cache now starts from the current values, a later session on this pose resumes from weight 0
+        self.blend_session_rig = active_rig
+        self.blend_session_weight = 0.0
+
+        if not blend_cache.changed_count or not frames:
+            return 0
+
+        channel_values = blend_cache.evaluate_frames(weights)
+        self.set_keyframes_bulk(blend_cache.changed_handles, frames, channel_values)
+        return blend_cache.changed_count * len(frames)
+
+    ######################################################################################
+
+    def get_blend_channel_counts(self):
+        """
+        Returns:
+            tuple: (changed_channel_count, cached_channel_count) for the active blend
+        """
+        return self.blend_cache.changed_count, len(self.blend_cache)
+
+    def apply_pose(self, pose_asset, rig_name):
+        """
+        Apply through evaluate_pose_asset() when it's implemented, otherwise through apply_pose_asset()
+        """
+        value_table = self.evaluate_pose_asset(pose_asset, rig_name)
+        if value_table is None:
+            self.apply_pose_asset(pose_asset, rig_name)
+        else:
+            self.set_control_values(value_table)
+
+    def start_pose_mix(self, active_rig):
+        """
+        Start a new mix from the current values of active_rig
+        """
+        self.pose_mix_rig = active_rig
+        self.pose_mix_weights = {}
+        self.pose_mix_committed_weights = {}
+        self.pose_mix_committed_mode = self.pose_mix_mode
+        self.pose_mix_cache.epsilon = self.blend_delta_epsilon
+        self.pose_mix_cache.set_pre_values(self.get_control_values(active_rig))
+
+    def add_mix_pose(self, pose_asset, weight=0.0):
+        """
+        Cache the values of pose_asset as a target of the active mix.
+        Without evaluate_pose_asset() the pose is applied to read its values, the mix is written back right after.
+        """
+        target_values = self.evaluate_pose_asset(pose_asset, self.pose_mix_rig)
+        if target_values is None:
+            # apply on top of the pre blend values, not the current mix, or the target picks up the other poses
+            mix_cache = self.pose_mix_cache
+            self.set_control_values_bulk(mix_cache.changed_handles, mix_cache.changed_pre_values.tolist(), undoable=False)
+            with self.undo_suspended():
+                self.apply_pose_asset(pose_asset, self.pose_mix_rig)
+            target_values = self.get_control_values(self.pose_mix_rig)
+
+        pose_key = pose_asset.get_key()
+        self.pose_mix_cache.add_target(pose_key, target_values)
+        self.pose_mix_weights[pose_key] = weight
+        self.blend_pose_mix(undoable=False)
+
+    def remove_mix_pose(self, pose_asset):
+        mix_cache = self.pose_mix_cache
+        previous_handles = mix_cache.changed_handles
+
+        pose_key = pose_asset.get_key()
+        mix_cache.remove_target(pose_key)
+        self.pose_mix_weights.pop(pose_key, None)
+        self.pose_mix_committed_weights.pop(pose_key, None)
+
+        # channels only the removed pose touched go back to their pre blend value
+        still_changed = set(mix_cache.changed_handles)
+        restore_handles = [handle for handle in previous_handles if handle not in still_changed]
+        if restore_handles:
+            restore_indices = [mix_cache.handle_indices[handle] for handle in restore_handles]
+            restore_values = [float(mix_cache.pre_values[index]) for index in restore_indices]
+            self.set_control_values_bulk(restore_handles, restore_values, undoable=False)
+
+        self.blend_pose_mix(undoable=False)
+
+    def blend_pose_mix(self, weights=None, undoable=True):
+        """
+        Write the weighted mix of all targets in one go
+
+        Args:
+            weights (dict): {pose_asset.get_key(): weight} to update before blending
+            undoable (bool): False while weights are being dragged, see commit_pose_mix()
+        """
+        if weights:
+            self.pose_mix_weights.update(weights)
+
+        mix_cache = self.pose_mix_cache
+        if not mix_cache.changed_count:
+            return
+
+        self.write_pose_mix(self.pose_mix_weights, self.pose_mix_mode, undoable=undoable)
+
+    def write_pose_mix(self, weights, mode, undoable=True):
+        mix_cache = self.pose_mix_cache
+        mix_weights = [weights.get(key, 0.0) for key in mix_cache.target_keys]
+        blend_values = mix_cache.evaluate(mix_weights, mode)
+        self.set_control_values_bulk(mix_cache.changed_handles, blend_values, undoable=undoable)
+
+    def commit_pose_mix(self):
+        """
+        Record the current mix as one undo step, same as commit_blend_session()
+        """
+        mix_cache = self.pose_mix_cache
+        if not mix_cache.changed_count:
+            return
+
+        current_weights = [self.pose_mix_weights.get(key, 0.0) for key in mix_cache.target_keys]
+        committed_weights = [self.pose_mix_committed_weights.get(key, 0.0) for key in mix_cache.target_keys]
+        if current_weights == committed_weights and self.pose_mix_mode == self.pose_mix_committed_mode:
+            return  # nothing changed since the last commit, don't record an empty undo step
+
+        # step back to the last committed mix unrecorded, so the undo step goes back to it
+        self.write_pose_mix(self.pose_mix_committed_weights, self.pose_mix_committed_mode, undoable=False)
+        self.blend_pose_mix(undoable=True)
+        self.pose_mix_committed_weights = dict(self.pose_mix_weights)
+        self.pose_mix_committed_mode = self.pose_mix_mode
+
+    def clear_pose_mix(self):
+        """
+        End the mix, leaving the scene as it is
+        """
+        self.pose_mix_rig = None
+        self.pose_mix_weights = {}
+        self.pose_mix_committed_weights = {}
+        self.pose_mix_cache.clear()
+
+    def is_pose_mix_active(self):
+        return self.pose_mix_rig is not None
+
+    def set_control_values(self, value_table, undoable=True):
+        """
+        Push a {attr: value} dict into the scene, apply_pose_asset implementations should go through this
+        """
+        if self._undo_suspended:
+            undoable = False
+        self.set_control_values_bulk(list(value_table.keys()), list(value_table.values()), undoable=undoable)
+
+    def get_control_values_bulk(self, attrs):
+        """
+        Read the values of many attributes at once.
+        Falls back to get_control_value() per attribute, DCCs should override this with a batched call.
+        """
+        return [self.get_control_value(attr) for attr in attrs]
+
+    def set_control_values_bulk(self, attrs, values, undoable=True):
+        """
+        Write many attribute values at once, attrs and values are aligned by index.
+        Falls back to set_control_value() per attribute, DCCs should override this with a batched call.
+
+        Args:
+            attrs (list): attribute handles as returned by get_control_values()
+            values (list): float values to set
+            undoable (bool): whether the DCC should record this write for undo
+        """
+        for attr, value in zip(attrs, values):
+            self.set_control_value(attr, value)
+
+    def set_keyframes_bulk(self, attrs, frames, channel_values):
+        """
+        Key many attributes over many frames at once, DCCs should override this with a batched call.
+        Falls back to set_keyframe() per attribute and frame.
+
+        Args:
+            attrs (list): attribute handles as returned by get_control_values()
+            frames (list): frame numbers, shared by every attribute
+            channel_values (list): a list of values per attribute, aligned to frames
+        """
+        # neither is implemented, say so once instead of once per key
+        if self.set_keyframe.__func__ is PoseBlenderCoreInterface.__dict__["set_keyframe"]:
+            self.log_missing_implementation(self.set_keyframes_bulk)
+            return
+
+        for attr, values in zip(attrs, channel_values):
+            for frame, value in zip(frames, values):
+                self.set_keyframe(attr, frame, value)
+
+    def set_keyframe(self, attr, frame, value):
+        self.log_missing_implementation(self.set_keyframe)
+
+    def get_control_value(self, attr):
+        return None
+
+    def set_control_value(self, attr, value):
         pass
 
     def remove_caches(self):
+        self.blend_session_active = False
+        self.blend_session_rig = None
         self.blend_pose = None
         self.blend_pre_values = {}
         self.blend_post_values = {}
+        self.blend_cache.clear()
 
     def get_controllers(self, active_rig):
         return []
 
+    def list_control_attrs(self, active_rig, controllers, ignore_attr_names):
+        """
+        List the blendable attributes of controllers, only called when the attribute plan needs a rebuild.
+
+        Args:
+            active_rig:
+            controllers (list): as returned by get_controllers()
+            ignore_attr_names (frozenset): attribute names to leave out
+
+        Returns:
+            list: (attr handle, "controller.attr" name without namespace) per attribute
+        """
+        return []
+
     ######################################################################################
     # Required Project/Studio implementations
 
@@ -58,6 +531,12 @@ class PoseBlenderCoreInterface(object):
         return {"Example Rig": None}  # {rig_name: rig_node}
 
     def get_poses(self):
+        """
+        Returns:
+            list: PoseAsset, or a pose_blender_library.PoseLibrary for large libraries.
+                  Can also be a generator (or async generator) to stream poses into the UI as they are found,
+                  see pose_blender_pose_stream
+        """
         self.log_missing_implementation(self.get_poses)
 
         # example setup
@@ -74,11 +553,64 @@ class PoseBlenderCoreInterface(object):
         return pose_assets  # type: [k.PoseAsset]
 
     def apply_pose_asset(self, pose_asset, rig_name):
+        """
+        Use pose_asset.get_pose_data() to read the pose, it may be loaded lazily.
+        Values should be pushed through set_control_values() so DCCs can batch the writes.
+        """
         pass
 
     ######################################################################################
     # Optional implementations
 
+    def evaluate_pose_asset(self, pose_asset, rig_name):
+        """
+        Compute the values pose_asset would set on rig_name, without touching the scene.
+
+        Lets blending and applying skip the apply_pose_asset() + read back round trip,
+        which costs a full scene write and read, fires DCC callbacks and adds undo entries.
+
+        Returns:
+            dict: {attr: value} with attrs matching the handles of get_control_values(),
+                  or None when this isn't supported and apply_pose_asset() should be used
+        """
+        return None
+
+    def get_pose_attr_names(self, pose_asset):
+        """
+        The "controller.attr" names (without namespace) pose_asset sets, matching the names of list_control_attrs().
+        Lets blend targets that were read back from the scene be cached, see get_read_back_target().
+
+        Returns:
+            list: or None when unknown, by default the keys of {attribute_name: value} pose data
+        """
+        pose_data = pose_asset.get_pose_data()
+        if isinstance(pose_data, dict):
+            return list(pose_data.keys())
+        return None
+
+    def get_pose_library_paths(self):
+        """
+        Folders the UI should watch for pose files being added, removed or edited.
+        Polled every library_poll_interval_ms for at most library_poll_budget_ms, see pose_blender_library_watcher.
+
+        Returns:
+            list: folder paths, empty to only update on Refresh
+        """
+        return []
+
+    def get_changed_pose_assets(self, changes):
+        """
+        Build PoseAssets for the pose files the library watcher found added or modified,
+        a PoseLibraryIndex based implementation can return index.apply_changes(changes).
+
+        Args:
+            changes (pose_blender_library_watcher.LibraryChanges):
+
+        Returns:
+            list: PoseAsset, or None to pick up the changes with an incremental get_poses() refresh instead
+        """
+        return None
+
     def set_pose_favorite_state(self, pose_asset, state=True):
         self.log_missing_implementation(self.set_pose_favorite_state)
         pass
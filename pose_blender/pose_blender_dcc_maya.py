@@ -1,3 +1,5 @@
+import maya.OpenMaya as om
+import maya.OpenMayaAnim as oma
 import pymel.core as pm
 from . import pose_blender_dcc_core
 
@@ -7,25 +9,103 @@ class PoseBlenderMaya(pose_blender_dcc_core.PoseBlenderCoreInterface):
     def __init__(self):
         super(PoseBlenderMaya, self).__init__()
 
+        # {pm.Attribute: (om.MPlug, attr_type)}
+        self._api_plugs = {}
+
     def get_controllers(self, active_rig):
         return pm.selected()
 
-    def get_control_values(self, active_rig):
-        current_pose = {}
-        for controls in self.get_controllers(active_rig):
+    def list_control_attrs(self, active_rig, controllers, ignore_attr_names):
+        # rebuilt with the attribute plan so plugs of deleted nodes don't linger
+        self._api_plugs = {}
+
+        attrs = []
+        for controls in controllers:
             for a in controls.listAttr(keyable=True, userDefined=False):
-                if a.attrName() in self.blend_ignore_attr_names:
+                if a.attrName() in ignore_attr_names:
                     continue
-                current_pose[a] = a.get()
-        return current_pose
+                attrs.append((a, a.name().rpartition(":")[2]))
+        return attrs
+
+    def get_control_value(self, attr):
+        return attr.get()
+
+    def set_control_value(self, attr, value):
+        attr.set(value)
+
+    def get_control_values_bulk(self, attrs):
+        values = []
+        for attr in attrs:
+            plug, attr_type = self.get_api_plug(attr)
+            if attr_type == "doubleAngle":
+                values.append(plug.asMAngle().asUnits(om.MAngle.uiUnit()))
+            elif attr_type == "doubleLinear":
+                values.append(plug.asMDistance().asUnits(om.MDistance.uiUnit()))
+            else:
+                values.append(plug.asDouble())
+        return values
+
+    def set_control_values_bulk(self, attrs, values, undoable=True):
+        if undoable:
+            # API modifiers don't end up in the undo queue, so go through pymel in a single chunk
+            pm.undoInfo(openChunk=True)
+            try:
+                for attr, value in zip(attrs, values):
+                    attr.set(value)
+            finally:
+                pm.undoInfo(closeChunk=True)
+            return
+
+        modifier = om.MDGModifier()
+        for attr, value in zip(attrs, values):
+            plug, attr_type = self.get_api_plug(attr)
+            if attr_type == "doubleAngle":
+                modifier.newPlugValueMAngle(plug, om.MAngle(value, om.MAngle.uiUnit()))
+            elif attr_type == "doubleLinear":
+                modifier.newPlugValueMDistance(plug, om.MDistance(value, om.MDistance.uiUnit()))
+            elif attr_type in ("bool", "enum", "long", "short", "byte"):
+                modifier.newPlugValueInt(plug, int(round(value)))
+            else:
+                modifier.newPlugValueDouble(plug, value)
+        modifier.doIt()
+
+    def set_keyframes_bulk(self, attrs, frames, channel_values):
+        # one MFnAnimCurve.addKeys() per attribute instead of a setKeyframe per attribute and frame,
+        # goes through the API so like the unrecorded path of set_control_values_bulk() it isn't undoable
+        time_unit = om.MTime.uiUnit()
+        times = om.MTimeArray()
+        for frame in frames:
+            times.append(om.MTime(frame, time_unit))
+
+        anim_curve_fn = oma.MFnAnimCurve()
+        for attr, values in zip(attrs, channel_values):
+            plug, attr_type = self.get_api_plug(attr)
 
-    def blend_cached_pose(self, weight):
-        for attr, pre_val in self.blend_pre_values.items():
-            target_val = self.blend_post_values.get(attr)
+            curve_values = om.MDoubleArray()
+            for value in values:
+                if attr_type == "doubleAngle":
+                    value = om.MAngle(value, om.MAngle.uiUnit()).asRadians()
+                elif attr_type == "doubleLinear":
+                    value = om.MDistance(value, om.MDistance.uiUnit()).asCentimeters()
+                curve_values.append(value)
 
-            blend_result = float_lerp(pre_val, target_val, weight)
-            attr.set(blend_result)
+            anim_curves = om.MObjectArray()
+            if oma.MAnimUtil.findAnimation(plug, anim_curves) and anim_curves.length():
+                anim_curve_fn.setObject(anim_curves[0])
+            else:
+                anim_curve_fn.create(plug)
 
+            anim_curve_fn.addKeys(
+                times,
+                curve_values,
+                oma.MFnAnimCurve.kTangentGlobal,
+                oma.MFnAnimCurve.kTangentGlobal,
+                True,  # keep the keys outside of the baked range
+            )
 
-def float_lerp(float_a, float_b, interp_val):
-    return float_a + (float_b - float_a) * interp_val
+    def get_api_plug(self, attr):
+        plug_info = self._api_plugs.get(attr)
+        if plug_info is None:
+            plug_info = (attr.__apimplug__(), attr.type())
+            self._api_plugs[attr] = plug_info
+        return plug_info
@@ -0,0 +1,285 @@
+"""
+In-memory DCC, for measuring and testing Pose Blender outside of a real DCC.
+
+The scene is rig_count rigs with controller_count controllers and channel names per controller,
+attribute values live in a plain dict keyed by "rig:controller.channel". Poses are synthetic,
+generated from a seed and stored without the rig namespace like a real pose library would.
+
+Attribute access can be given a per-call cost to stand in for DCC call overhead:
+
+    dcc = PoseBlenderSimulated(controller_count=500, get_latency=2e-6, set_latency=5e-6)
+
+Start the standalone tool with it by setting POSE_BLENDER_DCC=simulated.
+"""
+import random
+import time
+
+from . import pose_blender_constants as k
+from . import pose_blender_dcc_core
+from . import pose_blender_library
+from . import pose_blender_pose_data
+from . import pose_blender_timing
+
+DEFAULT_CHANNEL_NAMES = tuple("{}{}".format(t, a) for t in ("translate", "rotate", "scale") for a in "XYZ")
+
+
+def spend_time(seconds):
+    """
+    Burn seconds of wall time, busy waiting since sleep() can't do microseconds
+    """
+    if seconds <= 0:
+        return
+    if seconds > 0.002:
+        time.sleep(seconds)
+        return
+    end_time = pose_blender_timing.clock() + seconds
+    while pose_blender_timing.clock() < end_time:
+        pass
+
+
+class PoseBlenderSimulated(pose_blender_dcc_core.PoseBlenderCoreInterface):
+    def __init__(
+            self,
+            rig_count=1,
+            controller_count=50,
+            channel_names=DEFAULT_CHANNEL_NAMES,
+            pose_count=100,
+            pose_channel_ratio=1.0,
+            get_latency=0.0,
+            set_latency=0.0,
+            call_latency=0.0,
+            use_pose_library=False,
+            stream_poses=False,
+            scan_latency=0.0,
+            evaluate_poses=True,
+            seed=0,
+    ):
+        """
+        Args:
+            rig_count (int):
+            controller_count (int): controllers per rig
+            channel_names (tuple): keyable channels per controller
+            pose_count (int): size of the synthetic pose library
+            pose_channel_ratio (float): fraction of the controllers stored in each pose
+            get_latency (float): seconds per attribute read
+            set_latency (float): seconds per attribute write
+            call_latency (float): seconds per get/set call, bulk calls pay it once
+            use_pose_library (bool): get_poses() returns a pose_blender_library.PoseLibrary
+            stream_poses (bool): get_poses() returns a generator, like a library scanned on the fly
+            scan_latency (float): seconds per pose yielded when streaming
+            evaluate_poses (bool): implement evaluate_pose_asset(), off to go through the scene like a DCC without it
+            seed (int): for the synthetic pose values
+        """
+        super(PoseBlenderSimulated, self).__init__()
+        self.rig_names = ["sim_rig_{}".format(i) for i in range(rig_count)]
+        self.controller_names = ["ctrl_{:04d}".format(i) for i in range(controller_count)]
+        self.channel_names = tuple(channel_names)
+
+        self.pose_count = pose_count
+        self.pose_channel_ratio = pose_channel_ratio
+        self.use_pose_library = use_pose_library
+        self.stream_poses = stream_poses
+        self.scan_latency = scan_latency
+        self.evaluate_poses = evaluate_poses
+        self.seed = seed
+
+        self.get_latency = get_latency
+        self.set_latency = set_latency
+        self.call_latency = call_latency
+
+        # {"rig:controller.channel": value}
+        self.attribute_values = {}
+        for rig_name in self.rig_names:
+            for controller_name in self.controller_names:
+                for channel_name in self.channel_names:
+                    self.attribute_values[self.get_attr_name(rig_name, controller_name, channel_name)] = 0.0
+
+        # controller names without namespace, empty means the whole rig
+        self.selection = []
+
+        # a list of {attr: previous_value} per undoable write
+        self.undo_stack = []
+
+        # {attr: {frame: value}}
+        self.keyframes = {}
+
+        self.call_counts = {
+            "list_control_attrs": 0,
+            "get_control_value": 0,
+            "set_control_value": 0,
+            "get_control_values_bulk": 0,
+            "set_control_values_bulk": 0,
+            "set_keyframes_bulk": 0,
+            "attributes_read": 0,
+            "attributes_written": 0,
+            "keys_written": 0,
+        }
+
+        self._pose_assets = None
+
+    @staticmethod
+    def get_attr_name(rig_name, controller_name, channel_name):
+        return "{}:{}.{}".format(rig_name, controller_name, channel_name)
+
+    def reset_call_counts(self):
+        for key in self.call_counts:
+            self.call_counts[key] = 0
+
+    def reset_scene(self):
+        for attr in self.attribute_values:
+            self.attribute_values[attr] = 0.0
+        self.undo_stack = []
+        self.keyframes = {}
+
+    ######################################################################################
+    # attribute store
+
+    def get_controllers(self, active_rig):
+        controller_names = self.selection or self.controller_names
+        return ["{}:{}".format(active_rig, controller_name) for controller_name in controller_names]
+
+    def list_control_attrs(self, active_rig, controllers, ignore_attr_names):
+        self.call_counts["list_control_attrs"] += 1
+        attrs = []
+        for controller in controllers:
+            controller_name = controller.rpartition(":")[2]
+            for channel_name in self.channel_names:
+                if channel_name in ignore_attr_names:
+                    continue
+                attrs.append((
+                    "{}.{}".format(controller, channel_name),
+                    "{}.{}".format(controller_name, channel_name),
+                ))
+        return attrs
+
+    def get_control_value(self, attr):
+        self.call_counts["get_control_value"] += 1
+        self.call_counts["attributes_read"] += 1
+        spend_time(self.call_latency + self.get_latency)
+        return self.attribute_values[attr]
+
+    def set_control_value(self, attr, value):
+        self.call_counts["set_control_value"] += 1
+        self.call_counts["attributes_written"] += 1
+        spend_time(self.call_latency + self.set_latency)
+        self.attribute_values[attr] = value
+
+    def get_control_values_bulk(self, attrs):
+        self.call_counts["get_control_values_bulk"] += 1
+        self.call_counts["attributes_read"] += len(attrs)
+        spend_time(self.call_latency + self.get_latency * len(attrs))
+
+        attribute_values = self.attribute_values
+        return [attribute_values[attr] for attr in attrs]
+
+    def set_control_values_bulk(self, attrs, values, undoable=True):
+        self.call_counts["set_control_values_bulk"] += 1
+        self.call_counts["attributes_written"] += len(attrs)
+        spend_time(self.call_latency + self.set_latency * len(attrs))
+
+        attribute_values = self.attribute_values
+        if undoable:
+            self.undo_stack.append({attr: attribute_values[attr] for attr in attrs})
+
+        for attr, value in zip(attrs, values):
+            attribute_values[attr] = float(value)
+
+    def set_keyframes_bulk(self, attrs, frames, channel_values):
+        key_count = len(attrs) * len(frames)
+        self.call_counts["set_keyframes_bulk"] += 1
+        self.call_counts["keys_written"] += key_count
+        spend_time(self.call_latency + self.set_latency * key_count)
+
+        for attr, values in zip(attrs, channel_values):
+            self.keyframes.setdefault(attr, {}).update(zip(frames, values))
+
+    def undo(self):
+        """
+        Returns:
+            bool: whether there was anything to undo
+        """
+        if not self.undo_stack:
+            return False
+        self.attribute_values.update(self.undo_stack.pop())
+        return True
+
+    ######################################################################################
+    # synthetic poses
+
+    def generate_pose_data(self, pose_index):
+        """
+        Returns:
+            dict: {"controller.channel": value}, without rig namespace
+        """
+        rand = random.Random(self.seed * 1000003 + pose_index)
+        stored_count = max(1, int(len(self.controller_names) * self.pose_channel_ratio))
+        pose_controllers = self.controller_names[:stored_count]
+
+        pose_data = {}
+        for controller_name in pose_controllers:
+            for channel_name in self.channel_names:
+                if channel_name.startswith("scale"):
+                    value = 1.0 + rand.uniform(-0.1, 0.1)
+                else:
+                    value = rand.uniform(-45.0, 45.0)
+                pose_data["{}.{}".format(controller_name, channel_name)] = value
+        return pose_data
+
+    def create_pose_assets(self):
+        pose_assets = []
+        for pose_index in range(self.pose_count):
+            pose_asset = k.PoseAsset()
+            pose_asset.pose_name = "sim_pose_{}".format(pose_index)
+            pose_asset.local_path = "sim://poses/group_{}/sim_pose_{}.pose".format(pose_index % 10, pose_index)
+            pose_asset.tags = ["group_{}".format(pose_index % 10)]
+            pose_asset.needs_sync = False
+            pose_asset.pose_data = pose_blender_pose_data.PoseDataHandle(
+                lambda pose_index=pose_index: self.generate_pose_data(pose_index)
+            )
+            pose_assets.append(pose_asset)
+
+        if self.use_pose_library:
+            return pose_blender_library.PoseLibrary.from_pose_assets(pose_assets)
+        return pose_assets
+
+    def get_poses(self):
+        # the same objects every refresh, like a library that hasn't changed on disk
+        if self._pose_assets is None:
+            self._pose_assets = self.create_pose_assets()
+        if self.stream_poses:
+            return self.iter_poses()
+        return self._pose_assets
+
+    def iter_poses(self):
+        for pose_asset in self._pose_assets:
+            spend_time(self.scan_latency)
+            yield pose_asset
+
+    def get_rigs_in_scene(self):
+        return {rig_name: rig_name for rig_name in self.rig_names}
+
+    def apply_pose_asset(self, pose_asset, rig_name):
+        self.set_control_values(self.get_pose_value_table(pose_asset, rig_name))
+
+    def evaluate_pose_asset(self, pose_asset, rig_name):
+        if not self.evaluate_poses:
+            return None
+        return self.get_pose_value_table(pose_asset, rig_name)
+
+    def get_pose_value_table(self, pose_asset, rig_name):
+        pose_data = pose_asset.get_pose_data() or {}
+
+        # pose data is stored without namespace, same as the plan names
+        attribute_plan = self.get_attribute_plan(rig_name)
+        handles = attribute_plan.handles
+        name_indices = attribute_plan.name_indices
+
+        value_table = {}
+        for attr_name, value in pose_data.items():
+            index = name_indices.get(attr_name)
+            if index is not None:
+                value_table[handles[index]] = value
+        return value_table
+
+    def set_pose_favorite_state(self, pose_asset, state=True):
+        pose_asset.is_favorite = state
@@ -0,0 +1,363 @@
+"""
+Column-wise storage for large pose libraries.
+
+Instead of a full PoseAsset per pose, PoseLibrary keeps every field in a column:
+interned strings, bit arrays for the favorite/sync flags and offsets into a shared
+pose data buffer. PoseAssetView objects are handed out on demand, they hold nothing but
+their library and row and read/write straight through to the columns.
+
+    library = PoseLibrary()
+    library.add_pose(local_path=path, pose_name=name, needs_sync=False)
+    return library  # from get_poses(), it iterates as PoseAsset views
+"""
+import array
+import functools
+
+from . import pose_blender_constants as k
+from . import pose_blender_pose_data
+
+NO_STRING = 0  # string id of ""
+
+# pose data offsets can go past 2GB, py2 arrays have no long long so fall back to long,
+# which is only 32 bit on Windows, so py2 on Windows is limited to 2GB pose data buffers
+try:
+    OFFSET_TYPECODE = array.array("q").typecode
+except ValueError:
+    OFFSET_TYPECODE = "l"
+
+
+def split_local_path(local_path):
+    """
+    Split at the last separator, keeping it on the directory, so directory + file_name == local_path
+
+    Returns:
+        tuple: (directory, file_name)
+    """
+    local_path = local_path or ""
+    split_index = max(local_path.rfind("/"), local_path.rfind("\\")) + 1
+    return local_path[:split_index], local_path[split_index:]
+
+
+class StringTable(object):
+    """
+    Interned strings, addressed by integer id
+    """
+
+    def __init__(self):
+        self.strings = [""]
+        self.string_ids = {"": NO_STRING}
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, text):
+        text = text or ""
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(text)
+            self.string_ids[text] = string_id
+        return string_id
+
+    def get(self, string_id):
+        return self.strings[string_id]
+
+
+class BitArray(object):
+    def __init__(self):
+        self.data = bytearray()
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, state):
+        if self.length % 8 == 0:
+            self.data.append(0)
+        self.length += 1
+        self.set(self.length - 1, state)
+
+    def get(self, index):
+        return bool(self.data[index >> 3] & (1 << (index & 7)))
+
+    def set(self, index, state):
+        if state:
+            self.data[index >> 3] |= 1 << (index & 7)
+        else:
+            self.data[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+class PoseLibrary(object):
+    def __init__(self, pose_data_buffer=None, pose_data_parser=None):
+        """
+        Args:
+            pose_data_buffer: buffer (bytes/mmap) that pose_data_offset/size in add_pose() point into
+            pose_data_parser (callable): parser(buffer_slice) -> pose data
+        """
+        self.pose_data_buffer = pose_data_buffer
+        self.pose_data_parser = pose_data_parser
+
+        self.strings = StringTable()
+
+        # local paths are stored as interned directory + file name, libraries share a lot of folders
+        self.directory_ids = array.array("I")
+        self.file_name_ids = array.array("I")
+        self.pose_name_ids = array.array("I")
+        self.thumbnail_path_ids = array.array("I")
+
+        self.favorite_flags = BitArray()
+        self.sync_flags = BitArray()
+
+        # -1 when the pose has no data in pose_data_buffer
+        self.pose_data_offsets = array.array(OFFSET_TYPECODE)
+        self.pose_data_sizes = array.array(OFFSET_TYPECODE)
+
+        # sparse columns, most poses don't have these
+        self.pose_data_objects = {}  # {row: pose data / PoseDataHandle}
+        self.pose_data_handles = {}  # {row: PoseDataHandle}, into pose_data_buffer, made on first access
+        self.tag_ids = {}  # {row: [string_id]}
+        self.thumbnail_images = {}  # {row: QtGui.QImage}
+
+    def __len__(self):
+        return len(self.pose_name_ids)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("PoseLibrary row out of range: {}".format(row))
+        return PoseAssetView(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield PoseAssetView(self, row)
+
+    @classmethod
+    def from_pose_assets(cls, pose_assets):
+        library = cls()
+        for pose_asset in pose_assets:
+            library.add_pose_asset(pose_asset)
+        return library
+
+    def add_pose(
+            self,
+            local_path="",
+            pose_name="",
+            thumbnail_path="",
+            is_favorite=False,
+            needs_sync=True,
+            tags=None,
+            pose_data=None,
+            pose_data_offset=-1,
+            pose_data_size=0,
+    ):
+        """
+        Returns:
+            int: row of the new pose
+        """
+        row = len(self)
+
+        directory, file_name = split_local_path(local_path)
+        self.directory_ids.append(self.strings.intern(directory))
+        self.file_name_ids.append(self.strings.intern(file_name))
+        self.pose_name_ids.append(self.strings.intern(pose_name))
+        self.thumbnail_path_ids.append(self.strings.intern(thumbnail_path))
+
+        self.favorite_flags.append(is_favorite)
+        self.sync_flags.append(needs_sync)
+
+        self.pose_data_offsets.append(pose_data_offset)
+        self.pose_data_sizes.append(pose_data_size)
+
+        if pose_data is not None:
+            self.pose_data_objects[row] = pose_data
+        if tags:
+            self.tag_ids[row] = [self.strings.intern(tag) for tag in tags]
+        return row
+
+    def add_pose_asset(self, pose_asset):
+        return self.add_pose(
+            local_path=pose_asset.local_path,
+            pose_name=pose_asset.pose_name,
+            thumbnail_path=pose_asset.thumbnail_path,
+            is_favorite=pose_asset.is_favorite,
+            needs_sync=pose_asset.needs_sync,
+            tags=pose_asset.tags,
+            pose_data=pose_asset.pose_data,
+        )
+
+    ######################################################################################
+    # column access, used by PoseAssetView
+
+    def get_local_path(self, row):
+        strings = self.strings.strings
+        return strings[self.directory_ids[row]] + strings[self.file_name_ids[row]]
+
+    def set_local_path(self, row, local_path):
+        directory, file_name = split_local_path(local_path)
+        self.directory_ids[row] = self.strings.intern(directory)
+        self.file_name_ids[row] = self.strings.intern(file_name)
+
+    def get_string_column(self, column, row):
+        return self.strings.strings[column[row]]
+
+    def set_string_column(self, column, row, text):
+        column[row] = self.strings.intern(text)
+
+    def get_tags(self, row):
+        return [self.strings.get(tag_id) for tag_id in self.tag_ids.get(row, [])]
+
+    def set_tags(self, row, tags):
+        if tags:
+            self.tag_ids[row] = [self.strings.intern(tag) for tag in tags]
+        else:
+            self.tag_ids.pop(row, None)
+
+    def get_pose_data(self, row):
+        """
+        Pose data object for a row, pose data stored in the shared buffer comes back as a lazy handle
+        """
+        pose_data = self.pose_data_objects.get(row)
+        if pose_data is not None:
+            return pose_data
+
+        # kept per row, so the data is only parsed once however many views ask for it
+        pose_data_handle = self.pose_data_handles.get(row)
+        if pose_data_handle is not None:
+            return pose_data_handle
+
+        offset = self.pose_data_offsets[row]
+        if offset < 0 or self.pose_data_buffer is None:
+            return None
+
+        end = offset + self.pose_data_sizes[row]
+        loader = functools.partial(self.pose_data_parser, memoryview(self.pose_data_buffer)[offset:end])
+        pose_data_handle = pose_blender_pose_data.PoseDataHandle(loader)
+        self.pose_data_handles[row] = pose_data_handle
+        return pose_data_handle
+
+    def set_pose_data(self, row, pose_data):
+        self.pose_data_handles.pop(row, None)
+        if pose_data is None:
+            self.pose_data_objects.pop(row, None)
+        else:
+            self.pose_data_objects[row] = pose_data
+
+    def get_sparse_value(self, column, row):
+        return column.get(row)
+
+    def set_sparse_value(self, column, row, value):
+        if value is None:
+            column.pop(row, None)
+        else:
+            column[row] = value
+
+    def get_memory_usage(self):
+        """
+        Rough estimate of the bytes held by the columns, for keeping an eye on big libraries
+        """
+        column_bytes = sum(
+            column.itemsize * len(column)
+            for column in (
+                self.directory_ids,
+                self.file_name_ids,
+                self.pose_name_ids,
+                self.thumbnail_path_ids,
+                self.pose_data_offsets,
+                self.pose_data_sizes,
+            )
+        )
+        flag_bytes = len(self.favorite_flags.data) + len(self.sync_flags.data)
+        string_bytes = sum(len(string) for string in self.strings.strings)
+        return column_bytes + flag_bytes + string_bytes
+
+
+def _column_property(column_name):
+    def getter(self):
+        return self._library.get_string_column(getattr(self._library, column_name), self._row)
+
+    def setter(self, text):
+        self._library.set_string_column(getattr(self._library, column_name), self._row, text)
+
+    return property(getter, setter)
+
+
+def _flag_property(column_name):
+    def getter(self):
+        return getattr(self._library, column_name).get(self._row)
+
+    def setter(self, state):
+        getattr(self._library, column_name).set(self._row, state)
+
+    return property(getter, setter)
+
+
+class PoseAssetView(k.PoseAsset):
+    """
+    PoseAsset that reads and writes through to a row of a PoseLibrary
+    """
+    __slots__ = ("_library", "_row")
+
+    def __init__(self, library, row):
+        # no PoseAsset.__init__, every field lives in the library
+        self._library = library
+        self._row = row
+
+    def __eq__(self, other):
+        if isinstance(other, PoseAssetView):
+            return self._library is other._library and self._row == other._row
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((id(self._library), self._row))
+
+    def __repr__(self):
+        return "<PoseAssetView {} '{}'>".format(self._row, self.pose_name)
+
+    @property
+    def library(self):
+        return self._library
+
+    @property
+    def row(self):
+        return self._row
+
+    pose_name = _column_property("pose_name_ids")
+    thumbnail_path = _column_property("thumbnail_path_ids")
+    is_favorite = _flag_property("favorite_flags")
+    needs_sync = _flag_property("sync_flags")
+
+    @property
+    def local_path(self):
+        return self._library.get_local_path(self._row)
+
+    @local_path.setter
+    def local_path(self, local_path):
+        self._library.set_local_path(self._row, local_path)
+
+    @property
+    def tags(self):
+        return self._library.get_tags(self._row)
+
+    @tags.setter
+    def tags(self, tags):
+        self._library.set_tags(self._row, tags)
+
+    @property
+    def pose_data(self):
+        return self._library.get_pose_data(self._row)
+
+    @pose_data.setter
+    def pose_data(self, pose_data):
+        self._library.set_pose_data(self._row, pose_data)
+
+    @property
+    def thumbnail_image(self):
+        return self._library.get_sparse_value(self._library.thumbnail_images, self._row)
+
+    @thumbnail_image.setter
+    def thumbnail_image(self, image):
+        self._library.set_sparse_value(self._library.thumbnail_images, self._row, image)
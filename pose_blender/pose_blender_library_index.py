@@ -0,0 +1,433 @@
+"""
+Persistent on-disk index of pose libraries.
+
+Scanning a pose library on a network share is slow, so this keeps what was found last time
+in a SQLite file and only rescans directories whose mtime changed since.
+
+Usage from a get_poses() implementation:
+
+    index = pose_blender_library_index.PoseLibraryIndex()
+    index.register_scanner(MyStudioPoseScanner())
+    return index.get_poses(["//server/poses"])
+
+Extension modules (pose_blender_ext*) plug in their own file formats by subclassing
+PoseLibraryScanner and registering it, either on an index or globally with register_scanner().
+
+NOTE: a directory mtime only changes when files are added, removed or renamed in it.
+Files edited in place are picked up by update(full=True), which stats every known file.
+"""
+import os
+import sqlite3
+import threading
+
+from . import pose_blender_constants as k
+from . import pose_blender_logger
+
+log = pose_blender_logger.get_logger()
+
+# bump this when the tables change, the index is a cache so it just gets rebuilt
+SCHEMA_VERSION = 1
+
+GLOBAL_SCANNERS = []
+
+
+def register_scanner(scanner):
+    """
+    Register a scanner for every PoseLibraryIndex created after this call
+    """
+    GLOBAL_SCANNERS.append(scanner)
+
+
+def get_default_index_path():
+    return os.path.join(os.path.expanduser("~"), ".pose_blender", "pose_library_index.sqlite")
+
+
+class PoseLibraryScanner(object):
+    """
+    Teaches the index how to recognize and read pose files.
+    Subclass and override in extension modules.
+    """
+    # lower case file extensions this scanner handles
+    file_extensions = (".pose",)
+
+    @property
+    def name(self):
+        return self.__class__.__name__
+
+    def is_pose_file(self, file_name):
+        return file_name.lower().endswith(self.file_extensions)
+
+    def read_entry(self, file_path, stat_result):
+        """
+        Gather the index data for a single pose file.
+        Only runs when a file is new or changed, so this is the place for expensive lookups.
+
+        Returns:
+            dict: with optional keys "pose_name", "thumbnail_path", "needs_sync", "is_favorite"
+        """
+        return {
+            "pose_name": os.path.splitext(os.path.basename(file_path))[0],
+            "thumbnail_path": self.get_thumbnail_path(file_path),
+            "needs_sync": False,
+        }
+
+    def get_thumbnail_path(self, file_path):
+        """
+        Also called for unchanged poses whenever their directory is rescanned, so keep it cheap
+        """
+        thumbnail_path = os.path.splitext(file_path)[0] + ".png"
+        return thumbnail_path if os.path.exists(thumbnail_path) else ""
+
+    def create_pose_asset(self, entry):
+        """
+        Build the PoseAsset for an index entry
+
+        Args:
+            entry (PoseIndexEntry):
+        """
+        pose_asset = k.PoseAsset()
+        pose_asset.local_path = entry.path
+        pose_asset.pose_name = entry.pose_name
+        pose_asset.thumbnail_path = entry.thumbnail_path
+        pose_asset.is_favorite = entry.is_favorite
+        pose_asset.needs_sync = entry.needs_sync
+        pose_asset.pose_data = self.create_pose_data_handle(entry)
+        return pose_asset
+
+    def create_pose_data_handle(self, entry):
+        """
+        Lazy pose data for an index entry, see pose_blender_pose_data.
+        Nothing gets read from disk until the pose is applied or blended.
+
+        Returns:
+            pose_blender_pose_data.PoseDataHandle: or None
+        """
+        return None
+
+
+class PoseIndexEntry(object):
+    __slots__ = (
+        "path",
+        "directory",
+        "pose_name",
+        "mtime",
+        "size",
+        "is_favorite",
+        "needs_sync",
+        "thumbnail_path",
+        "scanner_name",
+    )
+
+    def __init__(self, *row):
+        for slot, value in zip(self.__slots__, row):
+            setattr(self, slot, value)
+        self.is_favorite = bool(self.is_favorite)
+        self.needs_sync = bool(self.needs_sync)
+
+
+class PoseLibraryIndex(object):
+    def __init__(self, db_path=None, scanners=None):
+        self.db_path = db_path or get_default_index_path()
+        self.scanners = list(scanners) if scanners else list(GLOBAL_SCANNERS)
+        if not self.scanners:
+            self.scanners.append(PoseLibraryScanner())
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.isdir(db_dir):
+            os.makedirs(db_dir)
+
+        # get_poses is allowed to run off the GUI thread, so share the connection behind a lock
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._connection as con:
+            if con.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                con.execute("DROP TABLE IF EXISTS directories")
+                con.execute("DROP TABLE IF EXISTS poses")
+                con.execute("PRAGMA user_version = {}".format(SCHEMA_VERSION))
+
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS directories ("
+                "path TEXT PRIMARY KEY, "
+                "parent TEXT, "
+                "mtime REAL)"
+            )
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS poses ("
+                "path TEXT PRIMARY KEY, "
+                "directory TEXT, "
+                "pose_name TEXT, "
+                "mtime REAL, "
+                "size INTEGER, "
+                "is_favorite INTEGER DEFAULT 0, "
+                "needs_sync INTEGER DEFAULT 0, "
+                "thumbnail_path TEXT, "
+                "scanner_name TEXT)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS poses_directory ON poses (directory)")
+            con.execute("CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent)")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def register_scanner(self, scanner):
+        """
+        Scanners registered later take priority over earlier ones for files they both accept
+        """
+        self.scanners.insert(0, scanner)
+
+    def get_scanner(self, file_name):
+        for scanner in self.scanners:
+            if scanner.is_pose_file(file_name):
+                return scanner
+        return None
+
+    def get_scanner_by_name(self, scanner_name):
+        for scanner in self.scanners:
+            if scanner.name == scanner_name:
+                return scanner
+        return self.scanners[-1]
+
+    ######################################################################################
+    # querying
+
+    def get_poses(self, root_dirs, update=True):
+        """
+        Main entry point for get_poses() implementations
+
+        Args:
+            root_dirs (list): pose library folders
+            update (bool): revalidate changed directories before answering
+
+        Returns:
+            list: PoseAsset for every indexed pose under root_dirs
+        """
+        if update:
+            self.update(root_dirs)
+
+        pose_assets = []
+        for entry in self.get_entries(root_dirs):
+            scanner = self.get_scanner_by_name(entry.scanner_name)
+            pose_assets.append(scanner.create_pose_asset(entry))
+        return pose_assets
+
+    def get_entries(self, root_dirs=None):
+        query = "SELECT {} FROM poses".format(", ".join(PoseIndexEntry.__slots__))
+        args = []
+        if root_dirs:
+            conditions = []
+            for root_dir in root_dirs:
+                root_dir = normalize_path(root_dir)
+                sub_dir_prefix = root_dir.rstrip("/") + "/"
+                conditions.append("directory = ? OR substr(directory, 1, ?) = ?")
+                args.extend([root_dir, len(sub_dir_prefix), sub_dir_prefix])
+            query += " WHERE " + " OR ".join(conditions)
+        query += " ORDER BY path"
+
+        with self._lock:
+            rows = self._connection.execute(query, args).fetchall()
+        return [PoseIndexEntry(*row) for row in rows]
+
+    def get_entry(self, pose_path):
+        query = "SELECT {} FROM poses WHERE path = ?".format(", ".join(PoseIndexEntry.__slots__))
+        with self._lock:
+            row = self._connection.execute(query, (normalize_path(pose_path),)).fetchone()
+        return PoseIndexEntry(*row) if row else None
+
+    def get_pose_asset(self, pose_path):
+        """
+        Returns:
+            k.PoseAsset: for an indexed pose file, None if it isn't in the index
+        """
+        entry = self.get_entry(pose_path)
+        if entry is None:
+            return None
+        return self.get_scanner_by_name(entry.scanner_name).create_pose_asset(entry)
+
+    def set_favorite(self, pose_path, state=True):
+        with self._lock, self._connection as con:
+            con.execute("UPDATE poses SET is_favorite = ? WHERE path = ?", (int(state), normalize_path(pose_path)))
+
+    def set_needs_sync(self, pose_path, state=True):
+        with self._lock, self._connection as con:
+            con.execute("UPDATE poses SET needs_sync = ? WHERE path = ?", (int(state), normalize_path(pose_path)))
+
+    ######################################################################################
+    # revalidation
+
+    def update(self, root_dirs, full=False):
+        """
+        Bring the index up to date with disk.
+
+        Directories whose mtime is unchanged are trusted, including their list of sub directories,
+        so an unchanged library costs one os.stat per directory.
+
+        Args:
+            root_dirs (list): pose library folders
+            full (bool): also stat every known file, to catch files edited in place
+
+        Returns:
+            int: number of directories that were rescanned
+        """
+        rescanned = 0
+        with self._lock, self._connection as con:
+            dirs_to_check = [normalize_path(root_dir) for root_dir in root_dirs]
+            while dirs_to_check:
+                dir_path = dirs_to_check.pop()
+                row = con.execute("SELECT mtime FROM directories WHERE path = ?", (dir_path,)).fetchone()
+
+                try:
+                    dir_mtime = os.stat(dir_path).st_mtime
+                except OSError:
+                    self._remove_directory(con, dir_path)
+                    continue
+
+                if row is None or row[0] != dir_mtime:
+                    sub_dirs = self._rescan_directory(con, dir_path, dir_mtime)
+                    rescanned += 1
+                else:
+                    sub_dirs = [r[0] for r in con.execute("SELECT path FROM directories WHERE parent = ?", (dir_path,))]
+                    if full:
+                        self._revalidate_files(con, dir_path)
+
+                dirs_to_check.extend(sub_dirs)
+
+        if rescanned:
+            log.debug("Pose library index rescanned {} directories".format(rescanned))
+        return rescanned
+
+    def apply_changes(self, changes):
+        """
+        Update single files reported by pose_blender_library_watcher, without rescanning their directories
+
+        Args:
+            changes (pose_blender_library_watcher.LibraryChanges):
+
+        Returns:
+            list: PoseAsset for every added or modified pose that is in the index now
+        """
+        changed_paths = []
+        with self._lock, self._connection as con:
+            for file_path in changes.removed:
+                con.execute("DELETE FROM poses WHERE path = ?", (normalize_path(file_path),))
+
+            for file_path in changes.added + changes.modified:
+                file_path = normalize_path(file_path)
+                scanner = self.get_scanner(os.path.basename(file_path))
+                if scanner is None:
+                    continue
+
+                try:
+                    stat_result = os.stat(file_path)
+                except OSError:
+                    con.execute("DELETE FROM poses WHERE path = ?", (file_path,))
+                    continue
+
+                self._write_entry(con, scanner, file_path, normalize_path(os.path.dirname(file_path)), stat_result)
+                changed_paths.append(file_path)
+
+        pose_assets = [self.get_pose_asset(file_path) for file_path in changed_paths]
+        return [pose_asset for pose_asset in pose_assets if pose_asset is not None]
+
+    def _rescan_directory(self, con, dir_path, dir_mtime):
+        sub_dirs = []
+        found_pose_paths = set()
+
+        known_files = {
+            r[0]: (r[1], r[2], r[3])
+            for r in con.execute("SELECT path, mtime, size, thumbnail_path FROM poses WHERE directory = ?", (dir_path,))
+        }
+
+        for file_name in os.listdir(dir_path):
+            file_path = dir_path + "/" + file_name
+            if os.path.isdir(file_path):
+                sub_dirs.append(file_path)
+                continue
+
+            scanner = self.get_scanner(file_name)
+            if scanner is None:
+                continue
+
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                continue  # removed while listing, dropped with the other removed files below
+
+            found_pose_paths.add(file_path)
+            known_file = known_files.get(file_path)
+            if known_file is not None and known_file[:2] == (stat_result.st_mtime, stat_result.st_size):
+                # thumbnails added or removed next to an unchanged pose only show in the directory mtime
+                thumbnail_path = scanner.get_thumbnail_path(file_path)
+                if thumbnail_path != known_file[2]:
+                    con.execute("UPDATE poses SET thumbnail_path = ? WHERE path = ?", (thumbnail_path, file_path))
+                continue
+
+            self._write_entry(con, scanner, file_path, dir_path, stat_result)
+
+        for removed_path in set(known_files) - found_pose_paths:
+            con.execute("DELETE FROM poses WHERE path = ?", (removed_path,))
+
+        # directories that disappeared since last scan
+        known_sub_dirs = [r[0] for r in con.execute("SELECT path FROM directories WHERE parent = ?", (dir_path,))]
+        for removed_dir in set(known_sub_dirs) - set(sub_dirs):
+            self._remove_directory(con, removed_dir)
+
+        parent = normalize_path(os.path.dirname(dir_path))
+        con.execute(
+            "INSERT OR REPLACE INTO directories (path, parent, mtime) VALUES (?, ?, ?)",
+            (dir_path, parent, dir_mtime),
+        )
+        return sub_dirs
+
+    def _revalidate_files(self, con, dir_path):
+        rows = con.execute("SELECT path, mtime, size FROM poses WHERE directory = ?", (dir_path,)).fetchall()
+        for file_path, mtime, size in rows:
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                con.execute("DELETE FROM poses WHERE path = ?", (file_path,))
+                continue
+
+            if (stat_result.st_mtime, stat_result.st_size) != (mtime, size):
+                scanner = self.get_scanner(os.path.basename(file_path))
+                if scanner:
+                    self._write_entry(con, scanner, file_path, dir_path, stat_result)
+
+    def _write_entry(self, con, scanner, file_path, dir_path, stat_result):
+        entry_data = scanner.read_entry(file_path, stat_result)
+
+        # favorites are user state, keep them unless the scanner knows better
+        is_favorite = entry_data.get("is_favorite")
+        if is_favorite is None:
+            row = con.execute("SELECT is_favorite FROM poses WHERE path = ?", (file_path,)).fetchone()
+            is_favorite = row[0] if row else False
+
+        con.execute(
+            "INSERT OR REPLACE INTO poses ({}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)".format(
+                ", ".join(PoseIndexEntry.__slots__)
+            ),
+            (
+                file_path,
+                dir_path,
+                entry_data.get("pose_name", os.path.splitext(os.path.basename(file_path))[0]),
+                stat_result.st_mtime,
+                stat_result.st_size,
+                int(bool(is_favorite)),
+                int(bool(entry_data.get("needs_sync", False))),
+                entry_data.get("thumbnail_path", ""),
+                scanner.name,
+            ),
+        )
+
+    def _remove_directory(self, con, dir_path):
+        sub_dir_prefix = dir_path.rstrip("/") + "/"
+        args = (dir_path, len(sub_dir_prefix), sub_dir_prefix)
+        con.execute("DELETE FROM poses WHERE directory = ? OR substr(directory, 1, ?) = ?", args)
+        con.execute("DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?", args)
+
+
+def normalize_path(path):
+    return os.path.normpath(path).replace("\\", "/")
@@ -0,0 +1,385 @@
+"""
+Change detection for pose library folders, without rescanning the whole library.
+
+Keeps a stat snapshot of the library, the mtime of every directory and the mtime + size of every pose file
+and thumbnail. poll() checks directory mtimes and only lists and stats files in directories that changed,
+which catches poses being added, removed and renamed. A new directory pass starts on every poll
+once the previous one is done, so new poses don't wait on anything else.
+
+Thumbnails changing next to a pose report that pose as modified, so a re-saved thumbnail gets reloaded.
+
+Files edited in place don't touch the mtime of their directory, so every file_pass_interval
+directory passes all known files are restated as well. That file pass runs on a time budget of
+its own next to the directory passes, and never holds them up.
+
+Every poll() stops when its time budget runs out and the next one picks up where it left off,
+so a library of tens of thousands of files on a network share is covered over several polls.
+That goes for the files of a single directory too, only the listing itself is done in one go.
+
+    watcher = PoseLibraryWatcher(["//server/poses"])
+    changes = watcher.poll(time_budget=0.005)
+    if changes:
+        pose_assets = index.apply_changes(changes)
+
+The first complete pass only builds the snapshot, changes are reported from then on.
+"""
+import collections
+import os
+
+from . import pose_blender_library_index
+from . import pose_blender_timing
+
+normalize_path = pose_blender_library_index.normalize_path
+
+
+class LibraryChanges(object):
+    __slots__ = ("added", "removed", "modified")
+
+    def __init__(self, added=None, removed=None, modified=None):
+        """
+        Args:
+            added (list): normalized pose file paths
+            removed (list):
+            modified (list):
+        """
+        self.added = added or []
+        self.removed = removed or []
+        self.modified = modified or []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    __nonzero__ = __bool__  # py2
+
+    def __repr__(self):
+        return "LibraryChanges(added={}, removed={}, modified={})".format(
+            len(self.added),
+            len(self.removed),
+            len(self.modified),
+        )
+
+
+def iter_directory(dir_path):
+    """
+    Returns:
+        generator: (file_name, is_dir) per entry in dir_path
+    """
+    scandir = getattr(os, "scandir", None)
+    if scandir is not None:
+        # scandir knows the entry type from the listing, saving a stat per entry on most platforms
+        for dir_entry in scandir(dir_path):
+            yield dir_entry.name, dir_entry.is_dir()
+        return
+
+    for file_name in os.listdir(dir_path):
+        yield file_name, os.path.isdir(os.path.join(dir_path, file_name))
+
+
+class DirectoryListing(object):
+    """
+    A changed directory whose files are being stat-ed, can be spread over several polls
+    """
+    __slots__ = ("dir_path", "dir_mtime", "file_paths", "files", "sub_dirs")
+
+    def __init__(self, dir_path, dir_mtime):
+        self.dir_path = dir_path
+        self.dir_mtime = dir_mtime
+        self.file_paths = collections.deque()  # left to stat
+        self.files = {}  # {file_path: (mtime, size)}
+        self.sub_dirs = set()
+
+
+def get_has_time(time_budget):
+    """
+    Returns:
+        callable: True while there is time left in time_budget, always True for the first call
+    """
+    if time_budget is None:
+        return lambda: True
+
+    clock = pose_blender_timing.clock
+    deadline = clock() + time_budget
+    steps = [0]
+
+    def has_time():
+        # always take one step, so a tiny budget still makes progress
+        steps[0] += 1
+        return steps[0] == 1 or clock() < deadline
+
+    return has_time
+
+
+class PoseLibraryWatcher(object):
+    # directory passes between two restats of every known file, for files edited in place
+    file_pass_interval = 10
+
+    def __init__(self, root_dirs, file_extensions=(".pose",), thumbnail_extensions=(".png",)):
+        """
+        Args:
+            root_dirs (list): pose library folders
+            file_extensions (tuple): files to watch, lower case
+            thumbnail_extensions (tuple): thumbnails next to the pose files, named like the pose
+        """
+        self.root_dirs = [normalize_path(root_dir) for root_dir in root_dirs]
+        self.file_extensions = tuple(file_extension.lower() for file_extension in file_extensions)
+        self.thumbnail_extensions = tuple(file_extension.lower() for file_extension in thumbnail_extensions)
+
+        # snapshot
+        self.dir_mtimes = {}  # {dir_path: mtime}
+        self.dir_files = {}  # {dir_path: {file_path: (mtime, size)}}, pose files and thumbnails
+        self.dir_children = {}  # {dir_path: set(sub_dir_paths)}
+
+        # bumped when directories are added or removed, for anything mirroring the directory list
+        self.structure_version = 0
+
+        # the first complete pass builds the snapshot, changes are only reported after it
+        self.has_snapshot = False
+
+        # directory paths, a DirectoryListing at the front when a poll ran out of time halfway through it
+        self._dir_queue = collections.deque()
+        self._file_queue = collections.deque()
+        self._priority_dirs = collections.deque()  # see mark_dirs_changed()
+
+        self.stats = {
+            "passes": 0,
+            "file_passes": 0,
+            "dirs_checked": 0,
+            "dirs_listed": 0,
+            "files_checked": 0,
+        }
+
+    def poll(self, time_budget=None, file_time_budget=None):
+        """
+        Look for changes, for at most time_budget seconds
+
+        Args:
+            time_budget (float): None to finish the current directory pass, however long that takes
+            file_time_budget (float): spent on top of time_budget on a running file pass, defaults to time_budget
+
+        Returns:
+            LibraryChanges: found during this poll
+        """
+        changes = LibraryChanges()
+        has_time = get_has_time(time_budget)
+
+        # directories reported by a file system watcher go before everything else
+        while self._priority_dirs and has_time():
+            self.check_next_directory(self._priority_dirs, changes, has_time, priority=True)
+
+        # directory passes run back to back, whatever the file pass is doing
+        if not self._dir_queue:
+            self._dir_queue.extend(self.root_dirs)
+
+        while self._dir_queue and has_time():
+            self.check_next_directory(self._dir_queue, changes, has_time)
+
+            if not self._dir_queue:
+                self.has_snapshot = True
+                self.stats["passes"] += 1
+                if not self._file_queue and self.stats["passes"] % self.file_pass_interval == 0:
+                    for files in self.dir_files.values():
+                        self._file_queue.extend(files)
+                break  # the next pass starts on the next poll
+
+        if self._file_queue:
+            has_file_time = get_has_time(time_budget if file_time_budget is None else file_time_budget)
+            while self._file_queue and has_file_time():
+                self.check_file(self._file_queue.popleft(), changes)
+
+            if not self._file_queue:
+                self.stats["file_passes"] += 1
+
+        return changes
+
+    def mark_dirs_changed(self, dir_paths):
+        """
+        Check these directories first on the next poll, for file system notifications
+        """
+        self._priority_dirs.extend(normalize_path(dir_path) for dir_path in dir_paths)
+
+    def get_file_count(self):
+        """
+        Returns:
+            int: known pose files, without thumbnails
+        """
+        return sum(1 for files in self.dir_files.values() for file_path in files if self.is_pose_file(file_path))
+
+    ######################################################################################
+
+    def check_next_directory(self, dir_queue, changes, has_time, priority=False):
+        dir_item = dir_queue.popleft()
+        if isinstance(dir_item, DirectoryListing):
+            listing = dir_item
+        else:
+            listing = self.check_directory(dir_item, priority)
+            if listing is None:
+                return
+
+        if not self.stat_listed_files(listing, has_time):
+            dir_queue.appendleft(listing)  # the next poll carries on with this directory
+            return
+
+        new_sub_dirs = self.finish_listing(listing, changes)
+        if priority:
+            # directories that showed up need a full listing now, the rest waits for the regular pass
+            self._priority_dirs.extend(new_sub_dirs)
+        else:
+            self._dir_queue.extend(sorted(listing.sub_dirs))
+
+    def check_directory(self, dir_path, priority=False):
+        """
+        Returns:
+            DirectoryListing: when the directory changed and its files need to be stat-ed
+        """
+        self.stats["dirs_checked"] += 1
+        try:
+            dir_mtime = os.stat(dir_path).st_mtime
+        except OSError:
+            return DirectoryListing(dir_path, None)  # removed, see finish_listing()
+
+        if self.dir_mtimes.get(dir_path) != dir_mtime:
+            return self.list_directory(dir_path, dir_mtime)
+
+        if not priority:
+            # unchanged directories trust their known sub directories, like PoseLibraryIndex.update()
+            self._dir_queue.extend(sorted(self.dir_children.get(dir_path, ())))
+        return None
+
+    def list_directory(self, dir_path, dir_mtime):
+        self.stats["dirs_listed"] += 1
+        try:
+            dir_entries = list(iter_directory(dir_path))
+        except OSError:
+            return DirectoryListing(dir_path, None)
+
+        listing = DirectoryListing(dir_path, dir_mtime)
+        watched_extensions = self.file_extensions + self.thumbnail_extensions
+        for file_name, is_dir in dir_entries:
+            file_path = dir_path + "/" + file_name
+            if is_dir:
+                listing.sub_dirs.add(file_path)
+            elif file_name.lower().endswith(watched_extensions):
+                listing.file_paths.append(file_path)
+        return listing
+
+    def stat_listed_files(self, listing, has_time):
+        """
+        Returns:
+            bool: True once every file of the listing is stat-ed
+        """
+        while listing.file_paths:
+            # at least one file per call, so a tiny budget still gets through big directories
+            file_path = listing.file_paths.popleft()
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                pass  # removed while listing
+            else:
+                listing.files[file_path] = (stat_result.st_mtime, stat_result.st_size)
+
+            if listing.file_paths and not has_time():
+                return False
+        return True
+
+    def finish_listing(self, listing, changes):
+        """
+        Returns:
+            list: sub directories that weren't known before
+        """
+        dir_path = listing.dir_path
+        if listing.dir_mtime is None:
+            self.remove_directory(dir_path, changes)
+            return []
+
+        # compared against the snapshot as it is now, it may have been updated while this listing was running
+        known_files = self.dir_files.get(dir_path, {})
+        files = listing.files
+        if self.has_snapshot:
+            self.report_file_changes(known_files, files, changes)
+
+        for removed_dir in sorted(self.dir_children.get(dir_path, set()) - listing.sub_dirs):
+            self.remove_directory(removed_dir, changes)
+
+        if dir_path not in self.dir_mtimes:
+            self.structure_version += 1
+        self.dir_mtimes[dir_path] = listing.dir_mtime
+        self.dir_files[dir_path] = files
+        self.dir_children[dir_path] = listing.sub_dirs
+
+        return sorted(sub_dir for sub_dir in listing.sub_dirs if sub_dir not in self.dir_mtimes)
+
+    def report_file_changes(self, known_files, files, changes):
+        modified = set()
+        for file_path in sorted(files):
+            known_stat = known_files.get(file_path)
+            if known_stat == files[file_path]:
+                continue
+
+            if not self.is_pose_file(file_path):
+                modified.update(self.get_thumbnail_pose_paths(file_path, files))
+            elif known_stat is None:
+                changes.added.append(file_path)
+            else:
+                modified.add(file_path)
+
+        for file_path in sorted(known_files):
+            if file_path in files:
+                continue
+
+            if self.is_pose_file(file_path):
+                changes.removed.append(file_path)
+            else:
+                modified.update(self.get_thumbnail_pose_paths(file_path, files))
+
+        # new poses are already reported as added
+        changes.modified.extend(sorted(file_path for file_path in modified if file_path in known_files))
+
+    def is_pose_file(self, file_path):
+        return file_path.lower().endswith(self.file_extensions)
+
+    def get_thumbnail_pose_paths(self, thumbnail_path, files):
+        """
+        Returns:
+            list: pose files in files that thumbnail_path belongs to
+        """
+        base_path = os.path.splitext(thumbnail_path)[0]
+        return [base_path + file_extension for file_extension in self.file_extensions if base_path + file_extension in files]
+
+    def check_file(self, file_path, changes):
+        self.stats["files_checked"] += 1
+        files = self.dir_files.get(file_path.rpartition("/")[0])
+        known_stat = files.get(file_path) if files else None
+        if known_stat is None:
+            return  # directory got rescanned since this file was queued
+
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return  # removals change the directory mtime, the directory pass reports those
+
+        file_stat = (stat_result.st_mtime, stat_result.st_size)
+        if file_stat == known_stat:
+            return
+
+        files[file_path] = file_stat
+        if not self.has_snapshot:
+            return
+
+        if self.is_pose_file(file_path):
+            changes.modified.append(file_path)
+        else:
+            for pose_path in self.get_thumbnail_pose_paths(file_path, files):
+                if pose_path not in changes.modified:
+                    changes.modified.append(pose_path)
+
+    def remove_directory(self, dir_path, changes):
+        if dir_path in self.dir_mtimes:
+            self.structure_version += 1
+        self.dir_mtimes.pop(dir_path, None)
+
+        files = self.dir_files.pop(dir_path, {})
+        if self.has_snapshot:
+            changes.removed.extend(sorted(files))
+
+        for sub_dir in sorted(self.dir_children.pop(dir_path, ())):
+            self.remove_directory(sub_dir, changes)
@@ -0,0 +1,92 @@
+"""
+Lazy pose data.
+
+Set PoseAsset.pose_data to one of these handles instead of loading channel data up front,
+the data is then only read when PoseAsset.get_pose_data() is called, which happens
+when a pose is applied or blended.
+
+    pose_asset.pose_data = PoseDataHandle(partial(read_my_pose_json, path))
+    pose_asset.pose_data = MappedPoseDataHandle(path, parse_my_binary_pose)
+
+MappedPoseDataHandle reads through a read-only memory map, so only the pages that are
+touched get loaded and the OS page cache is shared between DCC sessions on the same machine.
+"""
+import mmap
+import os
+import threading
+
+
+class PoseDataHandle(object):
+    """
+    Pose data that's resolved on first use
+    """
+
+    def __init__(self, loader=None):
+        """
+        Args:
+            loader (callable): returns the pose data, called once on the first resolve()
+        """
+        self._loader = loader
+        self._data = None
+        self._is_resolved = False
+        self._lock = threading.Lock()  # thumbnail/library threads may share pose assets
+
+    @property
+    def is_resolved(self):
+        return self._is_resolved
+
+    def resolve(self):
+        if not self._is_resolved:
+            with self._lock:
+                if not self._is_resolved:
+                    self._data = self.load()
+                    self._is_resolved = True
+        return self._data
+
+    def load(self):
+        return self._loader() if self._loader else None
+
+    def release(self):
+        """
+        Drop the loaded data, the next resolve() loads it again
+        """
+        with self._lock:
+            self._data = None
+            self._is_resolved = False
+
+
+class MappedPoseDataHandle(PoseDataHandle):
+    """
+    Pose data parsed straight out of a read-only memory map of file_path.
+
+    The parser gets the mmap object and can read from it with struct.unpack_from / slicing
+    without copying the whole file first. The map stays open until release().
+    """
+
+    def __init__(self, file_path, parser):
+        """
+        Args:
+            file_path (str):
+            parser (callable): parser(buffer) -> pose data
+        """
+        super(MappedPoseDataHandle, self).__init__()
+        self.file_path = file_path
+        self.parser = parser
+        self._mapped_file = None
+
+    def load(self):
+        if os.path.getsize(self.file_path) == 0:
+            return self.parser(b"")
+
+        with open(self.file_path, "rb") as fp:
+            self._mapped_file = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.parser(self._mapped_file)
+
+    def release(self):
+        super(MappedPoseDataHandle, self).release()
+        if self._mapped_file is not None:
+            try:
+                self._mapped_file.close()
+            except BufferError:
+                pass  # parsed data still references the map, it gets closed once that's garbage collected
+            self._mapped_file = None
@@ -0,0 +1,378 @@
+"""
+Binary pose file format (.pbpose)
+
+Pose data is a {attribute_name: value} table, attribute names are "node.attribute".
+
+Layout, everything little endian:
+
+    header          fixed size, see HEADER_STRUCT
+    pose name       utf-8
+    string table    u32 offsets (string_count + 1), followed by the utf-8 blob
+    channel table   u32 node string index, u32 attribute string index, per channel
+    values          float32 or float64 per channel, 8 byte aligned
+    thumbnail       optional embedded image file data (png/jpg)
+
+Node and attribute names are interned in the string table, so a rig with thousands of
+channels only stores each controller name once. Every block is found through the header,
+so a reader can get the pose name, the values or the thumbnail without parsing the rest.
+"""
+import array
+import base64
+import io
+import json
+import os
+import struct
+import sys
+
+from . import pose_blender_constants as k
+from . import pose_blender_library_index
+from . import pose_blender_pose_data
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FILE_EXTENSION = ".pbpose"
+
+MAGIC = b"PBPF"
+VERSION = 1
+
+FLAG_FLOAT64 = 1 << 0
+FLAG_THUMBNAIL = 1 << 1
+
+# magic, version, flags, channel_count, string_count,
+# pose_name offset/size, strings offset/size, channels offset, values offset, thumbnail offset/size
+HEADER_STRUCT = struct.Struct("<4sHHII8Q")
+
+IS_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class PoseFileError(Exception):
+    pass
+
+
+def split_attribute_name(attribute_name):
+    node_name, _, attr_name = attribute_name.partition(".")
+    return node_name, attr_name
+
+
+######################################################################################
+# writing
+
+def write_pose_file(file_path, value_table, pose_name="", thumbnail_data=None, use_float64=True):
+    """
+    Args:
+        file_path (str):
+        value_table (dict): {"node.attribute": value}
+        pose_name (str):
+        thumbnail_data (bytes): image file contents to embed
+        use_float64 (bool): store values as float64, float32 halves the size of the values block
+    """
+    with open(file_path, "wb") as fp:
+        fp.write(encode_pose(value_table, pose_name, thumbnail_data, use_float64))
+
+
+def encode_pose(value_table, pose_name="", thumbnail_data=None, use_float64=True):
+    strings = []
+    string_indices = {}
+
+    def intern(text):
+        index = string_indices.get(text)
+        if index is None:
+            index = len(strings)
+            string_indices[text] = index
+            strings.append(text.encode("utf-8"))
+        return index
+
+    channel_indices = array.array("I")
+    for attribute_name in value_table.keys():
+        node_name, attr_name = split_attribute_name(attribute_name)
+        channel_indices.append(intern(node_name))
+        channel_indices.append(intern(attr_name))
+
+    string_offsets = array.array("I", [0])
+    for string in strings:
+        string_offsets.append(string_offsets[-1] + len(string))
+
+    values = array.array("d" if use_float64 else "f", value_table.values())
+
+    if not IS_LITTLE_ENDIAN:
+        for typed_array in (channel_indices, string_offsets, values):
+            typed_array.byteswap()
+
+    pose_name_data = pose_name.encode("utf-8")
+    strings_data = array_to_bytes(string_offsets) + b"".join(strings)
+    channels_data = array_to_bytes(channel_indices)
+    values_data = array_to_bytes(values)
+    thumbnail_data = thumbnail_data or b""
+
+    flags = 0
+    if use_float64:
+        flags |= FLAG_FLOAT64
+    if thumbnail_data:
+        flags |= FLAG_THUMBNAIL
+
+    blocks = io.BytesIO()
+    offset = HEADER_STRUCT.size
+
+    def add_block(data, alignment=1):
+        start = align(offset, alignment)
+        blocks.write(b"\0" * (start - offset))
+        blocks.write(data)
+        return start, start + len(data)
+
+    pose_name_offset, offset = add_block(pose_name_data)
+    strings_offset, offset = add_block(strings_data, alignment=4)
+    channels_offset, offset = add_block(channels_data, alignment=4)
+    values_offset, offset = add_block(values_data, alignment=8)
+    thumbnail_offset, offset = add_block(thumbnail_data)
+
+    header = HEADER_STRUCT.pack(
+        MAGIC,
+        VERSION,
+        flags,
+        len(value_table),
+        len(strings),
+        pose_name_offset,
+        len(pose_name_data),
+        strings_offset,
+        len(strings_data),
+        channels_offset,
+        values_offset,
+        thumbnail_offset,
+        len(thumbnail_data),
+    )
+    return header + blocks.getvalue()
+
+
+def align(offset, alignment):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def array_to_bytes(typed_array):
+    if hasattr(typed_array, "tobytes"):
+        return typed_array.tobytes()
+    return typed_array.tostring()
+
+
+######################################################################################
+# reading
+
+class PoseFileReader(object):
+    """
+    Reads blocks out of an encoded pose on demand.
+
+    Works on anything that supports the buffer protocol, usually the mmap from a
+    pose_blender_pose_data.MappedPoseDataHandle, so nothing gets copied until asked for.
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER_STRUCT.size:
+            raise PoseFileError("Not a pose file, too small for a header")
+
+        header = HEADER_STRUCT.unpack_from(buffer, 0)
+        if header[0] != MAGIC:
+            raise PoseFileError("Not a pose file, bad magic: {}".format(header[0]))
+        if header[1] > VERSION:
+            raise PoseFileError("Pose file version {} is newer than supported {}".format(header[1], VERSION))
+
+        self.buffer = buffer
+        (
+            _,
+            self.version,
+            self.flags,
+            self.channel_count,
+            self.string_count,
+            self.pose_name_offset,
+            self.pose_name_size,
+            self.strings_offset,
+            self.strings_size,
+            self.channels_offset,
+            self.values_offset,
+            self.thumbnail_offset,
+            self.thumbnail_size,
+        ) = header
+
+    @classmethod
+    def from_file(cls, file_path):
+        with open(file_path, "rb") as fp:
+            return cls(fp.read())
+
+    @property
+    def is_float64(self):
+        return bool(self.flags & FLAG_FLOAT64)
+
+    @property
+    def has_thumbnail(self):
+        return bool(self.flags & FLAG_THUMBNAIL)
+
+    def get_pose_name(self):
+        start = self.pose_name_offset
+        return bytes(self.buffer[start:start + self.pose_name_size]).decode("utf-8")
+
+    def get_strings(self):
+        offsets = struct.unpack_from("<{}I".format(self.string_count + 1), self.buffer, self.strings_offset)
+        blob_start = self.strings_offset + (self.string_count + 1) * 4
+        blob = bytes(self.buffer[blob_start:blob_start + offsets[-1]])
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.string_count)]
+
+    def get_attribute_names(self):
+        strings = self.get_strings()
+        attr_suffixes = ["." + string if string else "" for string in strings]
+        indices = struct.unpack_from("<{}I".format(self.channel_count * 2), self.buffer, self.channels_offset)
+        return [strings[n] + attr_suffixes[a] for n, a in zip(indices[0::2], indices[1::2])]
+
+    def get_values(self):
+        """
+        Returns:
+            numpy.ndarray or array.array: float64 values, aligned to get_attribute_names()
+        """
+        if np is not None:
+            dtype = "<f8" if self.is_float64 else "<f4"
+            values = np.frombuffer(self.buffer, dtype=dtype, count=self.channel_count, offset=self.values_offset)
+            return values.astype(np.float64)
+
+        value_format = "<{}{}".format(self.channel_count, "d" if self.is_float64 else "f")
+        return array.array("d", struct.unpack_from(value_format, self.buffer, self.values_offset))
+
+    def get_value_table(self):
+        return dict(zip(self.get_attribute_names(), self.get_values().tolist()))
+
+    def get_thumbnail_data(self):
+        if not self.has_thumbnail:
+            return None
+        start = self.thumbnail_offset
+        return bytes(self.buffer[start:start + self.thumbnail_size])
+
+
+def read_pose_file(file_path):
+    """
+    Returns:
+        dict: {"node.attribute": value}
+    """
+    return PoseFileReader.from_file(file_path).get_value_table()
+
+
+def parse_pose_buffer(buffer):
+    return PoseFileReader(buffer).get_value_table()
+
+
+def read_pose_name(file_path):
+    """
+    Read only as much of the file as is needed for the pose name
+    """
+    with open(file_path, "rb") as fp:
+        header = PoseFileReader(fp.read(HEADER_STRUCT.size))
+        fp.seek(header.pose_name_offset)
+        return fp.read(header.pose_name_size).decode("utf-8")
+
+
+def read_thumbnail_data(file_path):
+    with open(file_path, "rb") as fp:
+        header = PoseFileReader(fp.read(HEADER_STRUCT.size))
+        if not header.has_thumbnail:
+            return None
+        fp.seek(header.thumbnail_offset)
+        return fp.read(header.thumbnail_size)
+
+
+######################################################################################
+# PoseAsset integration
+
+class PoseFileAsset(k.PoseAsset):
+    """
+    PoseAsset backed by a .pbpose file, pose data is memory mapped on first use
+    """
+
+    def __init__(self, file_path=""):
+        super(PoseFileAsset, self).__init__()
+        self.needs_sync = False
+        if file_path:
+            self.local_path = file_path
+            self.pose_data = pose_blender_pose_data.MappedPoseDataHandle(file_path, parse_pose_buffer)
+
+    def set_thumbnail_data(self):
+        if self.thumbnail_path or not self.local_path:
+            return
+
+        thumbnail_data = read_thumbnail_data(self.local_path)
+        if thumbnail_data:
+            from .ui_utils import QtGui
+            self.thumbnail_image = QtGui.QImage.fromData(thumbnail_data)
+
+
+def read_pose_asset(file_path):
+    """
+    Returns:
+        PoseFileAsset: with the pose name read from the header, pose data is loaded lazily
+    """
+    pose_asset = PoseFileAsset(file_path)
+    pose_asset.pose_name = read_pose_name(file_path)
+    return pose_asset
+
+
+class PoseFileScanner(pose_blender_library_index.PoseLibraryScanner):
+    """
+    Library index scanner for .pbpose files
+    """
+    file_extensions = (FILE_EXTENSION,)
+
+    def read_entry(self, file_path, stat_result):
+        entry_data = super(PoseFileScanner, self).read_entry(file_path, stat_result)
+        try:
+            entry_data["pose_name"] = read_pose_name(file_path) or entry_data["pose_name"]
+        except (IOError, PoseFileError):
+            pass
+        return entry_data
+
+    def create_pose_asset(self, entry):
+        pose_asset = PoseFileAsset(entry.path)
+        pose_asset.pose_name = entry.pose_name
+        pose_asset.thumbnail_path = entry.thumbnail_path
+        pose_asset.is_favorite = entry.is_favorite
+        pose_asset.needs_sync = entry.needs_sync
+        return pose_asset
+
+
+######################################################################################
+# JSON bridge, for migrating existing libraries
+
+def export_json(pose_file_path, json_path):
+    with open(pose_file_path, "rb") as fp:
+        reader = PoseFileReader(fp.read())
+
+    json_data = {
+        "pose_name": reader.get_pose_name(),
+        "values": reader.get_value_table(),
+    }
+    thumbnail_data = reader.get_thumbnail_data()
+    if thumbnail_data:
+        json_data["thumbnail"] = base64.b64encode(thumbnail_data).decode("ascii")
+
+    with open(json_path, "w") as fp:
+        json.dump(json_data, fp, indent=2)
+
+
+def import_json(json_path, pose_file_path=None, use_float64=True):
+    """
+    Convert a {"pose_name": str, "values": {attribute: value}, "thumbnail": base64} json file
+
+    Returns:
+        str: path of the written pose file
+    """
+    with open(json_path, "r") as fp:
+        json_data = json.load(fp)
+
+    if pose_file_path is None:
+        pose_file_path = os.path.splitext(json_path)[0] + FILE_EXTENSION
+
+    thumbnail_data = json_data.get("thumbnail")
+    write_pose_file(
+        pose_file_path,
+        json_data.get("values", {}),
+        pose_name=json_data.get("pose_name", ""),
+        thumbnail_data=base64.b64decode(thumbnail_data) if thumbnail_data else None,
+        use_float64=use_float64,
+    )
+    return pose_file_path
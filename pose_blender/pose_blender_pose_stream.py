@@ -0,0 +1,86 @@
+"""
+Helpers for get_poses() implementations that stream their poses instead of returning a full list.
+
+get_poses() may return a generator, any other iterator, or an async generator. These are consumed
+on a worker thread by the UI, so the grid can show the first poses while a slow network scan is
+still running:
+
+    def get_poses(self):
+        for pose_path in scan_pose_library("//server/poses"):
+            yield create_pose_asset(pose_path)
+
+Items can be single PoseAssets or lists of them, when the producer already works in batches.
+The generator body runs on the worker thread, so it must not touch the DCC scene.
+"""
+from . import pose_blender_constants as k
+from . import pose_blender_timing
+
+
+def is_pose_stream(poses):
+    """
+    Returns:
+        bool: True if poses is an iterator or async iterator, rather than a list or PoseLibrary
+    """
+    if hasattr(poses, "__anext__"):
+        return True
+    if hasattr(poses, "__len__"):
+        return False
+    return hasattr(poses, "__next__") or hasattr(poses, "next")
+
+
+def iter_async_poses(async_iterator):
+    """
+    Drive an async iterator from a plain thread, on an event loop of its own
+    """
+    import asyncio  # py3 only, and only async producers get here
+
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_iterator.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        if hasattr(async_iterator, "aclose"):
+            loop.run_until_complete(async_iterator.aclose())
+        loop.close()
+
+
+def iter_pose_batches(poses, max_batch_size=500, max_batch_interval=0.05):
+    """
+    Group a pose stream into lists, a batch is handed out once it's full or has been waiting for max_batch_interval.
+    The first pose goes out on its own right away, so something shows up before the first interval has passed.
+
+    Args:
+        poses: iterator or async iterator of PoseAssets, or of lists of PoseAssets
+        max_batch_size (int):
+        max_batch_interval (float): seconds, keeps the first poses from waiting on a slow producer
+
+    Returns:
+        generator: lists of PoseAssets
+    """
+    if hasattr(poses, "__anext__"):
+        poses = iter_async_poses(poses)
+
+    clock = pose_blender_timing.clock
+    batch = []
+    last_batch_time = clock() - max_batch_interval
+    try:
+        for item in poses:
+            if isinstance(item, k.PoseAsset):
+                batch.append(item)
+            else:
+                batch.extend(item)
+
+            if len(batch) >= max_batch_size or clock() - last_batch_time >= max_batch_interval:
+                yield batch
+                batch = []
+                last_batch_time = clock()
+    finally:
+        # stop the producer when the consumer stops early
+        if hasattr(poses, "close"):
+            poses.close()
+
+    if batch:
+        yield batch
@@ -0,0 +1,180 @@
+"""
+Search index for the pose filter.
+
+Built once when poses are loaded, queries then run against pre-normalized names,
+path tokens and tags instead of lower-casing every pose name on every keystroke.
+
+Query syntax, all terms have to match:
+    hand fist       - every word is a substring of the pose name, or a folder/file name in the pose path
+    path:hand       - a folder/file name in the pose path starts with "hand"
+    tag:combat      - pose has a tag starting with "combat"
+"""
+import bisect
+import re
+
+TOKEN_SPLIT_RE = re.compile(r"[^0-9a-z]+")
+TAG_PREFIX = "tag:"
+PATH_PREFIX = "path:"
+
+
+def normalize(text):
+    return (text or "").lower()
+
+
+def tokenize(text):
+    return [token for token in TOKEN_SPLIT_RE.split(normalize(text)) if token]
+
+
+class SortedTokenTable(object):
+    """
+    Token -> entry indices, with prefix lookup through a sorted token list
+    """
+
+    def __init__(self):
+        self.token_indices = {}
+        self.sorted_tokens = []
+
+    def add(self, token, index):
+        self.token_indices.setdefault(token, set()).add(index)
+
+    def finalize(self):
+        self.sorted_tokens = sorted(self.token_indices.keys())
+
+    def find(self, token):
+        return self.token_indices.get(token, set())
+
+    def find_prefix(self, prefix):
+        found = set()
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            found.update(self.token_indices[token])
+        return found
+
+
+class PoseSearchIndex(object):
+    def __init__(self, pose_assets=None):
+        self.names = []
+        self.entry_path_tokens = []  # per entry, to match single entries without the tables
+        self.entry_tags = []
+        self.path_tokens = SortedTokenTable()
+        self.tags = SortedTokenTable()
+
+        # typing usually extends the previous term, so narrow from the previous result
+        self._term_cache = {}
+
+        if pose_assets is not None:
+            self.build(pose_assets)
+
+    def __len__(self):
+        return len(self.names)
+
+    def build(self, pose_assets):
+        """
+        Args:
+            pose_assets (list): PoseAsset, entry indices match this list
+        """
+        self.names = []
+        self.entry_path_tokens = []
+        self.entry_tags = []
+        self.path_tokens = SortedTokenTable()
+        self.tags = SortedTokenTable()
+        self._term_cache = {}
+        self.extend(pose_assets)
+
+    def extend(self, pose_assets):
+        """
+        Add entries after the existing ones, for poses that are streamed in
+        """
+        first_index = len(self.names)
+        for index, pose_asset in enumerate(pose_assets, first_index):
+            self.names.append(normalize(pose_asset.pose_name))
+
+            path_tokens = set(tokenize(pose_asset.local_path))
+            self.entry_path_tokens.append(path_tokens)
+            for token in path_tokens:
+                self.path_tokens.add(token, index)
+
+            tags = set(normalize(tag) for tag in getattr(pose_asset, "tags", None) or [])
+            self.entry_tags.append(tags)
+            for tag in tags:
+                self.tags.add(tag, index)
+
+        self.path_tokens.finalize()
+        self.tags.finalize()
+
+        # cached terms stay valid, they only need the new entries that match them
+        new_indices = range(first_index, len(self.names))
+        for term, found in self._term_cache.items():
+            found.update(index for index in new_indices if self.match_term(term, index))
+
+    def query(self, query_text, rows=None):
+        """
+        Args:
+            query_text (str):
+            rows (iterable): only match these entries, e.g. the ones that were just added
+
+        Returns:
+            set: indices of matching entries, or None when the query matches everything
+        """
+        terms = normalize(query_text).split()
+        if not terms:
+            return None
+
+        if rows is not None:
+            return set(index for index in rows if all(self.match_term(term, index) for term in terms))
+
+        matches = None
+        for term in sorted(terms, key=len, reverse=True):  # longest terms tend to narrow the most
+            term_matches = self.find_term(term)
+            matches = set(term_matches) if matches is None else matches & term_matches
+            if not matches:
+                break
+        return matches
+
+    def match_term(self, term, index):
+        """
+        Single entry version of find_term()
+        """
+        if term.startswith(TAG_PREFIX):
+            prefix = term[len(TAG_PREFIX):]
+            return any(tag.startswith(prefix) for tag in self.entry_tags[index])
+
+        if term.startswith(PATH_PREFIX):
+            prefix = term[len(PATH_PREFIX):]
+            return any(token.startswith(prefix) for token in self.entry_path_tokens[index])
+
+        return term in self.names[index] or term in self.entry_path_tokens[index]
+
+    def find_term(self, term):
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        if term.startswith(TAG_PREFIX):
+            found = self.tags.find_prefix(term[len(TAG_PREFIX):])
+        elif term.startswith(PATH_PREFIX):
+            found = self.path_tokens.find_prefix(term[len(PATH_PREFIX):])
+        else:
+            # a shorter version of this term has already been searched, only look inside its result
+            candidates = None
+            for cache_term in self._term_cache:
+                if cache_term in term and ":" not in cache_term:
+                    cache_result = self._term_cache[cache_term]
+                    if candidates is None or len(cache_result) < len(candidates):
+                        candidates = cache_result
+
+            names = self.names
+            if candidates is None:
+                found = set(index for index, name in enumerate(names) if term in name)
+            else:
+                found = set(index for index in candidates if term in names[index])
+
+            # path tokens aren't narrowed by the substring cache, add them separately
+            found |= self.path_tokens.find(term)
+
+        if len(self._term_cache) > 256:
+            self._term_cache = {}
+        self._term_cache[term] = found
+        return found
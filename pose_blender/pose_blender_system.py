@@ -1,15 +1,143 @@
+"""
+Extension discovery and the active dcc interface.
+
+Extensions are modules named pose_blender_ext* somewhere on sys.path, or modules registered
+in the "pose_blender.extensions" entry point group of an installed package:
+
+    entry_points={"pose_blender.extensions": ["studio = studio_pose_blender.ext"]}
+
+Listing sys.path folders is slow on network mounts, so the folder contents are cached in
+~/.pose_blender/extension_cache.json and only listed again when the folder mtime changes.
+
+Nothing is imported until dcc is first used, dcc is a stand-in that creates the real
+interface (and imports the extensions) on first attribute access. dcc_module does the same
+for the interface module of the running DCC.
+"""
+import collections
 import importlib
+import json
 import os
 import sys
+import timeit
 import traceback
 
 from . import pose_blender_constants as k
+from . import pose_blender_dcc_core
 from . import pose_blender_logger
+from . import pose_blender_timing
 
 log = pose_blender_logger.get_logger()
 
+ENTRY_POINT_GROUP = "pose_blender.extensions"
+
+# set to "simulated" to run against pose_blender_dcc_simulated instead of the detected DCC
+DCC_ENV_VAR = "POSE_BLENDER_DCC"
+
+# {module_name: seconds}, how long each extension took to import
+extension_import_times = collections.OrderedDict()
+
+
+def get_default_extension_cache_path():
+    return os.path.join(os.path.expanduser("~"), ".pose_blender", "extension_cache.json")
+
+
+def read_extension_cache(cache_path):
+    try:
+        with open(cache_path, "r") as fp:
+            return json.load(fp)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def write_extension_cache(cache_path, cache_data):
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        temp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+        with open(temp_path, "w") as fp:
+            json.dump(cache_data, fp)
+
+        if os.path.exists(cache_path):
+            os.remove(cache_path)  # os.rename won't overwrite on windows
+        os.rename(temp_path, cache_path)
+    except (IOError, OSError) as e:
+        log.debug("Failed to write extension cache: {}".format(e))
+
+
+def find_extension_modules(search_paths=None, cache_path=None, refresh=False):
+    """
+    Find extension module names in search_paths, reusing the cached listing of unchanged folders
+
+    Args:
+        search_paths (list): folders to look in, defaults to sys.path
+        cache_path (str): defaults to get_default_extension_cache_path(), empty string disables the cache
+        refresh (bool): ignore the cache and list every folder again
+
+    Returns:
+        list: module names, sorted
+    """
+    if search_paths is None:
+        search_paths = sys.path
+    if cache_path is None:
+        cache_path = get_default_extension_cache_path()
+
+    cache_data = read_extension_cache(cache_path) if cache_path and not refresh else {}
+    new_cache_data = {}
+
+    module_names = set()
+    for search_path in search_paths:
+        try:
+            path_mtime = os.stat(search_path).st_mtime
+        except OSError:
+            continue
+
+        cached = cache_data.get(search_path)
+        if cached and cached.get("mtime") == path_mtime:
+            path_module_names = cached.get("modules", [])
+        else:
+            if not os.path.isdir(search_path):
+                continue
+
+            path_module_names = []
+            for file_name in os.listdir(search_path):
+                if file_name.startswith(k.ModuleConstants.extension_file_prefix):
+                    path_module_names.append(os.path.splitext(file_name)[0])
+
+        new_cache_data[search_path] = {"mtime": path_mtime, "modules": path_module_names}
+        module_names.update(path_module_names)
+
+    if cache_path and new_cache_data != cache_data:
+        write_extension_cache(cache_path, new_cache_data)
+
+    return sorted(module_name for module_name in module_names if module_name)
+
+
+def get_entry_points():
+    """
+    Returns:
+        list: entry points registered in ENTRY_POINT_GROUP, they have .name and .load()
+    """
+    try:
+        from importlib import metadata
+    except ImportError:
+        metadata = None
+
+    if metadata is not None:
+        all_entry_points = metadata.entry_points()
+        if hasattr(all_entry_points, "select"):
+            return list(all_entry_points.select(group=ENTRY_POINT_GROUP))
+        return list(all_entry_points.get(ENTRY_POINT_GROUP, []))
 
-def import_extensions(refresh=False):
+    try:
+        import pkg_resources
+    except ImportError:
+        return []
+    return list(pkg_resources.iter_entry_points(ENTRY_POINT_GROUP))
+
+
+def import_extensions(refresh=False, use_cache=True):
     if refresh:
         modules_to_pop = []
         for mod_key in sys.modules.keys():
@@ -19,50 +147,145 @@ def import_extensions(refresh=False):
         for mod_key in modules_to_pop:
             sys.modules.pop(mod_key)
 
-    # look through sys.path for extension modules
-    modules_to_import = list()
-    for sys_path in sys.path:
-        if not os.path.isdir(sys_path):
-            continue
+        extension_import_times.clear()
 
-        # for every .py file with the proper prefix, import it
-        for sys_path_name in os.listdir(sys_path):
-            if not sys_path_name.startswith(k.ModuleConstants.extension_file_prefix):
-                continue
+    with pose_blender_timing.span("find_extension_modules"):
+        modules_to_import = find_extension_modules(cache_path=None if use_cache else "", refresh=refresh)
 
-            module_name = os.path.splitext(sys_path_name)[0]
-            modules_to_import.append(module_name)
+    for module_import_str in modules_to_import:
+        with pose_blender_timing.span("import_extension", module=module_import_str):
+            start_time = timeit.default_timer()
+            try:
+                importlib.import_module(module_import_str)
+                log.info("Imported extension: {}".format(module_import_str))
+            except Exception as e:
+                traceback.print_exc()
+            extension_import_times[module_import_str] = timeit.default_timer() - start_time
 
-    modules_to_import = list(set(modules_to_import))
+    try:
+        with pose_blender_timing.span("get_entry_points"):
+            entry_points = get_entry_points()
+    except Exception as e:
+        entry_points = []
+        traceback.print_exc()
 
-    for module_import_str in modules_to_import:
-        if not module_import_str:
-            continue
+    for entry_point in entry_points:
+        with pose_blender_timing.span("import_extension", entry_point=entry_point.name):
+            start_time = timeit.default_timer()
+            try:
+                entry_point.load()
+                log.info("Imported extension entry point: {}".format(entry_point.name))
+            except Exception as e:
+                traceback.print_exc()
+            extension_import_times[entry_point.name] = timeit.default_timer() - start_time
 
-        try:
-            importlib.import_module(module_import_str)
-            log.info("Imported extension: {}".format(module_import_str))
-        except Exception as e:
-            traceback.print_exc()
+    for extension_name, import_time in extension_import_times.items():
+        log.debug("Extension import time: {} {:.3f}s".format(extension_name, import_time))
 
 
-try:
-    import_extensions()
-except Exception as e:
-    traceback.print_exc()
+def get_extension_import_times():
+    """
+    Returns:
+        list: (extension_name, seconds), slowest first
+    """
+    return sorted(extension_import_times.items(), key=lambda item: item[1], reverse=True)
+
 
 active_dcc_is_maya = "maya" in os.path.basename(sys.executable)
+active_dcc_is_simulated = os.environ.get(DCC_ENV_VAR, "").lower() == "simulated"
+
+_dcc_instance = None
+
+
+def get_dcc_module():
+    """
+    The dcc interface module for the running DCC, imported on first use
+    """
+    if active_dcc_is_simulated:
+        from . import pose_blender_dcc_simulated
+        return pose_blender_dcc_simulated
+    if active_dcc_is_maya:
+        from . import pose_blender_dcc_maya
+        return pose_blender_dcc_maya
+    return pose_blender_dcc_core
 
-if active_dcc_is_maya:
-    from . import pose_blender_dcc_maya as dcc_module
 
-    extension_sub_classes = dcc_module.PoseBlenderMaya.__subclasses__()
-    if extension_sub_classes:
-        dcc = extension_sub_classes[0]()  # type: dcc_module.PoseBlenderMaya
+@pose_blender_timing.timed()
+def create_dcc():
+    try:
+        with pose_blender_timing.span("import_extensions"):
+            import_extensions()
+    except Exception as e:
+        traceback.print_exc()
+
+    if active_dcc_is_simulated:
+        extension_sub_classes = dcc_module.PoseBlenderSimulated.__subclasses__()
+        if extension_sub_classes:
+            dcc_instance = extension_sub_classes[0]()  # type: pose_blender_dcc_simulated.PoseBlenderSimulated
+        else:
+            dcc_instance = dcc_module.PoseBlenderSimulated()
+        log.info("DCC class: {}".format(dcc_instance))
+    elif active_dcc_is_maya:
+        extension_sub_classes = dcc_module.PoseBlenderMaya.__subclasses__()
+        if extension_sub_classes:
+            dcc_instance = extension_sub_classes[0]()  # type: pose_blender_dcc_maya.PoseBlenderMaya
+        else:
+            dcc_instance = dcc_module.PoseBlenderMaya()
+        log.info("DCC class: {}".format(dcc_instance))
     else:
-        dcc = dcc_module.PoseBlenderMaya()
-    log.info("DCC class: {}".format(dcc))
-else:
-    from . import pose_blender_dcc_core as dcc_module
+        dcc_instance = dcc_module.PoseBlenderCoreInterface()
+    return dcc_instance
+
+
+def get_dcc():
+    global _dcc_instance
+    if _dcc_instance is None:
+        _dcc_instance = create_dcc()
+    return _dcc_instance
+
+
+def set_dcc(dcc_instance):
+    """
+    Replace the active dcc interface, for tests and benchmarks running outside of a DCC
+    """
+    global _dcc_instance
+    _dcc_instance = dcc_instance
+
+
+def is_dcc_created():
+    return _dcc_instance is not None
+
+
+class LazyDCC(object):
+    """
+    Stands in for the dcc interface until it's first used
+    """
+
+    def __getattr__(self, attr_name):
+        return getattr(get_dcc(), attr_name)
+
+    def __setattr__(self, attr_name, value):
+        setattr(get_dcc(), attr_name, value)
+
+    def __repr__(self):
+        if is_dcc_created():
+            return repr(get_dcc())
+        return "<LazyDCC, not created yet>"
+
+
+dcc = LazyDCC()  # type: pose_blender_dcc_core.PoseBlenderCoreInterface
+
+
+class LazyDCCModule(object):
+    """
+    Stands in for the dcc interface module, which is only imported when one of its attributes is used
+    """
+
+    def __getattr__(self, attr_name):
+        return getattr(get_dcc_module(), attr_name)
+
+    def __repr__(self):
+        return "<LazyDCCModule>"
+
 
-    dcc = dcc_module.PoseBlenderCoreInterface()  # type: dcc_module.PoseBlenderCoreInterface
+dcc_module = LazyDCCModule()
@@ -0,0 +1,203 @@
+"""
+Two tier thumbnail cache.
+
+1. a bounded in-memory LRU of decoded QImages, capped by a byte budget
+2. an on-disk cache of pre-downscaled thumbnails, keyed by source path + mtime + size bucket
+
+Safe to call from worker threads, QImage doesn't need the GUI thread.
+"""
+import collections
+import hashlib
+import os
+import threading
+
+from . import pose_blender_logger
+from .ui_utils import QtCore, QtGui
+
+log = pose_blender_logger.get_logger()
+
+# thumbnails are stored at the smallest bucket that fits the requested size
+SIZE_BUCKETS = (32, 64, 128, 256, 512, 1024)
+
+DEFAULT_MEMORY_BUDGET = 128 * 1024 * 1024
+
+
+def get_size_bucket(size):
+    for bucket in SIZE_BUCKETS:
+        if size <= bucket:
+            return bucket
+    return SIZE_BUCKETS[-1]
+
+
+def get_default_disk_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".pose_blender", "thumbnail_cache")
+
+
+def get_image_byte_size(image):
+    if hasattr(image, "sizeInBytes"):
+        return image.sizeInBytes()
+    return image.byteCount()
+
+
+class ThumbnailCache(object):
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, disk_cache_dir=None):
+        """
+        Args:
+            memory_budget (int): max bytes of decoded images kept in memory
+            disk_cache_dir (str): folder for downscaled thumbnails, empty string disables the disk tier
+        """
+        self.memory_budget = memory_budget
+        self.disk_cache_dir = get_default_disk_cache_dir() if disk_cache_dir is None else disk_cache_dir
+
+        self._memory_cache = collections.OrderedDict()  # {key: QImage}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "memory_hits": 0,
+            "memory_misses": 0,
+            "disk_hits": 0,
+            "disk_misses": 0,
+        }
+
+    def get_image(self, source_path, size):
+        """
+        Get a thumbnail of source_path that's at least size pixels, if the source is big enough
+
+        Returns:
+            QtGui.QImage: or None if the source image can't be read
+        """
+        try:
+            source_mtime = os.path.getmtime(source_path)
+        except OSError:
+            return None
+
+        bucket = get_size_bucket(size)
+        key = (source_path, source_mtime, bucket)
+
+        image = self._get_from_memory(key)
+        if image is not None:
+            return image
+
+        image = self._get_from_disk(key)
+        if image is None:
+            image = self._decode_source(source_path, bucket)
+            if image is None:
+                return None
+            self._save_to_disk(key, image)
+
+        self._add_to_memory(key, image)
+        return image
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_bytes"] = self._memory_bytes
+            stats["memory_items"] = len(self._memory_cache)
+        return stats
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory_cache.clear()
+            self._memory_bytes = 0
+
+    ######################################################################################
+    # memory tier
+
+    def _get_from_memory(self, key):
+        with self._lock:
+            image = self._memory_cache.get(key)
+            if image is None:
+                self.stats["memory_misses"] += 1
+                return None
+
+            # move to the most recently used end
+            self._memory_cache.pop(key)
+            self._memory_cache[key] = image
+            self.stats["memory_hits"] += 1
+            return image
+
+    def _add_to_memory(self, key, image):
+        image_bytes = get_image_byte_size(image)
+        if image_bytes > self.memory_budget:
+            return
+
+        with self._lock:
+            old_image = self._memory_cache.pop(key, None)
+            if old_image is not None:
+                self._memory_bytes -= get_image_byte_size(old_image)
+
+            self._memory_cache[key] = image
+            self._memory_bytes += image_bytes
+
+            while self._memory_bytes > self.memory_budget:
+                _, evicted_image = self._memory_cache.popitem(last=False)
+                self._memory_bytes -= get_image_byte_size(evicted_image)
+
+    ######################################################################################
+    # disk tier
+
+    def get_disk_path(self, key):
+        source_path, source_mtime, bucket = key
+        key_str = "{}|{}|{}".format(source_path, source_mtime, bucket)
+        key_hash = hashlib.sha1(key_str.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_cache_dir, key_hash[:2], "{}_{}.png".format(key_hash, bucket))
+
+    def _get_from_disk(self, key):
+        if not self.disk_cache_dir:
+            return None
+
+        disk_path = self.get_disk_path(key)
+        if os.path.exists(disk_path):
+            image = QtGui.QImage(disk_path)
+            if not image.isNull():
+                self._count("disk_hits")
+                return image
+
+        self._count("disk_misses")
+        return None
+
+    def _count(self, stat_name):
+        with self._lock:
+            self.stats[stat_name] += 1
+
+    def _save_to_disk(self, key, image):
+        if not self.disk_cache_dir:
+            return
+
+        disk_path = self.get_disk_path(key)
+        try:
+            disk_dir = os.path.dirname(disk_path)
+            if not os.path.isdir(disk_dir):
+                os.makedirs(disk_dir)
+
+            # write next to the target and rename, so other sessions never read a half written file
+            temp_path = "{}.{}.tmp".format(disk_path, threading.current_thread().ident)
+            if image.save(temp_path, "PNG"):
+                try:
+                    os.rename(temp_path, disk_path)
+                except OSError:
+                    # another session got there first
+                    os.remove(temp_path)
+        except OSError as e:
+            log.debug("Failed to write thumbnail cache file: {} - {}".format(disk_path, e))
+
+    @staticmethod
+    def _decode_source(source_path, bucket):
+        image = QtGui.QImage(source_path)
+        if image.isNull():
+            return None
+
+        if image.width() > bucket or image.height() > bucket:
+            image = image.scaled(bucket, bucket, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        return image
+
+
+_THUMBNAIL_CACHE = None
+
+
+def get_thumbnail_cache():
+    global _THUMBNAIL_CACHE
+    if _THUMBNAIL_CACHE is None:
+        _THUMBNAIL_CACHE = ThumbnailCache()
+    return _THUMBNAIL_CACHE
@@ -0,0 +1,232 @@
+"""
+Nested timing spans, for finding out where Pose Blender spends its time.
+
+    with pose_blender_timing.span("get_poses"):
+        pose_assets = dcc.get_poses()
+
+    pose_blender_timing.get_report()  # nested dicts
+    pose_blender_timing.log_report()  # through pose_blender_logger at DEBUG
+    pose_blender_timing.export_chrome_trace("pose_blender_trace.json")  # open in chrome://tracing
+
+Spans nest per thread, spans from worker threads show up as separate roots on their own thread.
+"""
+import collections
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import timeit
+
+from . import pose_blender_logger
+
+log = pose_blender_logger.get_logger()
+
+# monotonic where available, py2 falls back to the best timer on the platform
+clock = getattr(time, "perf_counter", timeit.default_timer)
+
+
+class Span(object):
+    __slots__ = ("name", "start", "end", "thread_id", "args", "children")
+
+    def __init__(self, name, start, thread_id, args=None):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.thread_id = thread_id
+        self.args = args or {}
+        self.children = []
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else clock()) - self.start
+
+    def to_dict(self, origin=0.0):
+        return {
+            "name": self.name,
+            "start": self.start - origin,
+            "duration": self.duration,
+            "thread_id": self.thread_id,
+            "args": dict(self.args),
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+
+class TimingRecorder(object):
+    # worker threads can produce a lot of spans (one per thumbnail), stop recording new roots past this
+    default_max_root_spans = 10000
+
+    def __init__(self, max_root_spans=None):
+        self.enabled = True
+        self.max_root_spans = max_root_spans or self.default_max_root_spans
+        self.origin = clock()
+
+        self.root_spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield None
+            return
+
+        stack = self._get_stack()
+        new_span = Span(name, clock(), threading.current_thread().ident, args)
+        if stack:
+            stack[-1].children.append(new_span)
+        else:
+            with self._lock:
+                if len(self.root_spans) < self.max_root_spans:
+                    self.root_spans.append(new_span)
+
+        stack.append(new_span)
+        try:
+            yield new_span
+        finally:
+            new_span.end = clock()
+            stack.pop()
+
+    def reset(self):
+        with self._lock:
+            self.root_spans = []
+            self.origin = clock()
+
+    def get_report(self):
+        """
+        Returns:
+            list: a dict per root span, {"name", "start", "duration", "thread_id", "args", "children"},
+                  times are in seconds, start is relative to the last reset()
+        """
+        with self._lock:
+            root_spans = list(self.root_spans)
+        return [root_span.to_dict(self.origin) for root_span in root_spans]
+
+    def get_totals(self):
+        """
+        Returns:
+            OrderedDict: {span_name: (call_count, total_seconds)}, slowest first
+        """
+        totals = collections.defaultdict(lambda: [0, 0.0])
+
+        def add_span(span_data):
+            total = totals[span_data["name"]]
+            total[0] += 1
+            total[1] += span_data["duration"]
+            for child_data in span_data["children"]:
+                add_span(child_data)
+
+        for root_data in self.get_report():
+            add_span(root_data)
+
+        sorted_totals = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+        return collections.OrderedDict((name, tuple(total)) for name, total in sorted_totals)
+
+    def format_report(self):
+        lines = []
+
+        def add_lines(span_data, depth):
+            args_text = " ".join("{}={}".format(key, value) for key, value in sorted(span_data["args"].items()))
+            lines.append("{}{} {:.2f} ms {}".format(
+                "    " * depth,
+                span_data["name"],
+                span_data["duration"] * 1000,
+                args_text,
+            ).rstrip())
+            for child_data in span_data["children"]:
+                add_lines(child_data, depth + 1)
+
+        for root_data in self.get_report():
+            add_lines(root_data, 0)
+        return "\n".join(lines)
+
+    def log_report(self):
+        if not log.isEnabledFor(logging.DEBUG):
+            return
+        log.debug("Pose Blender timing:\n{}".format(self.format_report()))
+
+    def get_chrome_trace(self):
+        """
+        Returns:
+            dict: chrome://tracing / perfetto "Trace Event Format" data
+        """
+        events = []
+        process_id = os.getpid()
+
+        def add_events(span_data):
+            events.append({
+                "name": span_data["name"],
+                "ph": "X",
+                "ts": span_data["start"] * 1000000,
+                "dur": span_data["duration"] * 1000000,
+                "pid": process_id,
+                "tid": span_data["thread_id"],
+                "args": {key: str(value) for key, value in span_data["args"].items()},
+            })
+            for child_data in span_data["children"]:
+                add_events(child_data)
+
+        for root_data in self.get_report():
+            add_events(root_data)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file_path):
+        with open(file_path, "w") as fp:
+            json.dump(self.get_chrome_trace(), fp)
+        return file_path
+
+
+_TIMING_RECORDER = None
+
+
+def get_timing_recorder():
+    global _TIMING_RECORDER
+    if _TIMING_RECORDER is None:
+        _TIMING_RECORDER = TimingRecorder()
+    return _TIMING_RECORDER
+
+
+def span(name, **args):
+    return get_timing_recorder().span(name, **args)
+
+
+def timed(name=None):
+    """
+    Decorator version of span(), name defaults to the function name
+    """
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_report():
+    return get_timing_recorder().get_report()
+
+
+def log_report():
+    get_timing_recorder().log_report()
+
+
+def export_chrome_trace(file_path):
+    return get_timing_recorder().export_chrome_trace(file_path)
+
+
+def reset():
+    get_timing_recorder().reset()
@@ -1,10 +1,17 @@
+import collections
 import sys
-import threading
+from functools import partial
 
 from . import resources as resources
+from . import pose_blender_blend_cache
 from . import pose_blender_constants as k
+from . import pose_blender_library_watcher
 from . import pose_blender_logger
+from . import pose_blender_pose_stream
+from . import pose_blender_search
 from . import pose_blender_system as pbs
+from . import pose_blender_thumbnail_cache as thumbnail_cache
+from . import pose_blender_timing as timing
 from . import ui_utils
 from .ui_utils import QtCore, QtGui, QtWidgets
 
@@ -19,10 +26,17 @@ if not QtWidgets.QApplication.instance():
 
 
 class PoseBlenderWidget(QtWidgets.QWidget):
+    # model/view pose grid, only visible rows cost anything. Meant for very large libraries.
+    use_virtualized_grid = False
+
+    # wait this long after the last keystroke before filtering
+    filter_debounce_ms = 150
+
     def __init__(self, *args, **kwargs):
+        virtualized_grid = kwargs.pop("virtualized_grid", self.use_virtualized_grid)
         super(PoseBlenderWidget, self).__init__(*args, **kwargs)
 
-        self.ui = PoseBlenderUI()
+        self.ui = PoseBlenderUI(virtualized_grid=virtualized_grid)
         main_layout = QtWidgets.QVBoxLayout()
         main_layout.setContentsMargins(2, 2, 2, 2)
         main_layout.addWidget(self.ui)
@@ -30,95 +44,420 @@ class PoseBlenderWidget(QtWidgets.QWidget):
 
         self.blender_engine = None
 
+        self.blend_scheduler = BlendScheduler(self)
+        self.blend_scheduler.blend_requested.connect(self.blend_active_pose)
+
+        self.mix_scheduler = BlendScheduler(self)
+        self.mix_scheduler.blend_requested.connect(self.blend_pose_mix)
+
+        self.thumbnail_loader = ThumbnailLoader(self)
+        self.thumbnail_loader.thumbnail_loaded.connect(self.set_loaded_thumbnail)
+
+        # get_poses() implementations that are generators get consumed off the GUI thread
+        self.pose_stream_loader = PoseStreamLoader(self)
+        self.pose_stream_loader.batch_loaded.connect(self.add_pose_batch)
+        self.pose_stream_loader.finished.connect(self.finish_pose_stream)
+        self.pose_stream_incremental = False
+        self.pose_stream_assets = []  # everything streamed so far, for incremental refreshes
+
+        # re-prioritize thumbnail loading once scrolling settles
+        self.thumbnail_scroll_timer = QtCore.QTimer(self)
+        self.thumbnail_scroll_timer.setSingleShot(True)
+        self.thumbnail_scroll_timer.setInterval(50)
+        self.thumbnail_scroll_timer.timeout.connect(self.update_thumbnail_jobs)
+        self.ui.pose_grid.verticalScrollBar().valueChanged.connect(self.thumbnail_scroll_timer.start)
+
+        self.search_index = pose_blender_search.PoseSearchIndex()
+        self.visible_rows = None  # rows shown by the last filter, None if unknown
+
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.filter_debounce_ms)
+        self.filter_timer.timeout.connect(self.apply_pose_filter)
+
+        if self.ui.pose_model is not None:
+            self.ui.pose_grid.apply_pose.connect(self.apply_pose)
+            self.ui.pose_grid.add_to_mix.connect(self.add_pose_to_mix)
+            self.ui.pose_grid.start_blending.connect(self.initialize_blender_engine)
+            self.ui.pose_grid.blend_active_pose.connect(self.blend_scheduler.submit)
+            self.ui.pose_grid.stop_blending.connect(self.finish_blending)
+            self.ui.pose_grid.cancel_blending.connect(self.cancel_blending)
+
         for proj_widget in pbs.dcc.get_project_widgets():
             self.ui.project_widget_layouts.addWidget(proj_widget)
 
         self.ui.rig_chooser.currentTextChanged.connect(self.set_choosen_rig)
         self.ui.refresh_rigs.clicked.connect(self.update_from_scene)
-        self.ui.refresh_poses.clicked.connect(self.refresh_poses)
-        self.ui.pose_filter.textChanged.connect(self.filter_poses)
+        self.ui.refresh_poses.clicked.connect(self.refresh_or_cancel_poses)
+        self.ui.pose_filter.textChanged.connect(self.filter_timer.start)
         self.ui.grid_toggle.clicked.connect(self.toggle_icon_mode)
         self.ui.size_slider.valueChanged.connect(self.update_pose_size)
 
+        self.ui.pose_mix_widget.weight_changed.connect(self.mix_scheduler.submit)
+        self.ui.pose_mix_widget.weight_released.connect(self.commit_pose_mix)
+        self.ui.pose_mix_widget.mode_changed.connect(self.set_pose_mix_mode)
+        self.ui.pose_mix_widget.pose_removed.connect(self.remove_pose_from_mix)
+        self.ui.pose_mix_widget.cleared.connect(self.clear_pose_mix)
+
+        # picks up poses added, removed or edited on disk, for DCCs that say where their library is
+        self.library_watcher = None
+
         self.refresh_poses()
         self.update_from_scene()
+        self.start_library_watcher()
+
+    def refresh_poses(self, incremental=False):
+        """
+        Args:
+            incremental (bool): only add, remove and update the poses that changed since the last refresh,
+                                keeping existing items, thumbnails, scroll position and selection
+        """
+        with timing.span("refresh_poses", incremental=incremental):
+            self.cancel_pose_stream()
+
+            with timing.span("get_poses"):
+                pose_assets = pbs.dcc.get_poses()
+
+            # poses without a file can't be checked for changes, so start over on every refresh
+            pbs.dcc.blend_target_cache.clear()
+
+            if pose_blender_pose_stream.is_pose_stream(pose_assets):
+                self.start_pose_stream(pose_assets, incremental=incremental)
+                return
+
+            if incremental:
+                with timing.span("update_poses"):
+                    self.update_poses(pose_assets)
+                return
+
+            self.thumbnail_loader.cancel_all()
+
+            with timing.span("build_pose_grid", pose_count=len(pose_assets)):
+                if self.ui.pose_model is not None:
+                    self.ui.pose_model.set_pose_assets(pose_assets)
+                else:
+                    self.ui.pose_grid.clear()
+
+                    for pose_asset in pose_assets:  # type: k.PoseAsset
+                        self.add_pose_item(pose_asset)
+
+            self.visible_rows = set(range(len(pose_assets)))
+            with timing.span("rebuild_search_index"):
+                self.rebuild_search_index()
+            self.apply_pose_filter()
+
+            with timing.span("refresh_grid_display"):
+                self.refresh_grid_display()
+            self.update_thumbnail_jobs()
+
+    def refresh_or_cancel_poses(self):
+        if self.pose_stream_loader.is_running():
+            self.cancel_pose_stream()
+            return
+        self.refresh_poses(incremental=True)
+
+    def start_pose_stream(self, pose_stream, incremental=False):
+        """
+        Fill the grid from a get_poses() generator as batches come in from the worker thread.
+        Incremental refreshes keep showing the current poses and apply the changes once the stream is done.
+        """
+        # nothing to keep, so show the poses as they arrive
+        if incremental and not len(self.search_index):
+            incremental = False
+
+        self.pose_stream_incremental = incremental
+        self.pose_stream_assets = []
+
+        if not incremental:
+            self.thumbnail_loader.cancel_all()
+            if self.ui.pose_model is not None:
+                self.ui.pose_model.set_pose_assets([])
+            else:
+                self.ui.pose_grid.clear()
+            self.search_index.build([])
+            self.visible_rows = set()
+
+        self.ui.set_pose_stream_progress(0)
+        self.pose_stream_loader.start(pose_stream)
+
+    def add_pose_batch(self, pose_assets):
+        self.pose_stream_assets.extend(pose_assets)
+        self.ui.set_pose_stream_progress(len(self.pose_stream_assets))
+        if self.pose_stream_incremental:
+            return
+
+        with timing.span("add_pose_batch", pose_count=len(pose_assets)):
+            first_row = len(self.search_index)
+            if self.ui.pose_model is not None:
+                self.ui.pose_model.append_pose_assets(pose_assets)
+            else:
+                pose_size = self.ui.size_slider.value()
+                for pose_asset in pose_assets:
+                    pose_widget = self.add_pose_item(pose_asset)
+                    pose_widget.update_size(pose_size)
+
+            # new rows start out visible, hide the ones that don't match the filter
+            self.search_index.extend(pose_assets)
+            self.filter_new_rows(first_row)
+        self.thumbnail_scroll_timer.start()
+
+    def finish_pose_stream(self, pose_count, error):
+        self.ui.set_pose_stream_progress(None)
+        if error:
+            log.error("Failed to load poses, showing the {} loaded before the error: {}".format(pose_count, error))
+        else:
+            log.info("Loaded {} poses".format(pose_count))
+
+        if self.pose_stream_incremental and not error:
+            with timing.span("update_poses"):
+                self.update_poses(self.pose_stream_assets)
+        self.pose_stream_assets = []
+
+    def cancel_pose_stream(self):
+        if not self.pose_stream_loader.is_running():
+            return
+        self.pose_stream_loader.cancel()
+        self.pose_stream_assets = []
+        self.ui.set_pose_stream_progress(None)
+        log.info("Cancelled loading poses")
+
+    def start_library_watcher(self):
+        library_paths = pbs.dcc.get_pose_library_paths()
+        if not library_paths:
+            return
+
+        self.library_watcher = LibraryWatcherService(
+            library_paths,
+            parent=self,
+            poll_interval_ms=pbs.dcc.library_poll_interval_ms,
+            time_budget_ms=pbs.dcc.library_poll_budget_ms,
+        )
+        self.library_watcher.changed.connect(self.apply_library_changes)
+        self.library_watcher.start()
+
+    def apply_library_changes(self, changes):
+        """
+        Apply poses added, removed or edited on disk to the grid, without a full get_poses()
+        """
+        if self.pose_stream_loader.is_running():
+            return  # the stream is reading the library as it is now
 
-    def refresh_poses(self):
-        self.ui.pose_grid.clear()
-
-        for pose_asset in pbs.dcc.get_poses():  # type: k.PoseAsset
-            pose_widget = PoseWidget(self, pose_asset)
-            pose_widget.apply_pose.connect(self.apply_pose)
-            pose_widget.start_blending.connect(self.initialize_blender_engine)
-            pose_widget.blend_active_pose.connect(self.blend_active_pose)
-
-            # Create widget
-            widget = QtWidgets.QWidget()
-            widget.setToolTip(pose_asset.pose_name)
-
-            pose_label = QtWidgets.QLabel()
-            pose_label.setAlignment(QtCore.Qt.AlignCenter)
-            pose_label.setText(pose_asset.pose_name)
-            pose_label.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Minimum)
-
-            widget_layout = QtWidgets.QBoxLayout(QtWidgets.QBoxLayout.Down)
-            widget_layout.addWidget(pose_widget)
-            widget_layout.addWidget(pose_label)
-            widget_layout.setContentsMargins(3, 3, 3, 3)
-            widget_layout.setSpacing(0)
-            widget_layout.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
-            widget.setLayout(widget_layout)
-
-            # add to grid
-            lwi = QtWidgets.QListWidgetItem()
-            lwi.setSizeHint(widget.sizeHint())
+        with timing.span("apply_library_changes", changes=repr(changes)):
+            changed_pose_assets = pbs.dcc.get_changed_pose_assets(changes)
+            if changed_pose_assets is None:
+                self.refresh_poses(incremental=True)
+                return
+
+            normalize_path = pose_blender_library_watcher.normalize_path
+            removed_paths = set(normalize_path(file_path) for file_path in changes.removed)
+            changed_assets = collections.OrderedDict(
+                (normalize_path(pose_asset.local_path), pose_asset) for pose_asset in changed_pose_assets
+            )
+
+            if self.ui.pose_model is not None:
+                current_pose_assets = self.ui.pose_model.pose_assets
+            else:
+                current_pose_assets = [pose_widget.pose_asset for pose_widget in self.get_pose_widgets()]
+
+            pose_assets = []
+            for pose_asset in current_pose_assets:
+                pose_path = normalize_path(pose_asset.local_path) if pose_asset.local_path else None
+                if pose_path in removed_paths:
+                    continue
+                pose_assets.append(changed_assets.pop(pose_path, pose_asset))
+            pose_assets.extend(changed_assets.values())  # new poses go at the end
+
+            modified_keys = set(pose_asset.get_key() for pose_asset in changed_pose_assets)
+            for pose_asset in changed_pose_assets:
+                pbs.dcc.blend_target_cache.invalidate_pose(pose_asset)
+
+            self.update_poses(pose_assets, modified_keys=modified_keys)
+        log.info("Pose library changed: {} added, {} removed, {} modified".format(
+            len(changes.added),
+            len(changes.removed),
+            len(changes.modified),
+        ))
+
+    def update_poses(self, pose_assets, modified_keys=()):
+        """
+        Args:
+            pose_assets (list): the new pose list
+            modified_keys (set): PoseAsset.get_key() of poses whose files changed, their thumbnails get reloaded
+        """
+        if self.ui.pose_model is not None:
+            self.ui.pose_model.update_pose_assets(pose_assets, modified_keys=modified_keys)
+            self.visible_rows = None
+            self.rebuild_search_index()
+            self.apply_pose_filter()
+            return
+
+        new_pose_keys = set(pose_asset.get_key() for pose_asset in pose_assets)
+
+        # remove from the back so rows don't shift under us
+        existing_widgets = {}
+        for row in reversed(range(self.ui.pose_grid.count())):
+            pose_widget = self.ui.pose_grid.item(row).data(QtCore.Qt.UserRole)  # type: PoseWidget
+            pose_key = pose_widget.pose_asset.get_key()
+            if pose_key in new_pose_keys:
+                existing_widgets[pose_key] = pose_widget
+                continue
+
+            self.thumbnail_loader.cancel(pose_widget)
+            self.ui.pose_grid.takeItem(row)
+
+        # rows before row are done, the existing widgets still to place all sit after it
+        for row, pose_asset in enumerate(pose_assets):
+            pose_key = pose_asset.get_key()
+            pose_widget = existing_widgets.get(pose_key)
+            if pose_widget is None:
+                pose_widget = self.add_pose_item(pose_asset, row=row)
+                pose_widget.update_size(self.ui.size_slider.value())
+                continue
+
+            if self.ui.pose_grid.item(row) is not pose_widget.list_widget_item:
+                pose_widget = self.move_pose_item(self.ui.pose_grid.row(pose_widget.list_widget_item), row)
+            pose_widget.update_pose_asset(pose_asset, reload_thumbnail=pose_key in modified_keys)
+
+        self.visible_rows = None
+        self.rebuild_search_index()
+        self.apply_pose_filter()
+
+    def move_pose_item(self, from_row, to_row):
+        """
+        Move a pose up the grid, from_row > to_row
+
+        Returns:
+            PoseWidget: of the moved item, a new one if it had to be rebuilt
+        """
+        pose_grid = self.ui.pose_grid
+        pose_widget = pose_grid.item(from_row).data(QtCore.Qt.UserRole)  # type: PoseWidget
+
+        # takeItem() would delete the item widget, moving the model rows keeps it.
+        # QListWidget's model refuses moves to row 0, so the rows in between move down past it instead
+        root_index = QtCore.QModelIndex()
+        if pose_grid.model().moveRows(root_index, to_row, from_row - to_row, root_index, from_row + 1):
+            return pose_widget
+
+        # Qt before 5.13 can't move QListWidget rows at all
+        self.thumbnail_loader.cancel(pose_widget)
+        pose_grid.takeItem(from_row)
+        pose_widget = self.add_pose_item(pose_widget.pose_asset, row=to_row)
+        pose_widget.update_size(self.ui.size_slider.value())
+        return pose_widget
+
+    def add_pose_item(self, pose_asset, row=None):
+        pose_widget = PoseWidget(self, pose_asset)
+        pose_widget.apply_pose.connect(self.apply_pose)
+        pose_widget.add_to_mix.connect(self.add_pose_to_mix)
+        pose_widget.start_blending.connect(self.initialize_blender_engine)
+        pose_widget.blend_active_pose.connect(self.blend_scheduler.submit)
+        pose_widget.stop_blending.connect(self.finish_blending)
+        pose_widget.cancel_blending.connect(self.cancel_blending)
+
+        layout_dir, label_size_policy = self.get_grid_display_settings()
+
+        # Create widget
+        widget = QtWidgets.QWidget()
+        widget.setToolTip(pose_asset.pose_name)
+
+        pose_label = QtWidgets.QLabel()
+        pose_label.setAlignment(QtCore.Qt.AlignCenter)
+        pose_label.setText(pose_asset.pose_name)
+        pose_label.setSizePolicy(*label_size_policy)
+
+        widget_layout = QtWidgets.QBoxLayout(layout_dir)
+        widget_layout.addWidget(pose_widget)
+        widget_layout.addWidget(pose_label)
+        widget_layout.setContentsMargins(3, 3, 3, 3)
+        widget_layout.setSpacing(0)
+        widget_layout.setSizeConstraint(QtWidgets.QLayout.SetFixedSize)
+        widget.setLayout(widget_layout)
+
+        # add to grid
+        lwi = QtWidgets.QListWidgetItem()
+        lwi.setSizeHint(widget.sizeHint())
+        if row is None:
             self.ui.pose_grid.addItem(lwi)
-            self.ui.pose_grid.setItemWidget(lwi, widget)
-            lwi.setData(QtCore.Qt.UserRole, pose_widget)
-            pose_widget.item_main_widget = widget
-            pose_widget.list_widget_item = lwi
-            pose_widget.item_label = pose_label
+        else:
+            self.ui.pose_grid.insertItem(row, lwi)
+        self.ui.pose_grid.setItemWidget(lwi, widget)
+        lwi.setData(QtCore.Qt.UserRole, pose_widget)
+        pose_widget.item_main_widget = widget
+        pose_widget.list_widget_item = lwi
+        pose_widget.item_label = pose_label
+        return pose_widget
+
+    def update_thumbnail_jobs(self):
+        """
+        Queue thumbnail loads for items that need one, visible items first,
+        and cancel the ones for items that were filtered out.
+        """
+        if self.ui.pose_model is not None:
+            return  # the model loads thumbnails as rows get painted
 
-        self.refresh_grid_display()
-        self.start_thumbnail_thread()
+        viewport_rect = self.ui.pose_grid.viewport().rect()
+        for lwi in self.get_pose_list_widgets():
+            pose_widget = lwi.data(QtCore.Qt.UserRole)  # type: PoseWidget
 
-    def start_thumbnail_thread(self):
-        thumbnail_thread = threading.Thread(target=self.generate_thumbnails)
-        thumbnail_thread.start()
+            if lwi.isHidden():
+                self.thumbnail_loader.cancel(pose_widget)
+                continue
 
-    def generate_thumbnails(self):
-        for pose_widget in self.get_pose_widgets():  # type: PoseWidget
-            try:
-                pose_widget.set_thumbnail_from_pose_asset(from_disk=True)
-            except Exception as e:
-                log.warning("Failed to parse thumbnail data from: {} - {}".format(pose_widget.pose_asset.pose_name, e))
+            if pose_widget.thumbnail_loaded:
+                continue
+
+            is_visible = self.ui.pose_grid.visualItemRect(lwi).intersects(viewport_rect)
+            self.thumbnail_loader.request(
+                pose_widget,
+                pose_widget.pose_asset,
+                pose_widget.image_size,
+                high_priority=is_visible,
+            )
+
+    def set_loaded_thumbnail(self, pose_widget, image, image_size):
+        pose_widget.set_thumbnail_image(image, image_size)
 
     def update_from_scene(self):
-        rig_names = list(pbs.dcc.get_rigs_in_scene().keys())
-        self.ui.rig_chooser.clear()
-        self.ui.rig_chooser.addItems(rig_names)
+        with timing.span("update_from_scene"):
+            with timing.span("get_rigs_in_scene"):
+                rig_names = list(pbs.dcc.get_rigs_in_scene().keys())
+            # rigs may have been rebuilt or re-referenced since the plans were made
+            pbs.dcc.invalidate_attribute_plans()
+            self.ui.rig_chooser.clear()
+            self.ui.rig_chooser.addItems(rig_names)
 
     def initialize_blender_engine(self, pose_asset):
+        # make sure the previous session gets its last weight before switching poses
+        self.blend_scheduler.flush()
+        self.clear_pose_mix()
+
         if not self.get_active_rig():
             self.update_from_scene()
 
-        if pbs.dcc.blend_pose == pose_asset:
+        is_resume = pbs.dcc.blend_pose == pose_asset
+        from_cache = pbs.dcc.begin_blend_session(pose_asset, self.get_active_rig())
+        if is_resume:
             log.info("same pose asset, keeping existing blender engine")
             return
 
-        log.info("Starting Pose Blender Engine")
-        self.blender_engine = pbs.dcc.set_blend_pose(pose_asset)
-        pbs.dcc.cache_pre_blend(self.get_active_rig())
-        pbs.dcc.apply_pose_asset(
-            pose_asset,
-            self.get_active_rig(),
-        )
-        pbs.dcc.cache_blend_target(self.get_active_rig())
-        pbs.dcc.blend_cached_pose(weight=0)
-        log.info("Started Engine")
+        changed_count, cached_count = pbs.dcc.get_blend_channel_counts()
+        log.info("Started Engine, blending {} of {} channels{}".format(
+            changed_count,
+            cached_count,
+            " (cached target)" if from_cache else "",
+        ))
 
     def blend_active_pose(self, weight):
-        pbs.dcc.blend_cached_pose(weight)
+        pbs.dcc.update_blend_session(weight)
+
+    def finish_blending(self):
+        self.blend_scheduler.flush()
+        pbs.dcc.commit_blend_session()
+
+    def cancel_blending(self):
+        self.blend_scheduler.cancel()
+        pbs.dcc.cancel_blend_session()
+        log.info("Cancelled blend")
 
     def apply_pose(self, pose_asset):
         if not self.get_active_rig():
@@ -128,27 +467,148 @@ class PoseBlenderWidget(QtWidgets.QWidget):
             log.warning("Failed to find rig in scene")
             return
 
-        pbs.dcc.apply_pose_asset(
+        self.clear_pose_mix()
+        pbs.dcc.apply_pose(
             pose_asset,
             self.get_active_rig(),
         )
         pbs.dcc.remove_caches()
 
+    def add_pose_to_mix(self, pose_asset):
+        self.blend_scheduler.flush()
+        self.mix_scheduler.flush()
+
+        if not self.get_active_rig():
+            self.update_from_scene()
+
+        if not self.get_active_rig():
+            log.warning("Failed to find rig in scene")
+            return
+
+        if self.ui.pose_mix_widget.has_pose(pose_asset):
+            return
+
+        if not pbs.dcc.is_pose_mix_active():
+            pbs.dcc.remove_caches()
+            pbs.dcc.pose_mix_mode = self.ui.pose_mix_widget.get_mode()
+            pbs.dcc.start_pose_mix(self.get_active_rig())
+
+        # new poses start at 0 so adding one doesn't change the mix
+        pbs.dcc.add_mix_pose(pose_asset, weight=0.0)
+        self.ui.pose_mix_widget.add_pose(pose_asset)
+        log.info("Mixing {} poses, blending {} of {} channels".format(
+            pbs.dcc.pose_mix_cache.target_count,
+            pbs.dcc.pose_mix_cache.changed_count,
+            len(pbs.dcc.pose_mix_cache),
+        ))
+
+    def remove_pose_from_mix(self, pose_asset):
+        self.ui.pose_mix_widget.flush_commit()
+        self.mix_scheduler.flush()
+        pbs.dcc.remove_mix_pose(pose_asset)
+        if not pbs.dcc.pose_mix_cache.target_count:
+            self.clear_pose_mix()
+
+    def blend_pose_mix(self, *args):
+        # the scheduler only decides when to blend, the weights are read from the mix widget
+        if pbs.dcc.is_pose_mix_active():
+            pbs.dcc.blend_pose_mix(self.ui.pose_mix_widget.get_weights(), undoable=False)
+
+    def commit_pose_mix(self):
+        self.mix_scheduler.flush()
+        if pbs.dcc.is_pose_mix_active():
+            pbs.dcc.commit_pose_mix()
+
+    def set_pose_mix_mode(self, mode):
+        pbs.dcc.pose_mix_mode = mode
+        self.blend_pose_mix()
+        self.commit_pose_mix()
+
+    def clear_pose_mix(self):
+        """
+        End the active mix, keeping the mixed values in the scene
+        """
+        self.ui.pose_mix_widget.flush_commit()
+        self.mix_scheduler.flush()
+        self.ui.pose_mix_widget.clear()
+        if pbs.dcc.is_pose_mix_active():
+            pbs.dcc.clear_pose_mix()
+
+    def rebuild_search_index(self):
+        if self.ui.pose_model is not None:
+            pose_assets = self.ui.pose_model.pose_assets
+        else:
+            pose_assets = [pose_widget.pose_asset for pose_widget in self.get_pose_widgets()]
+        self.search_index.build(pose_assets)
+
+    def apply_pose_filter(self):
+        self.filter_poses(self.ui.pose_filter.text())
+
     def filter_poses(self, filter_text):
-        for pose_widget in self.get_pose_widgets():  # type: PoseWidget
-            pose_widget.list_widget_item.setHidden(False)
-            if filter_text.lower() not in pose_widget.pose_asset.pose_name.lower():
-                pose_widget.list_widget_item.setHidden(True)
+        """
+        Show the poses matching filter_text, see pose_blender_search for the query syntax.
+        Only items whose visibility changes get touched.
+        """
+        row_count = len(self.search_index)
+        matches = self.search_index.query(filter_text)
+        if matches is None:
+            matches = set(range(row_count))
+
+        if self.visible_rows is None:
+            rows_to_show = matches
+            rows_to_hide = set(range(row_count)) - matches
+        else:
+            rows_to_show = matches - self.visible_rows
+            rows_to_hide = self.visible_rows - matches
+
+        for row in rows_to_show:
+            self.set_row_hidden(row, False)
+        for row in rows_to_hide:
+            self.set_row_hidden(row, True)
+        self.visible_rows = matches
+
+        if rows_to_show or rows_to_hide:
+            self.update_thumbnail_jobs()
+
+    def filter_new_rows(self, first_row):
+        """
+        Filter the rows from first_row on, leaving the rows before it as they are
+        """
+        new_rows = range(first_row, len(self.search_index))
+        matches = self.search_index.query(self.ui.pose_filter.text(), rows=new_rows)
+        if matches is None:
+            matches = new_rows
+
+        for row in new_rows:
+            if row not in matches:
+                self.set_row_hidden(row, True)
+
+        if self.visible_rows is not None:
+            self.visible_rows.update(matches)
+
+    def set_row_hidden(self, row, hidden):
+        if self.ui.pose_model is not None:
+            self.ui.pose_grid.setRowHidden(row, hidden)
+        else:
+            self.ui.pose_grid.item(row).setHidden(hidden)
 
     def update_pose_size(self, new_size):
+        if self.ui.pose_model is not None:
+            self.ui.pose_grid.set_image_size(new_size)
+            return
+
         for pose_widget in self.get_pose_widgets():  # type: PoseWidget
             pose_widget.update_size(new_size)
         self.ui.pose_grid.doItemsLayout()
+        self.thumbnail_scroll_timer.start()
 
     def get_pose_widgets(self):
         return [lwi.data(QtCore.Qt.UserRole) for lwi in self.get_pose_list_widgets()]
 
     def get_pose_list_widgets(self):
+        if self.ui.pose_model is not None:
+            return []
+
         list_widgets = []
         for item_index in range(self.ui.pose_grid.count()):
             lwi = self.ui.pose_grid.item(item_index)  # type: QtWidgets.QListWidgetItem
@@ -162,13 +622,17 @@ class PoseBlenderWidget(QtWidgets.QWidget):
         pbs.dcc.active_rig = rig_name
         log.info("Set active rig: {}".format(rig_name))
 
-    def refresh_grid_display(self):
+    def get_grid_display_settings(self):
         if self.ui.pose_grid.viewMode() == QtWidgets.QListWidget.IconMode:
             layout_dir = QtWidgets.QBoxLayout.Down
             label_size_policy = QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Minimum
         else:
             layout_dir = QtWidgets.QBoxLayout.LeftToRight
             label_size_policy = QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Minimum
+        return layout_dir, label_size_policy
+
+    def refresh_grid_display(self):
+        layout_dir, label_size_policy = self.get_grid_display_settings()
 
         # update pose widget display
         for pose_widget in self.get_pose_widgets():  # type: PoseWidget
@@ -190,9 +654,12 @@ class PoseBlenderWidget(QtWidgets.QWidget):
 
 class PoseWidget(QtWidgets.QPushButton):
     apply_pose = QtCore.Signal(k.PoseAsset)
+    add_to_mix = QtCore.Signal(k.PoseAsset)
 
     start_blending = QtCore.Signal(k.PoseAsset)
     blend_active_pose = QtCore.Signal(float)
+    stop_blending = QtCore.Signal()
+    cancel_blending = QtCore.Signal()
 
     def __init__(self, parent, pose_asset):
         """
@@ -208,6 +675,14 @@ class PoseWidget(QtWidgets.QPushButton):
         self.item_label = None # type: QtWidgets.QLabel
         self.image_size = 180
 
+        # thumbnail read from pose_asset.thumbnail_path through the thumbnail cache
+        self.thumbnail_image = None  # type: QtGui.QImage
+        self.thumbnail_bucket = 0
+        self.thumbnail_loaded = False
+
+        # middle mouse drag in progress, Esc cancels it
+        self.is_blending = False
+
         self.set_thumbnail_from_pose_asset()
         self.update_size(self.image_size)
 
@@ -220,6 +695,7 @@ class PoseWidget(QtWidgets.QPushButton):
         pbs.dcc.selected_pose = self.pose_asset
 
         if event.buttons() == QtCore.Qt.MidButton:
+            self.is_blending = True
             self.start_blending.emit(self.pose_asset)
 
         elif event.buttons() == QtCore.Qt.LeftButton:
@@ -236,6 +712,7 @@ class PoseWidget(QtWidgets.QPushButton):
 
             action_list = [
                 {"Apply Pose": self.trigger_apply_pose},
+                {"Add to Mix": partial(self.add_to_mix.emit, self.pose_asset)},
                 "-"
             ]
 
@@ -251,17 +728,29 @@ class PoseWidget(QtWidgets.QPushButton):
         event.accept()
 
     def mouseReleaseEvent(self, event):
+        if event.button() == QtCore.Qt.MidButton and self.is_blending:
+            self.is_blending = False
+            self.stop_blending.emit()
         self.value_display_overlay.setVisible(False)
 
+    def keyPressEvent(self, event):
+        if event.key() == QtCore.Qt.Key_Escape and self.is_blending:
+            self.is_blending = False
+            self.cancel_blending.emit()
+            self.value_display_overlay.setVisible(False)
+            event.accept()
+            return
+        super(PoseWidget, self).keyPressEvent(event)
+
     def mouseMoveEvent(self, event):
-        if event.buttons() == QtCore.Qt.MidButton:
+        if event.buttons() == QtCore.Qt.MidButton and self.is_blending:
             weight_value = 1.0 - event.y() / self.image_size
             self.blend_active_pose.emit(weight_value)
 
             # update display
             self.value_display_overlay.weight = weight_value
             self.value_display_overlay.setVisible(True)
-            self.value_display_overlay.repaint()
+            self.value_display_overlay.update()
 
     def resizeEvent(self, event):
         self.value_display_overlay.resize(event.size())
@@ -277,6 +766,38 @@ class PoseWidget(QtWidgets.QPushButton):
         if self.list_widget_item and self.item_main_widget:
             self.list_widget_item.setSizeHint(self.item_main_widget.sizeHint())
 
+        # grown past the cached thumbnail resolution, ask for a new load
+        if self.thumbnail_image is not None and thumbnail_cache.get_size_bucket(size) > self.thumbnail_bucket:
+            self.thumbnail_loaded = False
+
+    def update_pose_asset(self, pose_asset, reload_thumbnail=False):
+        """
+        Swap in a newer PoseAsset for the same pose, only refreshing the parts that changed
+
+        Args:
+            pose_asset (k.PoseAsset):
+            reload_thumbnail (bool): the pose file changed on disk, so the thumbnail may have as well
+        """
+        old_pose_asset = self.pose_asset
+        self.pose_asset = pose_asset
+
+        if old_pose_asset.pose_name != pose_asset.pose_name and self.item_label:
+            self.item_label.setText(pose_asset.pose_name)
+            self.item_main_widget.setToolTip(pose_asset.pose_name)
+
+        if old_pose_asset.is_favorite != pose_asset.is_favorite:
+            self.set_favorite_display()
+
+        if (reload_thumbnail
+                or old_pose_asset.thumbnail_path != pose_asset.thumbnail_path
+                or old_pose_asset.needs_sync != pose_asset.needs_sync):
+            self.thumbnail_image = None
+            self.thumbnail_loaded = False
+            self.update_icon()
+        elif pose_asset.thumbnail_image is None and not pose_asset.thumbnail_path:
+            # thumbnails set through PoseAsset.set_thumbnail_data() live on the asset itself
+            pose_asset.thumbnail_image = old_pose_asset.thumbnail_image
+
     def trigger_apply_pose(self):
         self.apply_pose.emit(self.pose_asset)
 
@@ -290,15 +811,30 @@ class PoseWidget(QtWidgets.QPushButton):
 
     def set_thumbnail_from_pose_asset(self, from_disk=False):
         if from_disk:
-            self.pose_asset.set_thumbnail_data()
+            self.set_thumbnail_image(load_pose_thumbnail_image(self.pose_asset, self.image_size))
+            return
+
+        self.update_icon()
 
+    def set_thumbnail_image(self, image, size=None):
+        """
+        Apply a thumbnail loaded by load_pose_thumbnail_image(), GUI thread only
+        """
+        self.thumbnail_image = image
+        self.thumbnail_bucket = thumbnail_cache.get_size_bucket(size or self.image_size)
+        self.thumbnail_loaded = True
+        self.update_icon()
+
+    def update_icon(self):
         if self.pose_asset.needs_sync:
-            thumbnail = QtGui.QImage(resources.get_image_path("p4_out_of_sync"))
+            thumbnail = get_resource_image("p4_out_of_sync")
         else:
-            if self.pose_asset.thumbnail_image:
+            if self.thumbnail_image:
+                thumbnail = self.thumbnail_image
+            elif self.pose_asset.thumbnail_image:
                 thumbnail = self.pose_asset.thumbnail_image
             else:
-                thumbnail = QtGui.QImage(resources.get_image_path("undefined"))
+                thumbnail = get_resource_image("undefined")
 
         icon = QtGui.QIcon()
         pixmap = QtGui.QPixmap.fromImage(thumbnail)
@@ -312,6 +848,878 @@ class PoseWidget(QtWidgets.QPushButton):
             self.setStyleSheet("")
 
 
+def get_display_state(pose_asset):
+    return pose_asset.pose_name, pose_asset.is_favorite, pose_asset.needs_sync, pose_asset.thumbnail_path
+
+
+def load_pose_thumbnail_image(pose_asset, size):
+    """
+    Decode the thumbnail for a pose asset, safe to run in worker threads.
+
+    Returns:
+        QtGui.QImage: or None
+    """
+    if pose_asset.thumbnail_path:
+        return thumbnail_cache.get_thumbnail_cache().get_image(pose_asset.thumbnail_path, size)
+
+    pose_asset.set_thumbnail_data()
+    return pose_asset.thumbnail_image
+
+
+class ThumbnailLoadJob(QtCore.QRunnable):
+    def __init__(self, loader, key, pose_asset, image_size):
+        super(ThumbnailLoadJob, self).__init__()
+        self.setAutoDelete(False)  # the loader holds on to jobs so they can be taken back from the pool
+
+        self.loader = loader
+        self.key = key
+        self.generation = loader.generation
+        self.cancelled = False
+
+        # the worker thread never touches the requesting widget
+        self.pose_asset = pose_asset
+        self.image_size = image_size
+
+    def run(self):
+        if self.cancelled or self.generation != self.loader.generation:
+            return
+
+        try:
+            with timing.span("load_thumbnail", size=self.image_size):
+                image = load_pose_thumbnail_image(self.pose_asset, self.image_size)
+        except Exception as e:
+            log.warning("Failed to parse thumbnail data from: {} - {}".format(self.pose_asset.pose_name, e))
+            image = None
+
+        self.loader.job_finished.emit(self, image)
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """
+    Decodes pose thumbnails into QImages on a bounded thread pool,
+    results come back on the GUI thread through thumbnail_loaded.
+    """
+    job_finished = QtCore.Signal(object, object)
+    thumbnail_loaded = QtCore.Signal(object, object, int)  # request key, QImage, requested size
+
+    default_max_threads = 4
+
+    def __init__(self, parent=None, max_threads=None):
+        super(ThumbnailLoader, self).__init__(parent)
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_threads or self.default_max_threads)
+
+        self.jobs = {}  # {request key: ThumbnailLoadJob}
+        self.generation = 0
+
+        # signals emitted from the pool are queued onto the thread this object lives in
+        self.job_finished.connect(self._on_job_finished)
+
+    def request(self, key, pose_asset, image_size, high_priority=False):
+        """
+        Args:
+            key: hashable that identifies the request, passed back through thumbnail_loaded
+            pose_asset (k.PoseAsset):
+            image_size (int):
+            high_priority (bool): load before anything that's not high priority
+        """
+        priority = 1 if high_priority else 0
+
+        job = self.jobs.get(key)
+        if job is not None:
+            # already queued, bump it if it's now visible
+            if high_priority and self._try_take(job):
+                self.thread_pool.start(job, priority)
+            return
+
+        job = ThumbnailLoadJob(self, key, pose_asset, image_size)
+        self.jobs[key] = job
+        self.thread_pool.start(job, priority)
+
+    def is_queued(self, key):
+        return key in self.jobs
+
+    def cancel(self, key):
+        job = self.jobs.pop(key, None)
+        if job is not None:
+            job.cancelled = True
+            self._try_take(job)
+
+    def cancel_all(self):
+        self.generation += 1
+        for key in list(self.jobs.keys()):
+            self.cancel(key)
+
+    def wait_for_done(self, msecs=-1):
+        self.thread_pool.waitForDone(msecs)
+        QtCore.QCoreApplication.sendPostedEvents(self)
+
+    def _try_take(self, job):
+        if hasattr(self.thread_pool, "tryTake"):
+            return self.thread_pool.tryTake(job)
+        return False
+
+    def _on_job_finished(self, job, image):
+        if job.cancelled or job.generation != self.generation:
+            return
+        if self.jobs.get(job.key) is job:
+            self.jobs.pop(job.key)
+        self.thumbnail_loaded.emit(job.key, image, job.image_size)
+
+
+class PoseStreamJob(QtCore.QRunnable):
+    def __init__(self, loader, pose_stream):
+        super(PoseStreamJob, self).__init__()
+        self.setAutoDelete(False)
+
+        self.loader = loader
+        self.pose_stream = pose_stream
+        self.cancelled = False
+
+    def run(self):
+        pose_count = 0
+        error = None
+        with timing.span("pose_stream"):
+            try:
+                batches = pose_blender_pose_stream.iter_pose_batches(self.pose_stream)
+                for batch in batches:
+                    if self.cancelled:
+                        batches.close()
+                        break
+                    pose_count += len(batch)
+                    self.loader.batch_ready.emit(self, batch)
+            except Exception as e:
+                log.exception("Pose stream failed")
+                error = str(e)
+
+        self.loader.job_finished.emit(self, pose_count, error)
+
+
+class PoseStreamLoader(QtCore.QObject):
+    """
+    Consumes a get_poses() generator on a worker thread,
+    batches of PoseAssets come back on the GUI thread through batch_loaded.
+
+    A fast producer can queue up far more poses than the grid can add in one go, so they are
+    handed out in chunks of delivery_chunk_size, for at most delivery_budget_ms per event loop turn.
+    """
+    batch_ready = QtCore.Signal(object, object)
+    job_finished = QtCore.Signal(object, int, object)
+    batch_loaded = QtCore.Signal(object)  # list of PoseAssets
+    finished = QtCore.Signal(int, object)  # pose count, error message or None
+
+    delivery_chunk_size = 100
+    delivery_budget_ms = 15
+
+    def __init__(self, parent=None):
+        super(PoseStreamLoader, self).__init__(parent)
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.job = None
+
+        self.pending_poses = collections.deque()
+        self.finished_result = None  # (pose_count, error) once the job is done
+
+        self.delivery_timer = QtCore.QTimer(self)
+        self.delivery_timer.setInterval(0)
+        self.delivery_timer.timeout.connect(self._deliver_poses)
+
+        # signals emitted from the pool are queued onto the thread this object lives in
+        self.batch_ready.connect(self._on_batch_ready)
+        self.job_finished.connect(self._on_job_finished)
+
+    def start(self, pose_stream):
+        self.cancel()
+        self.job = PoseStreamJob(self, pose_stream)
+        self.thread_pool.start(self.job)
+
+    def is_running(self):
+        return self.job is not None
+
+    def cancel(self):
+        """
+        Stop handing out batches, the producer stops once its current item is done
+        """
+        if self.job is not None:
+            self.job.cancelled = True
+            self.job = None
+        self.pending_poses.clear()
+        self.finished_result = None
+        self.delivery_timer.stop()
+
+    def wait_for_done(self, msecs=-1):
+        self.thread_pool.waitForDone(msecs)
+        QtCore.QCoreApplication.sendPostedEvents(self)
+
+    def _on_batch_ready(self, job, batch):
+        if job is self.job and not job.cancelled:
+            self.pending_poses.extend(batch)
+            self.delivery_timer.start()
+
+    def _on_job_finished(self, job, pose_count, error):
+        if job is self.job and not job.cancelled:
+            self.finished_result = (pose_count, error)
+            self.delivery_timer.start()
+
+    def _deliver_poses(self):
+        job = self.job
+        deadline = timing.clock() + self.delivery_budget_ms / 1000.0
+        pending_poses = self.pending_poses
+        while pending_poses and timing.clock() < deadline:
+            chunk_size = min(self.delivery_chunk_size, len(pending_poses))
+            self.batch_loaded.emit([pending_poses.popleft() for _ in range(chunk_size)])
+            if self.job is not job:
+                return  # cancelled or restarted from a slot
+
+        if pending_poses or self.finished_result is None:
+            if not pending_poses:
+                self.delivery_timer.stop()
+            return
+
+        self.delivery_timer.stop()
+        pose_count, error = self.finished_result
+        self.job = None
+        self.finished_result = None
+        self.finished.emit(pose_count, error)
+
+
+class LibraryWatcherService(QtCore.QObject):
+    """
+    Polls pose library folders with a pose_blender_library_watcher.PoseLibraryWatcher on a timer.
+
+    QFileSystemWatcher notifications are used as a fast path for the folders it can watch, but
+    network shares often don't send them, so polling carries on either way.
+    """
+    changed = QtCore.Signal(object)  # pose_blender_library_watcher.LibraryChanges
+
+    default_poll_interval_ms = 2000
+    default_time_budget_ms = 5
+
+    # every watched folder costs an OS handle, past this only polling is used
+    max_watched_dirs = 256
+
+    # tools save files in several steps, let them finish before looking
+    notification_delay_ms = 200
+
+    def __init__(
+            self,
+            library_paths,
+            parent=None,
+            poll_interval_ms=None,
+            time_budget_ms=None,
+            file_extensions=(".pose",),
+            use_file_system_watcher=True,
+    ):
+        """
+        Args:
+            library_paths (list): pose library folders
+            parent (QtCore.QObject):
+            poll_interval_ms (int): time between polls
+            time_budget_ms (float): max time a poll may take, the next poll continues where it stopped
+            file_extensions (tuple): pose files to watch
+            use_file_system_watcher (bool): use QFileSystemWatcher notifications on top of polling
+        """
+        super(LibraryWatcherService, self).__init__(parent)
+        self.watcher = pose_blender_library_watcher.PoseLibraryWatcher(library_paths, file_extensions)
+        self.time_budget_ms = self.default_time_budget_ms if time_budget_ms is None else time_budget_ms
+
+        self.poll_timer = QtCore.QTimer(self)
+        self.poll_timer.setInterval(poll_interval_ms or self.default_poll_interval_ms)
+        self.poll_timer.timeout.connect(self.poll)
+
+        self.notification_timer = QtCore.QTimer(self)
+        self.notification_timer.setSingleShot(True)
+        self.notification_timer.setInterval(self.notification_delay_ms)
+        self.notification_timer.timeout.connect(self.poll)
+
+        self.file_system_watcher = None
+        self._watched_structure_version = None
+        if use_file_system_watcher:
+            self.file_system_watcher = QtCore.QFileSystemWatcher(self)
+            self.file_system_watcher.directoryChanged.connect(self._on_directory_changed)
+
+    def start(self):
+        self.poll()
+        self.poll_timer.start()
+
+    def stop(self):
+        self.poll_timer.stop()
+        self.notification_timer.stop()
+
+    def set_poll_interval(self, poll_interval_ms):
+        self.poll_timer.setInterval(poll_interval_ms)
+
+    def set_time_budget(self, time_budget_ms):
+        self.time_budget_ms = time_budget_ms
+
+    def poll(self):
+        changes = self.watcher.poll(self.time_budget_ms / 1000.0)
+        self.update_watched_dirs()
+        if changes:
+            self.changed.emit(changes)
+        return changes
+
+    def update_watched_dirs(self):
+        if self.file_system_watcher is None:
+            return
+        if self._watched_structure_version == self.watcher.structure_version:
+            return
+        self._watched_structure_version = self.watcher.structure_version
+
+        # shallow folders first, they tend to be where new poses and folders show up
+        dir_paths = sorted(self.watcher.dir_mtimes, key=lambda dir_path: (dir_path.count("/"), dir_path))
+        wanted_dirs = set(dir_paths[:self.max_watched_dirs])
+        watched_dirs = set(self.file_system_watcher.directories())
+
+        removed_dirs = watched_dirs - wanted_dirs
+        if removed_dirs:
+            self.file_system_watcher.removePaths(sorted(removed_dirs))
+        added_dirs = wanted_dirs - watched_dirs
+        if added_dirs:
+            self.file_system_watcher.addPaths(sorted(added_dirs))
+
+    def _on_directory_changed(self, dir_path):
+        self.watcher.mark_dirs_changed([dir_path])
+        self.notification_timer.start()
+
+
+class PoseListModel(QtCore.QAbstractListModel):
+    """
+    Virtualized alternative to a PoseWidget per pose, thumbnails are only loaded for rows that get painted
+    """
+    PoseAssetRole = QtCore.Qt.UserRole + 1
+
+    max_cached_pixmaps = 1024
+
+    def __init__(self, parent=None):
+        super(PoseListModel, self).__init__(parent)
+        self.pose_assets = []  # type: list[k.PoseAsset]
+        self.pose_asset_rows = {}  # {PoseAsset: row}
+
+        self.thumbnail_loader = ThumbnailLoader(self)
+        self.thumbnail_loader.thumbnail_loaded.connect(self._on_thumbnail_loaded)
+        self._pixmaps = collections.OrderedDict()  # {(PoseAsset, bucket): QPixmap}
+
+    def set_pose_assets(self, pose_assets):
+        self.thumbnail_loader.cancel_all()
+        self.beginResetModel()
+        self.pose_assets = list(pose_assets)
+        self.pose_asset_rows = {pose_asset: row for row, pose_asset in enumerate(self.pose_assets)}
+        self._pixmaps.clear()
+        self.endResetModel()
+
+    def append_pose_assets(self, pose_assets):
+        if not pose_assets:
+            return
+        first_row = len(self.pose_assets)
+        self.beginInsertRows(QtCore.QModelIndex(), first_row, first_row + len(pose_assets) - 1)
+        self.pose_assets.extend(pose_assets)
+        for row, pose_asset in enumerate(pose_assets, first_row):
+            self.pose_asset_rows[pose_asset] = row
+        self.endInsertRows()
+
+    def update_pose_assets(self, pose_assets, modified_keys=()):
+        """
+        Apply a new pose list as row inserts/removes/updates, keyed by PoseAsset.get_key()
+
+        Args:
+            pose_assets (list):
+            modified_keys (set): keys of poses to swap in and redraw even when nothing visible changed
+        """
+        new_pose_keys = set(pose_asset.get_key() for pose_asset in pose_assets)
+
+        existing_assets = {}
+        for row in reversed(range(len(self.pose_assets))):
+            pose_asset = self.pose_assets[row]
+            pose_key = pose_asset.get_key()
+            if pose_key in new_pose_keys:
+                existing_assets[pose_key] = pose_asset
+                continue
+
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            self.pose_assets.pop(row)
+            self.endRemoveRows()
+
+        for row, pose_asset in enumerate(pose_assets):
+            if pose_asset.get_key() not in existing_assets:
+                self.beginInsertRows(QtCore.QModelIndex(), row, row)
+                self.pose_assets.insert(row, pose_asset)
+                self.endInsertRows()
+
+        # existing rows kept their old order, so a reordered list puts other poses on them
+        replaced_assets = []
+        replaced_rows = []
+        for row, pose_asset in enumerate(pose_assets):
+            old_pose_asset = self.pose_assets[row]
+
+            # keep the old object if it's the same pose and nothing visible changed, so cached thumbnails stay valid
+            if old_pose_asset is pose_asset:
+                continue
+            if (old_pose_asset.get_key() == pose_asset.get_key()
+                    and get_display_state(old_pose_asset) == get_display_state(pose_asset)
+                    and pose_asset.get_key() not in modified_keys):
+                continue
+
+            self.pose_assets[row] = pose_asset
+            replaced_assets.append(old_pose_asset)
+            replaced_rows.append(row)
+
+        self.pose_asset_rows = {pose_asset: row for row, pose_asset in enumerate(self.pose_assets)}
+
+        for old_pose_asset in replaced_assets:
+            self.refresh_pose_asset(old_pose_asset)
+        for row in replaced_rows:
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.pose_assets)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        pose_asset = self.pose_assets[index.row()]
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+            return pose_asset.pose_name
+        if role == self.PoseAssetRole:
+            return pose_asset
+        return None
+
+    def refresh_pose_asset(self, pose_asset):
+        """
+        Redraw a pose after its state changed, dropping any cached thumbnail
+        """
+        for cache_key in [key for key in self._pixmaps if key[0] is pose_asset]:
+            self._pixmaps.pop(cache_key)
+
+        row = self.pose_asset_rows.get(pose_asset)
+        if row is not None:
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+    def get_thumbnail_pixmap(self, pose_asset, image_size):
+        if pose_asset.needs_sync:
+            return get_resource_pixmap("p4_out_of_sync")
+
+        bucket = thumbnail_cache.get_size_bucket(image_size)
+        pixmap = self._pixmaps.get((pose_asset, bucket))
+        if pixmap is not None:
+            return pixmap
+
+        if pose_asset.thumbnail_image:
+            pixmap = QtGui.QPixmap.fromImage(pose_asset.thumbnail_image)
+            self._add_pixmap((pose_asset, bucket), pixmap)
+            return pixmap
+
+        self.thumbnail_loader.request((pose_asset, bucket), pose_asset, image_size, high_priority=True)
+
+        # show a lower resolution version while loading, if there is one
+        for smaller_bucket in reversed(thumbnail_cache.SIZE_BUCKETS):
+            pixmap = self._pixmaps.get((pose_asset, smaller_bucket))
+            if smaller_bucket < bucket and pixmap is not None:
+                return pixmap
+
+        return get_resource_pixmap("undefined")
+
+    def _add_pixmap(self, cache_key, pixmap):
+        self._pixmaps[cache_key] = pixmap
+        while len(self._pixmaps) > self.max_cached_pixmaps:
+            self._pixmaps.popitem(last=False)
+
+    def _on_thumbnail_loaded(self, cache_key, image, image_size):
+        if image is None or image.isNull():
+            pixmap = get_resource_pixmap("undefined")
+        else:
+            pixmap = QtGui.QPixmap.fromImage(image)
+        self._add_pixmap(cache_key, pixmap)
+
+        row = self.pose_asset_rows.get(cache_key[0])
+        if row is not None:
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+
+class PoseItemDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints what a PoseWidget + label would look like
+    """
+    label_height = 18
+    item_margin = 3
+    list_label_width = 200
+
+    def __init__(self, view):
+        super(PoseItemDelegate, self).__init__(view)
+        self.view = view  # type: PoseListView
+
+    def sizeHint(self, option, index):
+        image_size = self.view.image_size
+        margins = self.item_margin * 2
+        if self.view.viewMode() == QtWidgets.QListView.IconMode:
+            return QtCore.QSize(image_size + margins, image_size + self.label_height + margins)
+        return QtCore.QSize(image_size + self.list_label_width + margins, image_size + margins)
+
+    def get_button_rect(self, item_rect):
+        image_size = self.view.image_size
+        return QtCore.QRect(
+            item_rect.left() + self.item_margin,
+            item_rect.top() + self.item_margin,
+            image_size,
+            image_size,
+        )
+
+    def paint(self, painter, option, index):
+        pose_asset = index.data(PoseListModel.PoseAssetRole)  # type: k.PoseAsset
+        image_size = self.view.image_size
+        button_rect = self.get_button_rect(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+
+        # button
+        if pose_asset.is_favorite:
+            button_color = QtGui.QColor(255, 211, 57)
+        else:
+            button_color = option.palette.button().color()
+        painter.fillRect(button_rect, button_color)
+
+        # thumbnail, fit inside the same margin the PoseWidget icon uses
+        margin = int(image_size * 0.05)
+        icon_rect = button_rect.adjusted(margin, margin, -margin, -margin)
+        pixmap = index.model().get_thumbnail_pixmap(pose_asset, image_size)
+        if not pixmap.isNull():
+            pixmap_size = pixmap.size()
+            pixmap_size.scale(icon_rect.size(), QtCore.Qt.KeepAspectRatio)
+            pixmap_rect = QtCore.QRect(QtCore.QPoint(0, 0), pixmap_size)
+            pixmap_rect.moveCenter(icon_rect.center())
+            painter.drawPixmap(pixmap_rect, pixmap)
+
+        # label
+        if self.view.viewMode() == QtWidgets.QListView.IconMode:
+            label_rect = QtCore.QRect(button_rect.left(), button_rect.bottom(), image_size, self.label_height)
+            label_alignment = QtCore.Qt.AlignCenter
+        else:
+            label_rect = QtCore.QRect(
+                button_rect.right() + self.item_margin,
+                button_rect.top(),
+                option.rect.right() - button_rect.right() - self.item_margin,
+                image_size,
+            )
+            label_alignment = QtCore.Qt.AlignVCenter  # horizontal defaults to left
+        label_text = option.fontMetrics.elidedText(pose_asset.pose_name, QtCore.Qt.ElideRight, label_rect.width())
+        painter.setPen(option.palette.text().color())
+        painter.drawText(label_rect, label_alignment, label_text)
+
+        # blend weight overlay
+        if self.view.blend_row == index.row():
+            painter.fillRect(button_rect, QtGui.QBrush(QtGui.QColor(100, 100, 100, 100)))
+            painter.drawText(button_rect, QtCore.Qt.AlignCenter, str(round(self.view.blend_weight, 2)))
+
+        painter.restore()
+
+
+class PoseListView(QtWidgets.QListView):
+    """
+    Same signals as PoseWidget, so it plugs into PoseBlenderWidget the same way
+    """
+    apply_pose = QtCore.Signal(k.PoseAsset)
+    add_to_mix = QtCore.Signal(k.PoseAsset)
+
+    start_blending = QtCore.Signal(k.PoseAsset)
+    blend_active_pose = QtCore.Signal(float)
+    stop_blending = QtCore.Signal()
+    cancel_blending = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super(PoseListView, self).__init__(parent)
+        self.image_size = 180
+
+        self.blend_row = None
+        self.blend_weight = 0.0
+        self.blend_button_rect = QtCore.QRect()
+
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setItemDelegate(PoseItemDelegate(self))
+
+    def set_image_size(self, size):
+        self.image_size = size
+        self.scheduleDelayedItemsLayout()
+
+    def get_pose_asset_at(self, pos):
+        model_index = self.indexAt(pos)
+        if not model_index.isValid():
+            return None, model_index
+        return model_index.data(PoseListModel.PoseAssetRole), model_index
+
+    def mousePressEvent(self, event):
+        pose_asset, model_index = self.get_pose_asset_at(event.pos())
+        if pose_asset is None:
+            return
+
+        button_rect = self.itemDelegate().get_button_rect(self.visualRect(model_index))
+        if not button_rect.contains(event.pos()):
+            return
+
+        pbs.dcc.selected_pose = pose_asset
+
+        if event.buttons() == QtCore.Qt.MidButton:
+            self.blend_row = model_index.row()
+            self.blend_weight = 0.0
+            self.blend_button_rect = button_rect
+            self.start_blending.emit(pose_asset)
+
+        elif event.buttons() == QtCore.Qt.LeftButton:
+
+            if pose_asset.needs_sync:
+                pose_asset.update()
+                self.model().refresh_pose_asset(pose_asset)
+                event.accept()
+                return
+
+            self.apply_pose.emit(pose_asset)
+
+        elif event.buttons() == QtCore.Qt.RightButton:
+
+            action_list = [
+                {"Apply Pose": partial(self.apply_pose.emit, pose_asset)},
+                {"Add to Mix": partial(self.add_to_mix.emit, pose_asset)},
+                "-"
+            ]
+
+            if pose_asset.is_favorite:
+                action_list.append({"Un-Favorite": partial(self.set_pose_favorite_state, pose_asset, False)})
+            else:
+                action_list.append({"Favorite": partial(self.set_pose_favorite_state, pose_asset, True)})
+            action_list.append("-")
+
+            action_list.extend(pbs.dcc.right_click_menu_items)
+            ui_utils.build_menu_from_action_list(action_list)
+
+        event.accept()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == QtCore.Qt.MidButton and self.blend_row is not None:
+            self.stop_blending.emit()
+            blend_index = self.model().index(self.blend_row)
+            self.blend_row = None
+            self.update(blend_index)
+        event.accept()
+
+    def keyPressEvent(self, event):
+        if event.key() == QtCore.Qt.Key_Escape and self.blend_row is not None:
+            self.cancel_blending.emit()
+            blend_index = self.model().index(self.blend_row)
+            self.blend_row = None
+            self.update(blend_index)
+            event.accept()
+            return
+        super(PoseListView, self).keyPressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() == QtCore.Qt.MidButton and self.blend_row is not None:
+            weight_value = 1.0 - (event.y() - self.blend_button_rect.top()) / float(self.image_size)
+            self.blend_active_pose.emit(weight_value)
+
+            self.blend_weight = weight_value
+            self.update(self.model().index(self.blend_row))
+            return
+
+        super(PoseListView, self).mouseMoveEvent(event)
+
+    def set_pose_favorite_state(self, pose_asset, state):
+        pbs.dcc.set_pose_favorite_state(pose_asset, state)
+        self.model().refresh_pose_asset(pose_asset)
+
+
+class BlendScheduler(QtCore.QObject):
+    """
+    Coalesces blend weights coming from mouse drag events.
+
+    Only the latest submitted weight is kept, and it's passed on at most max_rate times per second.
+    flush() sends any pending weight right away, which is what happens on mouse release.
+    """
+    blend_requested = QtCore.Signal(float)
+
+    default_max_rate = 60  # roughly a viewport refresh
+
+    def __init__(self, parent=None, max_rate=None):
+        super(BlendScheduler, self).__init__(parent)
+
+        self.pending_weight = None
+        self.min_interval_ms = 0
+
+        self.last_blend_timer = QtCore.QElapsedTimer()
+        self.last_blend_timer.start()
+
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+
+        self.set_max_rate(self.default_max_rate if max_rate is None else max_rate)
+
+    def set_max_rate(self, max_rate):
+        """
+        Args:
+            max_rate (float): max blends per second, 0 disables the rate cap
+        """
+        self.min_interval_ms = int(1000.0 / max_rate) if max_rate else 0
+
+    def submit(self, weight):
+        self.pending_weight = weight
+
+        # already waiting to flush, that will pick up the new weight
+        if self.flush_timer.isActive():
+            return
+
+        remaining_ms = self.min_interval_ms - self.last_blend_timer.elapsed()
+        if remaining_ms <= 0:
+            self.flush()
+        else:
+            self.flush_timer.start(remaining_ms)
+
+    def flush(self):
+        self.flush_timer.stop()
+        if self.pending_weight is None:
+            return
+
+        weight = self.pending_weight
+        self.pending_weight = None
+        self.last_blend_timer.restart()
+        self.blend_requested.emit(weight)
+
+    def cancel(self):
+        """
+        Drop the pending weight without sending it
+        """
+        self.flush_timer.stop()
+        self.pending_weight = None
+
+
+class PoseMixWidget(QtWidgets.QWidget):
+    """
+    The poses in the active mix, with a weight slider per pose
+    """
+    weight_changed = QtCore.Signal(float)
+    weight_released = QtCore.Signal()
+    mode_changed = QtCore.Signal(str)
+    pose_removed = QtCore.Signal(k.PoseAsset)
+    cleared = QtCore.Signal()
+
+    # clicks on the slider track, the mouse wheel and the keyboard are committed once they settle
+    commit_delay_ms = 300
+
+    def __init__(self, parent=None):
+        super(PoseMixWidget, self).__init__(parent)
+
+        self.pose_rows = collections.OrderedDict()  # {pose_asset.get_key(): (pose_asset, slider, row_widget)}
+
+        self.commit_timer = QtCore.QTimer(self)
+        self.commit_timer.setSingleShot(True)
+        self.commit_timer.setInterval(self.commit_delay_ms)
+        self.commit_timer.timeout.connect(self.weight_released.emit)
+
+        self.mode_chooser = QtWidgets.QComboBox()
+        self.mode_chooser.addItems([mode.title() for mode in pose_blender_blend_cache.MIX_MODES])
+        self.mode_chooser.currentIndexChanged.connect(self.emit_mode_changed)
+
+        self.clear_button = QtWidgets.QPushButton("Clear Mix")
+        self.clear_button.clicked.connect(self.cleared.emit)
+
+        header_layout = QtWidgets.QHBoxLayout()
+        header_layout.addWidget(QtWidgets.QLabel("Pose Mix"))
+        header_layout.addStretch()
+        header_layout.addWidget(self.mode_chooser)
+        header_layout.addWidget(self.clear_button)
+
+        self.rows_layout = QtWidgets.QVBoxLayout()
+        self.rows_layout.setSpacing(1)
+
+        main_layout = QtWidgets.QVBoxLayout()
+        main_layout.setContentsMargins(0, 2, 0, 2)
+        main_layout.setSpacing(2)
+        main_layout.addLayout(header_layout)
+        main_layout.addLayout(self.rows_layout)
+        self.setLayout(main_layout)
+
+        self.setVisible(False)
+
+    def has_pose(self, pose_asset):
+        return pose_asset.get_key() in self.pose_rows
+
+    def add_pose(self, pose_asset, weight=0.0):
+        pose_label = QtWidgets.QLabel(pose_asset.pose_name)
+        pose_label.setMinimumWidth(80)
+
+        slider = QtWidgets.QSlider()
+        slider.setOrientation(QtCore.Qt.Horizontal)
+        slider.setRange(0, 100)
+        slider.setValue(int(weight * 100))
+        slider.valueChanged.connect(partial(self.emit_weight_changed, slider))
+        slider.sliderReleased.connect(self.emit_weight_released)
+
+        remove_button = QtWidgets.QPushButton("x")
+        remove_button.setFixedWidth(20)
+        remove_button.clicked.connect(partial(self.remove_pose, pose_asset))
+
+        row_layout = QtWidgets.QHBoxLayout()
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_layout.addWidget(pose_label)
+        row_layout.addWidget(slider)
+        row_layout.addWidget(remove_button)
+
+        row_widget = QtWidgets.QWidget()
+        row_widget.setLayout(row_layout)
+        self.rows_layout.addWidget(row_widget)
+
+        self.pose_rows[pose_asset.get_key()] = (pose_asset, slider, row_widget)
+        self.setVisible(True)
+
+    def remove_pose(self, pose_asset):
+        pose_row = self.pose_rows.pop(pose_asset.get_key(), None)
+        if pose_row is None:
+            return
+        pose_row[2].deleteLater()
+        self.setVisible(bool(self.pose_rows))
+        self.pose_removed.emit(pose_asset)
+
+    def clear(self):
+        for _, _, row_widget in self.pose_rows.values():
+            row_widget.deleteLater()
+        self.pose_rows.clear()
+        self.setVisible(False)
+
+    def get_weights(self):
+        """
+        Returns:
+            dict: {pose_asset.get_key(): weight}
+        """
+        return {pose_key: slider.value() / 100.0 for pose_key, (_, slider, _) in self.pose_rows.items()}
+
+    def get_mode(self):
+        return pose_blender_blend_cache.MIX_MODES[max(self.mode_chooser.currentIndex(), 0)]
+
+    def emit_weight_changed(self, slider, value):
+        self.weight_changed.emit(value / 100.0)
+        if not slider.isSliderDown():
+            self.commit_timer.start()
+
+    def emit_weight_released(self):
+        self.commit_timer.stop()
+        self.weight_released.emit()
+
+    def flush_commit(self):
+        """
+        Commit a weight change that's still waiting on commit_timer
+        """
+        if self.commit_timer.isActive():
+            self.emit_weight_released()
+
+    def emit_mode_changed(self, *args):
+        self.mode_changed.emit(self.get_mode())
+
+
 class ValueDisplayOverlay(QtWidgets.QWidget):
     def __init__(self, parent=None):
         super(ValueDisplayOverlay, self).__init__(parent)
@@ -333,6 +1741,7 @@ class ValueDisplayOverlay(QtWidgets.QWidget):
 
 class PoseBlenderUI(QtWidgets.QWidget):
     def __init__(self, *args, **kwargs):
+        virtualized_grid = kwargs.pop("virtualized_grid", False)
         super(PoseBlenderUI, self).__init__(*args, **kwargs)
 
         self.pose_filter = QtWidgets.QLineEdit()
@@ -347,12 +1756,27 @@ class PoseBlenderUI(QtWidgets.QWidget):
         self.grid_toggle = QtWidgets.QPushButton("List/Grid")
         self.refresh_poses = QtWidgets.QPushButton("Refresh")
 
-        self.pose_grid = QtWidgets.QListWidget()
+        # busy indicator while poses are streamed in, the total isn't known up front
+        self.pose_stream_progress = QtWidgets.QProgressBar()
+        self.pose_stream_progress.setRange(0, 0)
+        self.pose_stream_progress.setTextVisible(True)
+        self.pose_stream_progress.setMaximumHeight(12)
+        self.pose_stream_progress.setVisible(False)
+
+        self.pose_model = None  # type: PoseListModel
+        if virtualized_grid:
+            self.pose_model = PoseListModel(self)
+            self.pose_grid = PoseListView()
+            self.pose_grid.setModel(self.pose_model)
+        else:
+            self.pose_grid = QtWidgets.QListWidget()
         self.pose_grid.setVerticalScrollMode(QtWidgets.QListWidget.ScrollPerPixel)
         self.pose_grid.setViewMode(QtWidgets.QListWidget.IconMode)
         self.pose_grid.setResizeMode(QtWidgets.QListWidget.Adjust)
         self.pose_grid.setLayoutMode(QtWidgets.QListWidget.Batched)
 
+        self.pose_mix_widget = PoseMixWidget()
+
         self.project_widget_layouts = QtWidgets.QVBoxLayout()
 
         self.rig_chooser = QtWidgets.QComboBox()
@@ -369,8 +1793,10 @@ class PoseBlenderUI(QtWidgets.QWidget):
         grid_controls_layout.addWidget(self.grid_toggle)
         grid_controls_layout.addWidget(self.refresh_poses)
         main_layout.addLayout(grid_controls_layout)
+        main_layout.addWidget(self.pose_stream_progress)
 
         main_layout.addWidget(self.pose_grid)
+        main_layout.addWidget(self.pose_mix_widget)
 
         rig_layout = QtWidgets.QHBoxLayout()
         rig_layout.addWidget(self.rig_chooser)
@@ -380,6 +1806,35 @@ class PoseBlenderUI(QtWidgets.QWidget):
         main_layout.addLayout(self.project_widget_layouts)
         self.setLayout(main_layout)
 
+    def set_pose_stream_progress(self, pose_count):
+        """
+        Args:
+            pose_count (int): poses loaded so far, None hides the progress bar
+        """
+        if pose_count is None:
+            self.pose_stream_progress.setVisible(False)
+            self.refresh_poses.setText("Refresh")
+            return
+
+        self.pose_stream_progress.setFormat("Loading poses... {}".format(pose_count))
+        self.pose_stream_progress.setVisible(True)
+        self.refresh_poses.setText("Cancel")
+
+
+def get_resource_image(image_name):
+    return thumbnail_cache.get_thumbnail_cache().get_image(resources.get_image_path(image_name), size=256)
+
+
+_RESOURCE_PIXMAPS = {}
+
+
+def get_resource_pixmap(image_name):
+    pixmap = _RESOURCE_PIXMAPS.get(image_name)
+    if pixmap is None:
+        pixmap = QtGui.QPixmap.fromImage(get_resource_image(image_name))
+        _RESOURCE_PIXMAPS[image_name] = pixmap
+    return pixmap
+
 
 class PoseBlenderWindow(ui_utils.ToolWindow):
     def __init__(self):
@@ -390,8 +1845,11 @@ class PoseBlenderWindow(ui_utils.ToolWindow):
 
 
 def main(refresh=False):
-    win = PoseBlenderWindow()
-    win.main(refresh=refresh)
+    timing.reset()
+    with timing.span("pose_blender.main"):
+        win = PoseBlenderWindow()
+        win.main(refresh=refresh)
+    timing.log_report()
 
     if standalone_app:
         ui_utils.standalone_app_window = win
@@ -0,0 +1,178 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_blend_cache
+from pose_blender import pose_blender_constants as k
+from pose_blender import pose_blender_dcc_core
+
+
+class RecordingInterface(pose_blender_dcc_core.PoseBlenderCoreInterface):
+    def __init__(self):
+        super(RecordingInterface, self).__init__()
+        self.scene_values = {}
+
+    def get_control_values(self, active_rig):
+        return dict(self.scene_values)
+
+    def set_control_value(self, attr, value):
+        self.scene_values[attr] = value
+
+
+def create_pose_asset(pose_name, pose_data):
+    pose_asset = k.PoseAsset()
+    pose_asset.pose_name = pose_name
+    pose_asset.pose_data = pose_data
+    return pose_asset
+
+
+class TestBlendCache(TestCase):
+
+    def test_evaluate(self):
+        cache = pose_blender_blend_cache.BlendCache()
+        cache.set_pre_values({"a": 0.0, "b": 10.0, "c": 1.0})
+        cache.set_post_values({"a": 1.0, "b": 20.0, "unknown": 5.0})
+
+        self.assertEqual(cache.changed_handles, ["a", "b"])
+        self.assertEqual(cache.evaluate(0.5), [0.5, 15.0])
+        self.assertEqual(cache.evaluate(0.0), [0.0, 10.0])
+
+    def test_changed_channel_epsilon(self):
+        cache = pose_blender_blend_cache.BlendCache(epsilon=0.1)
+        cache.set_pre_values({"a": 0.0, "b": 0.0})
+        cache.set_post_values({"a": 0.05, "b": 1.0})
+        self.assertEqual(cache.changed_count, 1)
+        self.assertEqual(cache.evaluate(1.0), [1.0])
+
+    def test_evaluate_frames(self):
+        cache = pose_blender_blend_cache.BlendCache()
+        cache.set_pre_values({"a": 0.0, "b": 10.0, "c": 1.0})
+        cache.set_post_values({"a": 4.0, "b": 20.0})
+        self.assertEqual(cache.evaluate_frames([0.0, 0.5, 1.0]), [[0.0, 2.0, 4.0], [10.0, 15.0, 20.0]])
+
+    def test_easing_weights(self):
+        get_easing_weights = pose_blender_blend_cache.get_easing_weights
+        self.assertEqual(get_easing_weights(3), [0.0, 0.5, 1.0])
+        self.assertEqual(get_easing_weights(3, pose_blender_blend_cache.EASING_EASE_IN), [0.0, 0.25, 1.0])
+        self.assertEqual(get_easing_weights(3, pose_blender_blend_cache.EASING_EASE_OUT), [0.0, 0.75, 1.0])
+        self.assertEqual(get_easing_weights(3, pose_blender_blend_cache.EASING_EASE_IN_OUT), [0.0, 0.5, 1.0])
+        self.assertEqual(get_easing_weights(3, lambda t: 1.0 - t), [1.0, 0.5, 0.0])
+        self.assertEqual(get_easing_weights(1), [1.0])
+        self.assertRaises(ValueError, get_easing_weights, 3, "bounce")
+
+    def test_interface_blend(self):
+        dcc = RecordingInterface()
+        dcc.scene_values = {"a": 0.0, "b": 2.0}
+        dcc.cache_pre_blend("rig")
+        dcc.scene_values = {"a": 4.0, "b": 2.0}
+        dcc.cache_blend_target("rig")
+
+        dcc.scene_values = {}
+        dcc.blend_cached_pose(0.25)
+        self.assertEqual(dcc.scene_values, {"a": 1.0})
+        self.assertEqual(dcc.get_blend_channel_counts(), (1, 2))
+
+        dcc.remove_caches()
+        self.assertEqual(len(dcc.blend_cache), 0)
+
+    def test_bulk_fallback(self):
+        dcc = RecordingInterface()
+        dcc.set_control_values({"a": 1.0, "b": 2.0})
+        self.assertEqual(dcc.scene_values, {"a": 1.0, "b": 2.0})
+        self.assertEqual(dcc.get_control_values_bulk(["a", "b"]), [None, None])
+
+
+class TestMultiBlendCache(TestCase):
+
+    def setUp(self):
+        self.cache = pose_blender_blend_cache.MultiBlendCache()
+        self.cache.set_pre_values({"a": 0.0, "b": 10.0, "c": 1.0})
+        self.cache.add_target("pose_1", {"a": 2.0, "b": 10.0})
+        self.cache.add_target("pose_2", {"b": 20.0})
+
+    def test_changed_channels(self):
+        self.assertEqual(self.cache.target_keys, ["pose_1", "pose_2"])
+        self.assertEqual(self.cache.changed_handles, ["a", "b"])
+
+    def test_normalized(self):
+        self.assertEqual(self.cache.evaluate([0.5, 0.5]), [1.0, 15.0])
+        # weights past 1 are scaled back down
+        self.assertEqual(self.cache.evaluate([1.0, 1.0]), [1.0, 15.0])
+        self.assertEqual(self.cache.evaluate([0.0, 0.0]), [0.0, 10.0])
+
+    def test_additive(self):
+        mode = pose_blender_blend_cache.MIX_MODE_ADDITIVE
+        self.assertEqual(self.cache.evaluate([1.0, 1.0], mode), [2.0, 20.0])
+        self.assertEqual(self.cache.evaluate([1.0, -0.5], mode), [2.0, 5.0])
+
+    def test_remove_target(self):
+        self.cache.remove_target("pose_2")
+        self.assertEqual(self.cache.changed_handles, ["a"])
+        self.assertEqual(self.cache.evaluate([0.5]), [1.0])
+
+    def test_interface_mix(self):
+        dcc = RecordingInterface()
+        dcc.scene_values = {"a": 0.0, "b": 10.0}
+        dcc.start_pose_mix("rig")
+
+        dcc.apply_pose_asset = lambda pose_asset, rig_name: dcc.scene_values.update(pose_asset.pose_data)
+        pose_1 = create_pose_asset("pose_1", {"a": 2.0})
+        pose_2 = create_pose_asset("pose_2", {"b": 20.0})
+
+        dcc.add_mix_pose(pose_1)
+        dcc.add_mix_pose(pose_2)
+        self.assertEqual(dcc.scene_values, {"a": 0.0, "b": 10.0})
+
+        dcc.blend_pose_mix({"pose_1": 0.5, "pose_2": 0.5})
+        self.assertEqual(dcc.scene_values, {"a": 1.0, "b": 15.0})
+
+        dcc.remove_mix_pose(pose_2)
+        self.assertEqual(dcc.scene_values, {"a": 1.0, "b": 10.0})
+
+
+class TestBlendTargetCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_lru(self):
+        cache = pose_blender_blend_cache.BlendTargetCache(max_entries=2)
+        pose_assets = [create_pose_asset("pose_{}".format(i), {}) for i in range(3)]
+        keys = [cache.get_key(pose_asset, "rig", ["a", "b"]) for pose_asset in pose_assets]
+
+        cache.set(keys[0], pose_assets[0], {"a": 0.0})
+        cache.set(keys[1], pose_assets[1], {"a": 1.0})
+        self.assertEqual(cache.get(keys[0], pose_assets[0]), {"a": 0.0})
+        cache.set(keys[2], pose_assets[2], {"a": 2.0})
+
+        self.assertIsNone(cache.get(keys[1], pose_assets[1]))
+        self.assertEqual(cache.get(keys[0], pose_assets[0]), {"a": 0.0})
+        self.assertNotEqual(keys[0], cache.get_key(pose_assets[0], "rig", ["a"]))
+
+    def test_pose_file_change(self):
+        pose_path = os.path.join(self.temp_dir, "pose.pose")
+        with open(pose_path, "w") as fp:
+            fp.write("a")
+
+        pose_asset = create_pose_asset("pose", {})
+        pose_asset.local_path = pose_path
+
+        cache = pose_blender_blend_cache.BlendTargetCache()
+        key = cache.get_key(pose_asset, "rig", ["a"])
+        cache.set(key, pose_asset, {"a": 1.0})
+        self.assertEqual(cache.get(key, pose_asset), {"a": 1.0})
+
+        with open(pose_path, "w") as fp:
+            fp.write("changed")
+        self.assertIsNone(cache.get(key, pose_asset))
@@ -0,0 +1,325 @@
+import os
+import sys
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_blend_cache
+from pose_blender import pose_blender_constants as k
+from pose_blender import pose_blender_dcc_simulated
+from pose_blender import pose_blender_library
+
+
+def create_pose_asset(pose_name, pose_data):
+    pose_asset = k.PoseAsset()
+    pose_asset.pose_name = pose_name
+    pose_asset.local_path = "sim://poses/{}.pose".format(pose_name)
+    pose_asset.pose_data = pose_data
+    return pose_asset
+
+
+class TestSimulatedDCC(TestCase):
+
+    def setUp(self):
+        self.dcc = pose_blender_dcc_simulated.PoseBlenderSimulated(rig_count=2, controller_count=10, pose_count=5)
+        self.rig_name = self.dcc.rig_names[1]
+
+    def test_scene(self):
+        self.assertEqual(len(self.dcc.get_rigs_in_scene()), 2)
+        self.assertEqual(len(self.dcc.get_control_values(self.rig_name)), 10 * 9)
+
+        self.dcc.selection = ["ctrl_0001"]
+        self.dcc.blend_ignore_attr_names = ["scaleX", "scaleY", "scaleZ"]
+        self.assertEqual(len(self.dcc.get_control_values(self.rig_name)), 6)
+
+    def test_apply_pose(self):
+        pose_asset = self.dcc.get_poses()[3]
+        self.assertIs(pose_asset, self.dcc.get_poses()[3])
+
+        self.dcc.apply_pose_asset(pose_asset, self.rig_name)
+        pose_data = pose_asset.get_pose_data()
+        self.assertEqual(
+            self.dcc.attribute_values["{}:ctrl_0002.rotateY".format(self.rig_name)],
+            pose_data["ctrl_0002.rotateY"],
+        )
+        # other rigs are left alone
+        self.assertEqual(self.dcc.attribute_values["{}:ctrl_0002.rotateY".format(self.dcc.rig_names[0])], 0.0)
+
+        self.assertTrue(self.dcc.undo())
+        self.assertEqual(self.dcc.attribute_values["{}:ctrl_0002.rotateY".format(self.rig_name)], 0.0)
+
+    def test_synthetic_poses_are_deterministic(self):
+        other_dcc = pose_blender_dcc_simulated.PoseBlenderSimulated(rig_count=2, controller_count=10, pose_count=5)
+        self.assertEqual(self.dcc.generate_pose_data(2), other_dcc.generate_pose_data(2))
+        self.assertNotEqual(self.dcc.generate_pose_data(2), self.dcc.generate_pose_data(3))
+
+    def test_pose_library(self):
+        dcc = pose_blender_dcc_simulated.PoseBlenderSimulated(pose_count=5, use_pose_library=True)
+        pose_assets = dcc.get_poses()
+        self.assertIsInstance(pose_assets, pose_blender_library.PoseLibrary)
+        self.assertTrue(pose_assets[0].get_pose_data())
+
+    def test_blend_writes_in_bulk(self):
+        pose_asset = self.dcc.get_poses()[0]
+        self.dcc.cache_pre_blend(self.rig_name)
+        self.dcc.apply_pose_asset(pose_asset, self.rig_name)
+        self.dcc.cache_blend_target(self.rig_name)
+
+        self.dcc.reset_call_counts()
+        self.dcc.blend_cached_pose(0.5)
+        self.assertEqual(self.dcc.call_counts["set_control_values_bulk"], 1)
+        self.assertEqual(self.dcc.call_counts["set_control_value"], 0)
+
+        attr = "{}:ctrl_0000.translateX".format(self.rig_name)
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], pose_asset.get_pose_data()["ctrl_0000.translateX"] * 0.5)
+
+    def test_blend_target_cache(self):
+        poses = self.dcc.get_poses()
+
+        self.assertFalse(self.dcc.cache_blend_pose(poses[0], self.rig_name))
+        self.dcc.blend_cached_pose(1.0)
+        self.assertFalse(self.dcc.cache_blend_pose(poses[1], self.rig_name))
+
+        # blending back to an earlier pose skips the apply/readback
+        self.dcc.reset_call_counts()
+        self.assertTrue(self.dcc.cache_blend_pose(poses[0], self.rig_name))
+        self.assertEqual(self.dcc.call_counts["attributes_written"], 0)
+
+        self.dcc.blend_cached_pose(1.0)
+        attr = "{}:ctrl_0003.rotateZ".format(self.rig_name)
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], poses[0].get_pose_data()["ctrl_0003.rotateZ"])
+
+        # a different controller selection is a different target
+        self.dcc.selection = ["ctrl_0001"]
+        self.assertFalse(self.dcc.cache_blend_pose(poses[0], self.rig_name))
+
+    def test_blend_target_cache_readback(self):
+        self.dcc.evaluate_poses = False
+        pose_a, pose_b = self.dcc.get_poses()[:2]
+        attr = "{}:ctrl_0003.rotateZ".format(self.rig_name)
+
+        # pose A read back while the scene already holds it, so none of its channels differ from the pre values
+        self.dcc.apply_pose(pose_a, self.rig_name)
+        self.assertFalse(self.dcc.cache_blend_pose(pose_a, self.rig_name))
+        self.assertEqual(self.dcc.blend_cache.changed_count, 0)
+
+        self.dcc.cache_blend_pose(pose_b, self.rig_name)
+        self.dcc.blend_cached_pose(1.0)
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], pose_b.get_pose_data()["ctrl_0003.rotateZ"])
+
+        # back to A from the cache, every channel of A is written
+        self.assertTrue(self.dcc.cache_blend_pose(pose_a, self.rig_name))
+        self.dcc.blend_cached_pose(1.0)
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], pose_a.get_pose_data()["ctrl_0003.rotateZ"])
+
+    def test_blend_target_cache_untouched_channels(self):
+        dcc = pose_blender_dcc_simulated.PoseBlenderSimulated(
+            controller_count=10,
+            pose_count=2,
+            pose_channel_ratio=0.3,
+            evaluate_poses=False,
+        )
+        rig_name = dcc.rig_names[0]
+        pose_asset = dcc.get_poses()[0]
+        attr = "{}:ctrl_0009.translateX".format(rig_name)
+        self.assertNotIn("ctrl_0009.translateX", pose_asset.get_pose_data())
+
+        dcc.cache_blend_pose(pose_asset, rig_name)
+        dcc.blend_cached_pose(1.0)
+
+        # an edit to a channel the pose doesn't set survives blending the pose again from the cache
+        dcc.attribute_values[attr] = 7.0
+        self.assertTrue(dcc.cache_blend_pose(pose_asset, rig_name))
+        dcc.blend_cached_pose(1.0)
+        self.assertEqual(dcc.attribute_values[attr], 7.0)
+
+    def test_evaluate_pose_asset(self):
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+
+        self.dcc.reset_call_counts()
+        self.assertFalse(self.dcc.cache_blend_pose(pose_asset, self.rig_name))
+        self.assertEqual(self.dcc.call_counts["attributes_written"], 0)
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+
+        self.dcc.apply_pose(pose_asset, self.rig_name)
+        self.assertEqual(self.dcc.attribute_values[attr], pose_asset.get_pose_data()["ctrl_0004.translateY"])
+
+    def test_evaluate_fallback(self):
+        self.dcc.evaluate_poses = False
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+
+        # applied, read back and reset to weight 0
+        self.assertFalse(self.dcc.cache_blend_pose(pose_asset, self.rig_name))
+        self.assertGreater(self.dcc.call_counts["attributes_written"], 0)
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+
+        self.dcc.blend_cached_pose(1.0)
+        self.assertEqual(self.dcc.attribute_values[attr], pose_asset.get_pose_data()["ctrl_0004.translateY"])
+
+    def test_blend_session_commit(self):
+        self.dcc.evaluate_poses = False
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+        pose_value = pose_asset.get_pose_data()["ctrl_0004.translateY"]
+
+        self.dcc.begin_blend_session(pose_asset, self.rig_name)
+        for step in range(10):
+            self.dcc.update_blend_session(step / 10.0)
+        self.dcc.update_blend_session(1.0)
+        self.assertEqual(self.dcc.undo_stack, [])
+
+        self.dcc.commit_blend_session()
+        self.assertEqual(len(self.dcc.undo_stack), 1)
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], pose_value)
+
+        self.assertTrue(self.dcc.undo())
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+
+    def test_blend_session_resume_undo(self):
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+        pose_value = pose_asset.get_pose_data()["ctrl_0004.translateY"]
+
+        self.dcc.begin_blend_session(pose_asset, self.rig_name)
+        self.dcc.update_blend_session(0.5)
+        self.dcc.commit_blend_session()
+
+        # a second drag on the same pose resumes from 0.5
+        self.assertTrue(self.dcc.begin_blend_session(pose_asset, self.rig_name))
+        self.dcc.update_blend_session(1.0)
+        self.dcc.commit_blend_session()
+        self.assertEqual(len(self.dcc.undo_stack), 2)
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], pose_value)
+
+        # each undo goes back one commit
+        self.assertTrue(self.dcc.undo())
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], pose_value * 0.5)
+        self.assertTrue(self.dcc.undo())
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+
+    def test_pose_mix_undo(self):
+        poses = self.dcc.get_poses()
+        pose_keys = [poses[0].get_key(), poses[1].get_key()]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+
+        self.dcc.start_pose_mix(self.rig_name)
+        self.dcc.add_mix_pose(poses[0])
+        self.dcc.add_mix_pose(poses[1])
+
+        self.dcc.blend_pose_mix({pose_keys[0]: 1.0}, undoable=False)
+        self.dcc.commit_pose_mix()
+        first_value = self.dcc.attribute_values[attr]
+        self.dcc.blend_pose_mix({pose_keys[1]: 1.0}, undoable=False)
+        self.dcc.commit_pose_mix()
+        self.assertEqual(len(self.dcc.undo_stack), 2)
+
+        # each undo goes back one commit
+        self.assertTrue(self.dcc.undo())
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], first_value)
+        self.assertTrue(self.dcc.undo())
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+
+    def test_pose_mix_readback(self):
+        self.dcc.evaluate_poses = False
+        self.dcc.pose_mix_mode = pose_blender_blend_cache.MIX_MODE_ADDITIVE
+        pose_a = create_pose_asset("a", {"ctrl_0001.translateX": 10.0})
+        pose_b = create_pose_asset("b", {"ctrl_0002.translateX": 10.0})
+        attr_a = "{}:ctrl_0001.translateX".format(self.rig_name)
+        attr_b = "{}:ctrl_0002.translateX".format(self.rig_name)
+
+        self.dcc.start_pose_mix(self.rig_name)
+        self.dcc.add_mix_pose(pose_a)
+        self.dcc.blend_pose_mix({pose_a.get_key(): 1.0}, undoable=False)
+
+        # read back on top of the pre blend values, not on top of pose A
+        self.dcc.add_mix_pose(pose_b)
+        self.assertEqual(self.dcc.attribute_values[attr_a], 10.0)
+        self.assertEqual(self.dcc.attribute_values[attr_b], 0.0)
+
+        self.dcc.blend_pose_mix({pose_a.get_key(): 0.0, pose_b.get_key(): 1.0}, undoable=False)
+        self.assertEqual(self.dcc.attribute_values[attr_a], 0.0)
+        self.assertEqual(self.dcc.attribute_values[attr_b], 10.0)
+
+        self.dcc.blend_pose_mix({pose_a.get_key(): 1.0, pose_b.get_key(): 1.0}, undoable=False)
+        self.assertEqual(self.dcc.attribute_values[attr_a], 10.0)
+        self.assertEqual(self.dcc.attribute_values[attr_b], 10.0)
+
+    def test_blend_session_cancel(self):
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+
+        self.dcc.begin_blend_session(pose_asset, self.rig_name)
+        self.dcc.update_blend_session(0.5)
+        self.assertNotEqual(self.dcc.attribute_values[attr], 0.0)
+
+        self.dcc.reset_call_counts()
+        self.dcc.cancel_blend_session()
+        self.assertEqual(self.dcc.call_counts["set_control_values_bulk"], 1)
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+        self.assertEqual(self.dcc.undo_stack, [])
+
+        # nothing left to commit after a cancel
+        self.dcc.commit_blend_session()
+        self.assertEqual(self.dcc.undo_stack, [])
+
+    def test_attribute_plan(self):
+        attribute_plan = self.dcc.get_attribute_plan(self.rig_name)
+        self.assertEqual(len(attribute_plan), 10 * 9)
+        self.assertEqual(attribute_plan.get_handle("ctrl_0001.rotateX"), "{}:ctrl_0001.rotateX".format(self.rig_name))
+
+        # cached until the selection or ignore list changes
+        self.assertIs(self.dcc.get_attribute_plan(self.rig_name), attribute_plan)
+        self.assertEqual(self.dcc.call_counts["list_control_attrs"], 1)
+
+        self.dcc.selection = ["ctrl_0001"]
+        self.assertEqual(len(self.dcc.get_attribute_plan(self.rig_name)), 9)
+        self.dcc.blend_ignore_attr_names.append("rotateX")
+        self.assertIsNone(self.dcc.get_attribute_plan(self.rig_name).get_handle("ctrl_0001.rotateX"))
+        self.assertEqual(self.dcc.call_counts["list_control_attrs"], 3)
+
+        # blend sessions share the plan's index table
+        self.dcc.cache_blend_pose(self.dcc.get_poses()[0], self.rig_name)
+        self.assertIs(self.dcc.blend_cache.handle_indices, self.dcc.get_attribute_plan(self.rig_name).handle_indices)
+        self.assertEqual(self.dcc.call_counts["list_control_attrs"], 3)
+
+    def test_bake_blend_pose(self):
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+        pose_value = pose_asset.get_pose_data()["ctrl_0004.translateY"]
+
+        key_count = self.dcc.bake_blend_pose(pose_asset, self.rig_name, 10, 20, easing="ease_in")
+        self.assertEqual(key_count, 10 * 9 * 11)
+        self.assertEqual(self.dcc.call_counts["set_keyframes_bulk"], 1)
+
+        keys = self.dcc.keyframes[attr]
+        self.assertEqual(sorted(keys), list(range(10, 21)))
+        self.assertEqual(keys[10], 0.0)
+        self.assertAlmostEqual(keys[15], pose_value * 0.25)
+        self.assertAlmostEqual(keys[20], pose_value)
+
+        # the scene is left at the current pose
+        self.assertEqual(self.dcc.attribute_values[attr], 0.0)
+
+    def test_bake_then_blend_undo(self):
+        pose_asset = self.dcc.get_poses()[2]
+        attr = "{}:ctrl_0004.translateY".format(self.rig_name)
+
+        self.dcc.begin_blend_session(pose_asset, self.rig_name)
+        self.dcc.update_blend_session(0.5)
+        self.dcc.commit_blend_session()
+        half_value = self.dcc.attribute_values[attr]
+
+        # the bake re-caches from the half blended values, the next drag starts over from there
+        self.dcc.bake_blend_pose(pose_asset, self.rig_name, 1, 10)
+        self.dcc.begin_blend_session(pose_asset, self.rig_name)
+        self.dcc.update_blend_session(1.0)
+        self.dcc.commit_blend_session()
+
+        self.assertTrue(self.dcc.undo())
+        self.assertAlmostEqual(self.dcc.attribute_values[attr], half_value)
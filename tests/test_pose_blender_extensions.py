@@ -0,0 +1,88 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_dcc_core
+from pose_blender import pose_blender_system
+
+
+class TestExtensionDiscovery(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.extension_dir = os.path.join(self.temp_dir, "extensions")
+        self.cache_path = os.path.join(self.temp_dir, "cache", "extension_cache.json")
+        os.makedirs(self.extension_dir)
+        self.write_file("pose_blender_ext_studio.py")
+        self.write_file("unrelated_module.py")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, file_name):
+        with open(os.path.join(self.extension_dir, file_name), "w") as fp:
+            fp.write("")
+
+    def find(self, refresh=False):
+        return pose_blender_system.find_extension_modules(
+            search_paths=[self.extension_dir, os.path.join(self.temp_dir, "missing")],
+            cache_path=self.cache_path,
+            refresh=refresh,
+        )
+
+    def test_find_extensions(self):
+        self.assertEqual(self.find(), ["pose_blender_ext_studio"])
+        self.assertTrue(os.path.isfile(self.cache_path))
+
+    def test_unchanged_folder_uses_cache(self):
+        # set through utime before the listing too, py2 utime rounds to microseconds
+        folder_mtime = os.stat(self.extension_dir).st_mtime
+        os.utime(self.extension_dir, (folder_mtime, folder_mtime))
+        folder_mtime = os.stat(self.extension_dir).st_mtime
+        self.find()
+
+        # same mtime as the cached listing, so the folder isn't listed again
+        self.write_file("pose_blender_ext_new.py")
+        os.utime(self.extension_dir, (folder_mtime, folder_mtime))
+        self.assertEqual(self.find(), ["pose_blender_ext_studio"])
+
+        self.assertEqual(self.find(refresh=True), ["pose_blender_ext_new", "pose_blender_ext_studio"])
+
+    def test_changed_folder_is_listed_again(self):
+        self.find()
+
+        self.write_file("pose_blender_ext_new.py")
+        folder_mtime = os.stat(self.extension_dir).st_mtime + 10
+        os.utime(self.extension_dir, (folder_mtime, folder_mtime))
+        self.assertEqual(self.find(), ["pose_blender_ext_new", "pose_blender_ext_studio"])
+
+    def test_dcc_is_lazy(self):
+        self.assertIsInstance(pose_blender_system.dcc, pose_blender_system.LazyDCC)
+
+        # a fresh stand-in, with a dcc that doesn't scan sys.path for extensions
+        original_dcc = pose_blender_system._dcc_instance
+        original_create_dcc = pose_blender_system.create_dcc
+        dcc_instance = pose_blender_dcc_core.PoseBlenderCoreInterface()
+        pose_blender_system.set_dcc(None)
+        pose_blender_system.create_dcc = lambda: dcc_instance
+        try:
+            lazy_dcc = pose_blender_system.LazyDCC()
+            self.assertFalse(pose_blender_system.is_dcc_created())
+            self.assertEqual(lazy_dcc.library_poll_interval_ms, dcc_instance.library_poll_interval_ms)
+            self.assertTrue(pose_blender_system.is_dcc_created())
+            self.assertIs(pose_blender_system.get_dcc(), dcc_instance)
+        finally:
+            pose_blender_system.create_dcc = original_create_dcc
+            pose_blender_system.set_dcc(original_dcc)
+
+    def test_dcc_module_is_lazy(self):
+        self.assertIsInstance(pose_blender_system.dcc_module, pose_blender_system.LazyDCCModule)
+        self.assertEqual(pose_blender_system.dcc_module.__name__, pose_blender_system.get_dcc_module().__name__)
@@ -0,0 +1,104 @@
+import os
+import struct
+import sys
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_constants as k
+from pose_blender import pose_blender_library
+
+
+def parse_doubles(buffer):
+    count = len(buffer) // 8
+    return list(struct.unpack_from("<{}d".format(count), buffer, 0))
+
+
+class TestPoseLibrary(TestCase):
+
+    def test_views_read_columns(self):
+        library = pose_blender_library.PoseLibrary()
+        library.add_pose(local_path="C:\\poses\\hand\\fist.pose", pose_name="fist", is_favorite=True, tags=["hand"])
+        library.add_pose(local_path="C:\\poses\\hand\\open.pose", pose_name="open", needs_sync=False)
+
+        self.assertEqual(len(library), 2)
+        fist, open_hand = list(library)
+        self.assertIsInstance(fist, k.PoseAsset)
+        self.assertEqual(fist.local_path, "C:\\poses\\hand\\fist.pose")
+        self.assertEqual(fist.get_key(), "C:\\poses\\hand\\fist.pose")
+        self.assertEqual(fist.tags, ["hand"])
+        self.assertTrue(fist.is_favorite)
+        self.assertTrue(fist.needs_sync)
+        self.assertFalse(open_hand.is_favorite)
+        self.assertFalse(open_hand.needs_sync)
+        self.assertEqual(library[-1], open_hand)
+
+        # folder is only stored once
+        self.assertEqual(library.directory_ids[0], library.directory_ids[1])
+
+    def test_local_path_round_trip(self):
+        local_paths = ["/idle.pose", "C:\\p\\a.pose", "C:\\p/mixed\\b.pose", "//server/poses/c.pose", "d.pose", ""]
+        library = pose_blender_library.PoseLibrary()
+        for local_path in local_paths:
+            library.add_pose(local_path=local_path)
+        self.assertEqual([view.local_path for view in library], local_paths)
+
+        library[0].local_path = "\\idle.pose"
+        self.assertEqual(library[0].local_path, "\\idle.pose")
+
+    def test_views_write_through(self):
+        library = pose_blender_library.PoseLibrary()
+        library.add_pose(pose_name="a")
+
+        library[0].is_favorite = True
+        library[0].pose_name = "b"
+        library[0].pose_data = {"node.tx": 1.0}
+
+        view = library[0]
+        self.assertTrue(view.is_favorite)
+        self.assertEqual(view.pose_name, "b")
+        self.assertEqual(view.get_pose_data(), {"node.tx": 1.0})
+        self.assertFalse(hasattr(view, "__dict__"))
+
+    def test_shared_pose_data_buffer(self):
+        values = [(0.5, 1.5), (2.5, 3.5, 4.5)]
+        blob = b"".join(struct.pack("<{}d".format(len(v)), *v) for v in values)
+        library = pose_blender_library.PoseLibrary(pose_data_buffer=blob, pose_data_parser=parse_doubles)
+        library.add_pose(pose_name="a", pose_data_offset=0, pose_data_size=16)
+        library.add_pose(pose_name="b", pose_data_offset=16, pose_data_size=24)
+        library.add_pose(pose_name="c")
+
+        self.assertEqual(library[0].get_pose_data(), [0.5, 1.5])
+        self.assertEqual(library[1].get_pose_data(), [2.5, 3.5, 4.5])
+        self.assertIsNone(library[2].get_pose_data())
+
+    def test_pose_data_parsed_once(self):
+        blob = struct.pack("<2d", 0.5, 1.5)
+        parsed = []
+
+        def parser(buffer):
+            parsed.append(len(buffer))
+            return parse_doubles(buffer)
+
+        library = pose_blender_library.PoseLibrary(pose_data_buffer=blob, pose_data_parser=parser)
+        library.add_pose(pose_name="a", pose_data_offset=0, pose_data_size=16)
+
+        # views are made on demand, the handle behind them is kept per row
+        self.assertEqual(library[0].get_pose_data(), [0.5, 1.5])
+        self.assertEqual(library[0].get_pose_data(), [0.5, 1.5])
+        self.assertIs(library[0].pose_data, library[0].pose_data)
+        self.assertEqual(parsed, [16])
+
+    def test_from_pose_assets(self):
+        pose_asset = k.PoseAsset()
+        pose_asset.local_path = "poses/idle.pose"
+        pose_asset.pose_name = "idle"
+        pose_asset.is_favorite = True
+
+        library = pose_blender_library.PoseLibrary.from_pose_assets([pose_asset])
+        self.assertEqual(library[0].get_key(), pose_asset.get_key())
+        self.assertTrue(library[0].is_favorite)
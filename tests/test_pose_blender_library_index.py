@@ -0,0 +1,109 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_library_index
+
+
+class TestPoseLibraryIndex(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.library_dir = os.path.join(self.temp_dir, "library")
+        os.makedirs(os.path.join(self.library_dir, "hands"))
+        self.write_pose("body_idle.pose")
+        self.write_pose("hands/fist.pose")
+        self.index = pose_blender_library_index.PoseLibraryIndex(os.path.join(self.temp_dir, "index.sqlite"))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+    def write_pose(self, relative_path):
+        with open(os.path.join(self.library_dir, relative_path), "w") as fp:
+            fp.write("{}")
+
+    def bump_mtime(self, relative_path):
+        future = time.time() + 10
+        os.utime(os.path.join(self.library_dir, relative_path), (future, future))
+
+    def test_get_poses(self):
+        pose_names = [p.pose_name for p in self.index.get_poses([self.library_dir])]
+        self.assertEqual(pose_names, ["body_idle", "fist"])
+
+    def test_only_changed_directories_rescan(self):
+        self.index.update([self.library_dir])
+        self.assertEqual(self.index.update([self.library_dir]), 0)
+
+        self.write_pose("hands/open.pose")
+        self.bump_mtime("hands")
+        self.assertEqual(self.index.update([self.library_dir]), 1)
+        self.assertEqual(len(self.index.get_entries([self.library_dir])), 3)
+
+        os.remove(os.path.join(self.library_dir, "body_idle.pose"))
+        self.bump_mtime("")
+        self.index.update([self.library_dir])
+        self.assertEqual(len(self.index.get_entries([self.library_dir])), 2)
+
+    def test_thumbnail_follows_rescan(self):
+        self.index.update([self.library_dir])
+        fist_path = self.index.get_entries()[-1].path
+        self.assertEqual(self.index.get_entry(fist_path).thumbnail_path, "")
+
+        # the pose file itself doesn't change, only its directory
+        self.write_pose("hands/fist.png")
+        self.bump_mtime("hands")
+        self.index.update([self.library_dir])
+        self.assertEqual(self.index.get_entry(fist_path).thumbnail_path, fist_path[:-len(".pose")] + ".png")
+
+        os.remove(os.path.join(self.library_dir, "hands", "fist.png"))
+        self.bump_mtime("hands")
+        self.index.update([self.library_dir])
+        self.assertEqual(self.index.get_entry(fist_path).thumbnail_path, "")
+
+    def test_file_removed_while_listing(self):
+        # listed by the directory, gone by the time it's stat'ed
+        try:
+            os.symlink(os.path.join(self.temp_dir, "missing.pose"), os.path.join(self.library_dir, "ghost.pose"))
+        except (AttributeError, NotImplementedError, OSError):
+            self.skipTest("symlinks not available")
+
+        self.index.update([self.library_dir])
+        pose_names = [entry.pose_name for entry in self.index.get_entries([self.library_dir])]
+        self.assertEqual(pose_names, ["body_idle", "fist"])
+
+    def test_favorite_survives_rescan(self):
+        self.index.update([self.library_dir])
+        fist_path = self.index.get_entries()[-1].path
+        self.index.set_favorite(fist_path, True)
+
+        self.bump_mtime("hands/fist.pose")
+        self.index.update([self.library_dir], full=True)
+        self.assertTrue(self.index.get_entry(fist_path).is_favorite)
+
+    def test_apply_changes(self):
+        from pose_blender import pose_blender_library_watcher
+
+        self.index.update([self.library_dir])
+        library_path = pose_blender_library_index.normalize_path(self.library_dir)
+
+        self.write_pose("hands/open.pose")
+        os.remove(os.path.join(self.library_dir, "body_idle.pose"))
+        changes = pose_blender_library_watcher.LibraryChanges(
+            added=[library_path + "/hands/open.pose"],
+            removed=[library_path + "/body_idle.pose"],
+        )
+
+        pose_assets = self.index.apply_changes(changes)
+        self.assertEqual([pose_asset.pose_name for pose_asset in pose_assets], ["open"])
+        pose_names = [entry.pose_name for entry in self.index.get_entries([self.library_dir])]
+        self.assertEqual(pose_names, ["fist", "open"])
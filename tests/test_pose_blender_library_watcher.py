@@ -0,0 +1,172 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_library_watcher
+
+
+class TestPoseLibraryWatcher(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.library_dir = pose_blender_library_watcher.normalize_path(os.path.join(self.temp_dir, "library"))
+        os.makedirs(os.path.join(self.library_dir, "hands"))
+        self.write_pose("body_idle.pose")
+        self.write_pose("hands/fist.pose")
+        self.write_pose("hands/notes.txt")
+
+        self.watcher = pose_blender_library_watcher.PoseLibraryWatcher([self.library_dir])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_path(self, relative_path):
+        return self.library_dir + "/" + relative_path
+
+    def write_pose(self, relative_path, data="{}"):
+        with open(os.path.join(self.library_dir, relative_path), "w") as fp:
+            fp.write(data)
+
+    def bump_mtime(self, relative_path):
+        future = time.time() + 10
+        os.utime(os.path.join(self.library_dir, relative_path), (future, future))
+
+    def test_snapshot(self):
+        # the first pass only takes the snapshot
+        self.assertFalse(self.watcher.poll())
+        self.assertTrue(self.watcher.has_snapshot)
+        self.assertEqual(self.watcher.get_file_count(), 2)
+
+        self.watcher.stats["dirs_listed"] = 0
+        self.assertFalse(self.watcher.poll())
+        self.assertEqual(self.watcher.stats["dirs_listed"], 0)
+
+    def test_add_remove(self):
+        self.watcher.poll()
+
+        self.write_pose("hands/open.pose")
+        os.remove(os.path.join(self.library_dir, "body_idle.pose"))
+        self.bump_mtime("hands")
+        self.bump_mtime("")
+
+        changes = self.watcher.poll()
+        self.assertEqual(changes.added, [self.get_path("hands/open.pose")])
+        self.assertEqual(changes.removed, [self.get_path("body_idle.pose")])
+        self.assertEqual(changes.modified, [])
+
+    def test_modified_in_place(self):
+        self.watcher.file_pass_interval = 1
+        self.watcher.poll()
+
+        # same directory mtime, found by the file pass
+        self.write_pose("hands/fist.pose", data="{\"changed\": 1}")
+        self.bump_mtime("hands/fist.pose")
+        changes = self.watcher.poll()
+        self.assertEqual(changes.modified, [self.get_path("hands/fist.pose")])
+
+    def test_directories(self):
+        self.watcher.poll()
+
+        os.makedirs(os.path.join(self.library_dir, "faces"))
+        self.write_pose("faces/smile.pose")
+        shutil.rmtree(os.path.join(self.library_dir, "hands"))
+        self.bump_mtime("")
+
+        changes = self.watcher.poll()
+        self.assertEqual(changes.added, [self.get_path("faces/smile.pose")])
+        self.assertEqual(changes.removed, [self.get_path("hands/fist.pose")])
+
+    def test_time_budget(self):
+        for dir_index in range(20):
+            os.makedirs(os.path.join(self.library_dir, "group_{}".format(dir_index)))
+
+        # no time at all still gets one directory done, and the pass continues next poll
+        poll_count = 0
+        while not self.watcher.has_snapshot:
+            self.watcher.poll(time_budget=0.0)
+            poll_count += 1
+        self.assertGreater(poll_count, 1)
+        self.assertEqual(len(self.watcher.dir_mtimes), 22)
+
+    def test_mark_dirs_changed(self):
+        self.watcher.poll()
+
+        self.write_pose("hands/open.pose")
+        self.bump_mtime("hands")
+        self.watcher.mark_dirs_changed([self.get_path("hands")])
+
+        # one file per poll without any time, the notified directory is done before the regular pass goes on
+        added = self.watcher.poll(time_budget=0.0).added
+        while self.watcher._priority_dirs:
+            added.extend(self.watcher.poll(time_budget=0.0).added)
+        self.assertEqual(added, [self.get_path("hands/open.pose")])
+        self.assertEqual(self.watcher.stats["dirs_listed"], 3)
+
+    def test_dir_pass_ignores_file_pass(self):
+        for pose_index in range(500):
+            self.write_pose("hands/pose_{}.pose".format(pose_index))
+        self.watcher.poll()
+
+        # a file pass starts once the next directory pass is done
+        self.watcher.file_pass_interval = 1
+        while not self.watcher._file_queue:
+            self.watcher.poll(time_budget=0.0, file_time_budget=0.0)
+        self.assertGreater(len(self.watcher._file_queue), 400)
+
+        # the new pose shows up within one directory pass, long before the file pass is through
+        self.write_pose("hands/open.pose")
+        self.bump_mtime("hands")
+        added = []
+        for _ in range(2):
+            added.extend(self.watcher.poll(time_budget=None, file_time_budget=0.0).added)
+        self.assertEqual(added, [self.get_path("hands/open.pose")])
+        self.assertGreater(len(self.watcher._file_queue), 400)
+
+    def test_large_directory_resumes(self):
+        self.watcher.poll()
+        for pose_index in range(50):
+            self.write_pose("hands/pose_{}.pose".format(pose_index))
+        self.bump_mtime("hands")
+
+        # no time at all stats one file per poll, the changes come in once the directory is through
+        changes = []
+        poll_count = 0
+        while not changes:
+            changes = self.watcher.poll(time_budget=0.0)
+            poll_count += 1
+        self.assertGreater(poll_count, 50)
+        self.assertEqual(len(changes.added), 50)
+        self.assertEqual(self.watcher.stats["dirs_listed"], 3)
+        self.assertEqual(self.watcher.get_file_count(), 52)
+
+    def test_thumbnail_resaved(self):
+        self.write_pose("hands/fist.png", data="png")
+        self.watcher.file_pass_interval = 1
+        self.watcher.poll()
+        self.assertEqual(self.watcher.get_file_count(), 2)
+
+        # re-saved in place, found by the file pass
+        self.write_pose("hands/fist.png", data="new png")
+        self.bump_mtime("hands/fist.png")
+        changes = self.watcher.poll()
+        self.assertEqual(changes.modified, [self.get_path("hands/fist.pose")])
+
+        # added and removed next to an unchanged pose
+        self.write_pose("body_idle.png", data="png")
+        self.bump_mtime("")
+        self.assertEqual(self.watcher.poll().modified, [self.get_path("body_idle.pose")])
+
+        os.remove(os.path.join(self.library_dir, "hands", "fist.png"))
+        self.bump_mtime("hands")
+        changes = self.watcher.poll()
+        self.assertEqual(changes.modified, [self.get_path("hands/fist.pose")])
+        self.assertEqual(changes.added + changes.removed, [])
@@ -0,0 +1,56 @@
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_constants as k
+from pose_blender import pose_blender_pose_data
+
+
+def parse_doubles(buffer):
+    count = len(buffer) // 8
+    return list(struct.unpack_from("<{}d".format(count), buffer, 0))
+
+
+class TestPoseData(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_lazy_handle(self):
+        calls = []
+
+        def loader():
+            calls.append(True)
+            return {"a": 1.0}
+
+        pose_asset = k.PoseAsset()
+        pose_asset.pose_data = pose_blender_pose_data.PoseDataHandle(loader)
+        self.assertFalse(calls)
+
+        self.assertEqual(pose_asset.get_pose_data(), {"a": 1.0})
+        self.assertEqual(pose_asset.get_pose_data(), {"a": 1.0})
+        self.assertEqual(len(calls), 1)
+
+        pose_asset.release_pose_data()
+        self.assertFalse(pose_asset.pose_data.is_resolved)
+
+    def test_mapped_handle(self):
+        file_path = os.path.join(self.temp_dir, "pose.bin")
+        with open(file_path, "wb") as fp:
+            fp.write(struct.pack("<3d", 1.0, 2.0, 3.0))
+
+        handle = pose_blender_pose_data.MappedPoseDataHandle(file_path, parse_doubles)
+        self.assertEqual(handle.resolve(), [1.0, 2.0, 3.0])
+        handle.release()
@@ -0,0 +1,57 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_pose_file as pose_file
+
+
+class TestPoseFile(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.value_table = {
+            "ctrl_hand_L.rotateX": 10.5,
+            "ctrl_hand_L.rotateY": -3.25,
+            "ctrl_hand_R.rotateX": 0.0,
+            "ns:ctrl_root.translateY": 120.0,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        file_path = os.path.join(self.temp_dir, "fist" + pose_file.FILE_EXTENSION)
+        pose_file.write_pose_file(file_path, self.value_table, pose_name="Fist", thumbnail_data=b"png")
+
+        reader = pose_file.PoseFileReader.from_file(file_path)
+        self.assertEqual(reader.get_pose_name(), "Fist")
+        self.assertEqual(reader.string_count, 6)
+        self.assertEqual(reader.get_value_table(), self.value_table)
+        self.assertEqual(reader.get_thumbnail_data(), b"png")
+
+        pose_asset = pose_file.read_pose_asset(file_path)
+        self.assertEqual(pose_asset.pose_name, "Fist")
+        self.assertFalse(pose_asset.pose_data.is_resolved)
+        self.assertEqual(pose_asset.get_pose_data(), self.value_table)
+        pose_asset.release_pose_data()
+
+    def test_json_bridge(self):
+        file_path = os.path.join(self.temp_dir, "fist" + pose_file.FILE_EXTENSION)
+        json_path = os.path.join(self.temp_dir, "fist.json")
+        pose_file.write_pose_file(file_path, self.value_table, pose_name="Fist", use_float64=False)
+
+        pose_file.export_json(file_path, json_path)
+        converted_path = pose_file.import_json(json_path, os.path.join(self.temp_dir, "converted.pbpose"))
+        self.assertEqual(pose_file.read_pose_file(converted_path), self.value_table)
+
+    def test_bad_file(self):
+        with self.assertRaises(pose_file.PoseFileError):
+            pose_file.PoseFileReader(b"nope" * 100)
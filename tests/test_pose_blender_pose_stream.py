@@ -0,0 +1,83 @@
+import os
+import sys
+
+from unittest import TestCase, skipIf
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_constants as k
+from pose_blender import pose_blender_library
+from pose_blender import pose_blender_pose_stream
+
+
+def create_pose_assets(count):
+    pose_assets = []
+    for index in range(count):
+        pose_asset = k.PoseAsset()
+        pose_asset.pose_name = "pose_{}".format(index)
+        pose_assets.append(pose_asset)
+    return pose_assets
+
+
+class AsyncPoses(object):
+    def __init__(self, pose_assets):
+        self.pose_assets = list(pose_assets)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        import asyncio
+        if not self.pose_assets:
+            raise StopAsyncIteration
+        return asyncio.sleep(0, result=self.pose_assets.pop(0))
+
+
+class TestPoseStream(TestCase):
+
+    def test_is_pose_stream(self):
+        pose_assets = create_pose_assets(3)
+        self.assertFalse(pose_blender_pose_stream.is_pose_stream(pose_assets))
+        self.assertFalse(pose_blender_pose_stream.is_pose_stream(pose_blender_library.PoseLibrary.from_pose_assets(pose_assets)))
+        self.assertTrue(pose_blender_pose_stream.is_pose_stream(iter(pose_assets)))
+        self.assertTrue(pose_blender_pose_stream.is_pose_stream(pose_asset for pose_asset in pose_assets))
+
+    def test_batches(self):
+        pose_assets = create_pose_assets(10)
+
+        def produce():
+            yield pose_assets[0]
+            yield pose_assets[1:6]  # producers can hand out their own batches
+            for pose_asset in pose_assets[6:]:
+                yield pose_asset
+
+        batches = list(pose_blender_pose_stream.iter_pose_batches(produce(), max_batch_size=4, max_batch_interval=60))
+        self.assertEqual([len(batch) for batch in batches], [1, 5, 4])
+        self.assertEqual(sum(batches, []), pose_assets)
+
+    def test_stop_closes_producer(self):
+        closed = []
+
+        def produce():
+            try:
+                for pose_asset in create_pose_assets(10):
+                    yield pose_asset
+            finally:
+                closed.append(True)
+
+        batches = pose_blender_pose_stream.iter_pose_batches(produce(), max_batch_size=2, max_batch_interval=60)
+        next(batches)
+        batches.close()
+        self.assertEqual(closed, [True])
+
+    @skipIf(sys.version_info < (3, 5), "async iterators need python 3.5")
+    def test_async_producer(self):
+        pose_assets = create_pose_assets(5)
+        async_poses = AsyncPoses(pose_assets)
+        self.assertTrue(pose_blender_pose_stream.is_pose_stream(async_poses))
+
+        batches = list(pose_blender_pose_stream.iter_pose_batches(async_poses, max_batch_interval=60))
+        self.assertEqual(sum(batches, []), pose_assets)
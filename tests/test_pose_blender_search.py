@@ -0,0 +1,66 @@
+import os
+import sys
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_constants as k
+from pose_blender import pose_blender_search
+
+
+def create_pose_asset(pose_name, local_path="", tags=None):
+    pose_asset = k.PoseAsset()
+    pose_asset.pose_name = pose_name
+    pose_asset.local_path = local_path
+    pose_asset.tags = tags or []
+    return pose_asset
+
+
+class TestPoseSearchIndex(TestCase):
+
+    def setUp(self):
+        self.index = pose_blender_search.PoseSearchIndex([
+            create_pose_asset("Fist_Tight", "/poses/hand/fist_tight.pose", ["combat"]),
+            create_pose_asset("Fist_Loose", "/poses/hand/fist_loose.pose"),
+            create_pose_asset("Idle", "/poses/body/idle.pose", ["combat", "idle"]),
+        ])
+
+    def test_substring(self):
+        self.assertIsNone(self.index.query("  "))
+        self.assertEqual(self.index.query("fist"), {0, 1})
+        self.assertEqual(self.index.query("FIS"), {0, 1})
+        self.assertEqual(self.index.query("ist_t"), {0})
+
+    def test_multi_term(self):
+        self.assertEqual(self.index.query("hand fist tag:combat"), {0})
+        self.assertEqual(self.index.query("tag:com"), {0, 2})
+        self.assertEqual(self.index.query("path:bo"), {2})
+        self.assertEqual(self.index.query("hand idle"), set())
+
+    def test_extend(self):
+        self.assertEqual(self.index.query("fist"), {0, 1})
+        self.index.extend([create_pose_asset("Fist_Open", "/poses/hand/fist_open.pose", ["combat"])])
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.query("fist"), {0, 1, 3})
+        self.assertEqual(self.index.query("tag:combat path:hand"), {0, 3})
+
+    def test_query_rows(self):
+        self.assertEqual(self.index.query("fist", rows=[1, 2]), {1})
+        self.assertEqual(self.index.query("tag:com hand", rows=range(3)), {0})
+        self.assertEqual(self.index.query("path:bo", rows=[0, 1]), set())
+        self.assertIsNone(self.index.query("", rows=[0]))
+
+        # a streamed batch only gets matched on its own rows, the cached terms pick it up as well
+        self.assertEqual(self.index.query("fist"), {0, 1})
+        self.index.extend([
+            create_pose_asset("Fist_Open", "/poses/hand/fist_open.pose"),
+            create_pose_asset("Walk", "/poses/body/walk.pose"),
+        ])
+        self.assertIn("fist", self.index._term_cache)
+        self.assertEqual(self.index.query("fist", rows=range(3, 5)), {3})
+        self.assertEqual(self.index.query("fist"), {0, 1, 3})
+        self.assertEqual(self.index.query("fis"), {0, 1, 3})
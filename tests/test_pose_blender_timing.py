@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+from unittest import TestCase
+
+tests_path = os.path.dirname(os.path.realpath(__file__))
+base_path = tests_path.rsplit(os.sep, 1)[0]
+if base_path not in sys.path:
+    sys.path.insert(0, base_path)
+
+from pose_blender import pose_blender_timing
+
+
+class TestTiming(TestCase):
+
+    def setUp(self):
+        self.recorder = pose_blender_timing.TimingRecorder()
+
+    def test_nested_spans(self):
+        with self.recorder.span("main"):
+            with self.recorder.span("get_poses", pose_count=10):
+                pass
+            with self.recorder.span("update_from_scene"):
+                pass
+
+        report = self.recorder.get_report()
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]["name"], "main")
+        self.assertEqual([child["name"] for child in report[0]["children"]], ["get_poses", "update_from_scene"])
+        self.assertEqual(report[0]["children"][0]["args"], {"pose_count": 10})
+        self.assertGreaterEqual(report[0]["duration"], report[0]["children"][0]["duration"])
+
+        self.assertEqual(self.recorder.get_totals()["get_poses"][0], 1)
+        self.assertIn("    get_poses", self.recorder.format_report())
+
+    def test_threads_are_separate_roots(self):
+        def work():
+            with self.recorder.span("load_thumbnail"):
+                pass
+
+        with self.recorder.span("main"):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        names = sorted(root["name"] for root in self.recorder.get_report())
+        self.assertEqual(names, ["load_thumbnail", "main"])
+
+    def test_disabled(self):
+        self.recorder.enabled = False
+        with self.recorder.span("main"):
+            pass
+        self.assertEqual(self.recorder.get_report(), [])
+
+    def test_chrome_trace_export(self):
+        with self.recorder.span("main"):
+            with self.recorder.span("get_poses"):
+                pass
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            trace_path = self.recorder.export_chrome_trace(os.path.join(temp_dir, "trace.json"))
+            with open(trace_path, "r") as fp:
+                trace_data = json.load(fp)
+        finally:
+            shutil.rmtree(temp_dir)
+
+        events = trace_data["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["main", "get_poses"])
+        self.assertTrue(all(event["ph"] == "X" for event in events))